@@ -1,170 +1,63 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
-from typing import Optional
-import io
-
-# Create FastAPI app
-app = FastAPI(title="Smart Crop Advisory API", version="1.0.0")
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Pydantic models
-class SoilInput(BaseModel):
-    N: float
-    P: float
-    K: float
-    ph: float
-    rainfall: Optional[float] = 100
-    soil_type: Optional[str] = "loam"
-    location: Optional[str] = None
-
-class CropRecoRequest(SoilInput):
-    pass
-
-class FertRequest(SoilInput):
-    crop: str
-
-# Routes
-@app.get("/")
-async def root():
-    return {
-        "message": "Smart Crop Advisory API",
-        "version": "1.0.0",
-        "status": "running",
-        "endpoints": {
-            "health": "/health",
-            "crop_recommendation": "/recommend_crop",
-            "fertilizer_recommendation": "/recommend_fertilizer",
-            "disease_detection": "/detect_disease",
-            "weather": "/weather",
-            "market_prices": "/market",
-            "documentation": "/docs"
-        }
-    }
-
-@app.get("/health")
-async def health():
-    return {"status": "ok", "message": "API is running"}
-
-@app.post("/recommend_crop")
-async def recommend_crop(payload: CropRecoRequest):
-    """Simple heuristic crop recommendation based on soil parameters"""
-    ph = payload.ph
-    
-    # Simple rule-based recommendation
-    if 6.0 <= ph <= 7.5:
-        if payload.N > 80:
-            crop = "wheat"
-        elif payload.P > 40:
-            crop = "corn"
-        else:
-            crop = "rice"
-    elif ph < 6.0:
-        crop = "rice"
-    else:
-        crop = "maize"
-    
-    return {
-        "crop": crop,
-        "confidence": 0.75,
-        "note": "Basic recommendation - upgrade with ML models for better accuracy"
-    }
-
-@app.post("/recommend_fertilizer")
-async def recommend_fertilizer(payload: FertRequest):
-    """Basic fertilizer recommendation"""
-    crop = payload.crop.lower()
-    
-    # Simple fertilizer recommendations
-    fertilizer_map = {
-        "wheat": {"N": "120-150 kg/ha", "P": "60-80 kg/ha", "K": "40-60 kg/ha"},
-        "rice": {"N": "100-120 kg/ha", "P": "50-60 kg/ha", "K": "30-40 kg/ha"},
-        "corn": {"N": "150-200 kg/ha", "P": "80-100 kg/ha", "K": "60-80 kg/ha"},
-        "maize": {"N": "150-200 kg/ha", "P": "80-100 kg/ha", "K": "60-80 kg/ha"}
-    }
-    
-    recommendation = fertilizer_map.get(crop, {
-        "N": "100-120 kg/ha", 
-        "P": "60-80 kg/ha", 
-        "K": "40-60 kg/ha"
-    })
-    
-    return {
-        "crop": payload.crop,
-        "fertilizer_recommendation": recommendation,
-        "note": "Apply in split doses based on crop growth stage"
-    }
-
-@app.get("/market")
-async def market(crop: Optional[str] = None, state: Optional[str] = None):
-    """Mock market prices"""
-    prices = {
-        "wheat": {"price": "2500-2800 INR/quintal", "trend": "stable"},
-        "rice": {"price": "2200-2600 INR/quintal", "trend": "increasing"},
-        "corn": {"price": "2000-2400 INR/quintal", "trend": "stable"},
-        "maize": {"price": "2000-2400 INR/quintal", "trend": "stable"}
-    }
-    
-    if crop:
-        return {
-            "crop": crop,
-            "market_data": prices.get(crop.lower(), {"price": "Contact local market", "trend": "unknown"})
-        }
-    
-    return {"market_prices": prices, "note": "Mock data - integrate with real market APIs"}
-
-@app.get("/weather")
-async def weather(pincode: str):
-    """Mock weather data"""
-    return {
-        "location": f"Pincode: {pincode}",
-        "weather": {
-            "temperature": "25-32°C",
-            "humidity": "60-80%",
-            "rainfall": "Expected in 2-3 days"
-        },
-        "agricultural_advisory": "Good conditions for sowing. Prepare for upcoming rain.",
-        "note": "Mock data - set OPENWEATHER_API_KEY for real data"
-    }
-
-@app.post("/detect_disease")
-async def detect_disease(file: UploadFile = File(...)):
-    """Disease detection using image analysis (basic implementation)"""
-    try:
-        # Read image bytes
-        img_bytes = await file.read()
-        
-        # Basic analysis based on file size (placeholder logic)
-        # In production, integrate with ML model
-        file_size = len(img_bytes)
-        
-        # Simple heuristic based on image characteristics
-        if file_size > 50000:
-            label = "healthy"
-            confidence = 0.72
-            remedy = "No action needed; maintain regular scouting and proper irrigation."
-        else:
-            label = "leaf_blight_suspected"
-            confidence = 0.65
-            remedy = "Use copper-based fungicide; remove affected leaves; avoid overhead irrigation."
-        
-        return {
-            "label": label,
-            "confidence": confidence,
-            "remedy": remedy,
-            "note": "Basic analysis - upgrade with ML models for better accuracy"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid image: {str(e)}")
-
-# Export for Vercel - the app itself is the handler
-# Vercel will automatically handle the ASGI app
+"""Vercel entry point: serves the same FastAPI app as ``services/app.py``.
+
+The app imports numpy, PIL and httpx lazily per route, so a cold start here
+only pays for the handler the request actually hits. Importing FastAPI itself
+is most of what is left (see ``python services/run_server.py --profile-startup``),
+so a liveness check on a fresh instance is answered before it is imported.
+That reply is liveness only: it does not have the warm ``/health`` schema, and
+``/ready`` (always served by the app) is the readiness check.
+"""
+import os
+import sys
+import threading
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services")
+sys.path.insert(0, SERVICES_DIR)
+
+# A serverless instance may serve one request and be frozen: load models on
+# first use instead of in a startup thread.
+os.environ.setdefault("MODEL_PRELOAD", "0")
+
+from utils.lazy import Lazy  # noqa: E402  (stdlib only)
+
+COLD_HEALTH_BODY = b'{"status":"ok","warming":true}'
+COLD_HEALTH_HEADERS = [(b"content-type", b"application/json"), (b"cache-control", b"no-store")]
+
+
+def _load_app():
+    from app import app
+
+    return app
+
+
+APP = Lazy(_load_app)
+_warming = threading.Lock()
+
+
+def _warm_in_background() -> None:
+    if _warming.acquire(blocking=False):
+        threading.Thread(target=APP.get, name="app-import", daemon=True).start()
+
+
+class ColdStartApp:
+    """ASGI wrapper that imports the FastAPI app on the first real request.
+
+    ``GET /health`` on an instance that has not loaded the app yet gets a
+    static liveness reply (``{"status":"ok","warming":true}``, not the warm
+    schema with models and caches) and the import starts in the background.
+    Every other request, and lifespan events, go to the full app.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http" and scope["path"] == "/health"
+            and scope["method"] in ("GET", "HEAD") and not APP.built
+        ):
+            await send({"type": "http.response.start", "status": 200, "headers": COLD_HEALTH_HEADERS})
+            await send({"type": "http.response.body", "body": COLD_HEALTH_BODY if scope["method"] == "GET" else b""})
+            _warm_in_background()
+            return
+        await APP.get()(scope, receive, send)
+
+
+app = ColdStartApp()
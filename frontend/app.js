@@ -3,6 +3,7 @@ import { renderFertilizer } from './components/FertilizerAdvisor.js'
 import { renderDisease } from './components/DiseaseDetector.js'
 import { renderWeather } from './components/WeatherAlert.js'
 import { renderMarket } from './components/MarketPrices.js'
+import { initSyncStatus } from './components/syncStatus.js'
 
 // Determine API URL based on environment
 function getApiUrl() {
@@ -31,6 +32,7 @@ function setTab(tab){
 
 // default
 setTab('crop')
+initSyncStatus(document.querySelector('footer'))
 
 document.querySelectorAll('.tabs button').forEach(btn=>{
   btn.addEventListener('click', ()=> setTab(btn.dataset.tab))
@@ -1,3 +1,5 @@
+import { downscaleImage } from './imageTools.js'
+
 export function renderDisease(root, API){
   root.innerHTML = `
     <section class="card">
@@ -21,9 +23,11 @@ export function renderDisease(root, API){
 
   form.onsubmit = async (e)=>{
     e.preventDefault()
+    out.textContent = 'Preparing photo...'
+    const photo = await downscaleImage(form.img.files[0])
     out.textContent = 'Uploading...'
     const fd = new FormData()
-    fd.append('file', form.img.files[0])
+    fd.append('file', photo, photo.name)
     try{
       const r = await fetch(`${API}/detect_disease`,{method:'POST', body: fd})
       const data = await r.json()
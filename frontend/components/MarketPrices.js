@@ -1,10 +1,17 @@
 export function renderMarket(root, API){
   root.innerHTML = `
     <section class="card">
-      <h2>Market Prices (Mock)</h2>
+      <h2>Market Prices</h2>
       <form id="mform">
         <label>Crop</label>
         <input name="crop" placeholder="wheat" />
+        <label>State</label>
+        <input name="state" placeholder="Gujarat" />
+        <label>View</label>
+        <select name="mode">
+          <option value="prices">Latest prices</option>
+          <option value="analytics">Trends (7/30-day average, week-on-week)</option>
+        </select>
         <button class="primary">Fetch</button>
       </form>
       <pre id="mout"></pre>
@@ -12,15 +19,36 @@ export function renderMarket(root, API){
   `
   const form = root.querySelector('#mform')
   const out = root.querySelector('#mout')
+  const fmt = (v, suffix='') => v === null || v === undefined ? '—' : `${v}${suffix}`
+  const trendLine = (r) => {
+    const range = r.state_range
+      ? ` | ${r.state}: ₹${r.state_range.min_price} (${r.state_range.min_market}) – ₹${r.state_range.max_price} (${r.state_range.max_market})`
+      : ''
+    return `${r.market} [${r.date}]: ₹${r.modal_price} | 7d avg ${fmt(r.ma_7)} | 30d avg ${fmt(r.ma_30)} | WoW ${fmt(r.wow_change_pct, '%')}${range}`
+  }
   form.onsubmit = async (e)=>{
     e.preventDefault()
-    out.textContent = 'Loading...'
     const crop = form.crop.value.trim()
-    const url = crop ? `${API}/market?crop=${encodeURIComponent(crop)}` : `${API}/market`
+    const state = form.state.value.trim()
+    const mode = form.mode.value
+    if(mode === 'analytics' && !crop){ out.textContent = 'Enter a crop to see price trends'; return }
+    out.textContent = 'Loading...'
+    const params = new URLSearchParams()
+    if(crop) params.set('crop', crop)
+    if(state) params.set('state', state)
+    if(mode === 'analytics') params.set('mode', 'analytics')
+    const qs = params.toString()
+    const url = qs ? `${API}/market?${qs}` : `${API}/market`
     try{
       const r = await fetch(url)
       const data = await r.json()
-      out.textContent = JSON.stringify(data, null, 2)
+      if(mode === 'analytics' && Array.isArray(data.results)){
+        out.textContent = data.results.length
+          ? data.results.map(trendLine).join('\n')
+          : 'No price history for this crop yet'
+      }else{
+        out.textContent = JSON.stringify(data, null, 2)
+      }
     }catch(err){ out.textContent = 'Error: '+err }
   }
 }
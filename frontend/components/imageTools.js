@@ -0,0 +1,31 @@
+// Photos from phone cameras are 3-12 MP; the server only needs a small leaf crop
+// (it resizes to 64x64), so shrink before upload to save bandwidth on 2G links.
+export const MAX_UPLOAD_SIDE = 1024
+export const JPEG_QUALITY = 0.85
+
+export async function downscaleImage(file, maxSide = MAX_UPLOAD_SIDE, quality = JPEG_QUALITY){
+  if(!file || !file.type || !file.type.startsWith('image/') || typeof createImageBitmap !== 'function') return file
+  let bitmap
+  try{
+    bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' })
+  }catch(err){
+    return file  // undecodable here (e.g. HEIC): let the server try
+  }
+  const scale = Math.min(1, maxSide / Math.max(bitmap.width, bitmap.height))
+  if(scale === 1 && file.type === 'image/jpeg'){
+    bitmap.close()
+    return file
+  }
+  const w = Math.round(bitmap.width * scale), h = Math.round(bitmap.height * scale)
+  const canvas = typeof OffscreenCanvas === 'function' ? new OffscreenCanvas(w, h) : Object.assign(document.createElement('canvas'), { width: w, height: h })
+  const ctx = canvas.getContext('2d')
+  ctx.imageSmoothingQuality = 'high'
+  ctx.drawImage(bitmap, 0, 0, w, h)
+  bitmap.close()
+  const blob = canvas.convertToBlob
+    ? await canvas.convertToBlob({ type: 'image/jpeg', quality })
+    : await new Promise(resolve=>canvas.toBlob(resolve, 'image/jpeg', quality))
+  if(!blob || blob.size >= file.size) return file
+  const name = file.name.replace(/\.[^.]+$/, '') + '.jpg'
+  return new File([blob], name, { type: 'image/jpeg' })
+}
@@ -0,0 +1,25 @@
+// Shows requests the service worker queued while offline and their results once replayed
+export function initSyncStatus(footer){
+  if(!('serviceWorker' in navigator)) return
+  const status = document.createElement('small')
+  status.id = 'syncStatus'
+  status.className = 'muted'
+  footer.appendChild(status)
+
+  const label = (url)=> new URL(url).pathname.replace(/^\//, '')
+  navigator.serviceWorker.addEventListener('message', (e)=>{
+    const msg = e.data || {}
+    if(msg.type === 'sca-queued'){
+      status.textContent = `📥 Offline: ${msg.pending} request(s) waiting to send`
+    }else if(msg.type === 'sca-synced'){
+      const ok = msg.status >= 200 && msg.status < 300
+      status.textContent = `${ok ? '✅' : '⚠️'} Sent ${label(msg.url)} (${msg.status})` + (msg.pending ? ` — ${msg.pending} still waiting` : '')
+      if(ok && msg.body) console.info('Queued request completed', msg.url, msg.body)
+    }
+  })
+
+  // browsers without Background Sync: ask the worker to replay when connectivity returns
+  window.addEventListener('online', ()=>{
+    navigator.serviceWorker.ready.then(reg=> reg.active && reg.active.postMessage({ type: 'sca-replay' }))
+  })
+}
@@ -1,11 +1,215 @@
-const CACHE = 'sca-v1'
+// Bump VERSION whenever ASSETS change: activate() drops every cache not listed in CACHES
+const VERSION = 'v3'
+const STATIC_CACHE = `sca-static-${VERSION}`
+const API_CACHE = `sca-api-${VERSION}`
+const CACHES = [STATIC_CACHE, API_CACHE]
 const ASSETS = [
-  '/', '/index.html', '/app.js', '/styles.css',
-  '/components/CropAdvisor.js', '/components/FertilizerAdvisor.js', '/components/DiseaseDetector.js', '/components/WeatherAlert.js', '/components/MarketPrices.js'
+  '/', '/index.html', '/app.js', '/styles.css', '/manifest.json',
+  '/components/CropAdvisor.js', '/components/FertilizerAdvisor.js', '/components/DiseaseDetector.js',
+  '/components/WeatherAlert.js', '/components/MarketPrices.js', '/components/imageTools.js', '/components/syncStatus.js'
 ]
+// other same-origin files that may be cached as assets (never .json: /openapi.json is an API route)
+const STATIC_EXT = /\.(?:js|css|html|png|jpe?g|svg|webp|ico|woff2?)$/
+
+// GET routes served stale-while-revalidate; ttl = seconds a cached copy is used without a network call
+// (aligned with the API's Cache-Control: weather 10 min, market 5 min)
+const API_ROUTES = [
+  { path: '/weather', ttl: 600 },
+  { path: '/market', ttl: 300 },
+  { path: '/languages', ttl: 86400 },
+]
+const MAX_API_ENTRIES = 60
+
+// POSTs that are queued while offline and replayed by background sync
+const QUEUED_POSTS = ['/recommend_crop', '/recommend_fertilizer', '/detect_disease']
+const SYNC_TAG = 'sca-outbox'
+const DB_NAME = 'sca-outbox'
+const STORE = 'requests'
+const FETCHED_AT = 'x-sw-fetched-at'
+
 self.addEventListener('install', e=>{
-  e.waitUntil(caches.open(CACHE).then(c=>c.addAll(ASSETS)))
+  e.waitUntil(caches.open(STATIC_CACHE).then(c=>c.addAll(ASSETS)).then(()=>self.skipWaiting()))
+})
+
+self.addEventListener('activate', e=>{
+  e.waitUntil(
+    caches.keys()
+      .then(keys=>Promise.all(keys.filter(k=>!CACHES.includes(k)).map(k=>caches.delete(k))))
+      .then(()=>self.clients.claim())
+  )
 })
+
 self.addEventListener('fetch', e=>{
-  e.respondWith(caches.match(e.request).then(r=> r || fetch(e.request)))
+  const req = e.request
+  const url = new URL(req.url)
+  if(req.method === 'POST' && QUEUED_POSTS.includes(url.pathname)){
+    e.respondWith(postOrQueue(req))
+    return
+  }
+  if(req.method !== 'GET') return
+  const route = API_ROUTES.find(r=>url.pathname === r.path || url.pathname.startsWith(r.path + '/'))
+  if(route){
+    e.respondWith(apiStaleWhileRevalidate(e, req, route))
+    return
+  }
+  if(url.origin !== self.location.origin) return
+  if(ASSETS.includes(url.pathname) || STATIC_EXT.test(url.pathname)){
+    e.respondWith(assetStaleWhileRevalidate(e, req))
+    return
+  }
+  // offline navigation to an unknown path: fall back to the app shell
+  if(req.mode === 'navigate'){
+    e.respondWith(fetch(req).catch(async ()=>(await caches.match('/index.html')) || Response.error()))
+  }
+  // anything else (/health, /locate, /docs, /openapi.json...) goes to the network uncached
+})
+
+// ---------- static assets: cached copy first, refreshed in the background ----------
+async function assetStaleWhileRevalidate(event, req){
+  const cache = await caches.open(STATIC_CACHE)
+  const cached = await cache.match(req)
+  const network = fetch(req).then(res=>{
+    if(res.ok) cache.put(req, res.clone())
+    return res
+  })
+  if(cached){
+    event.waitUntil(network.catch(()=>{}))
+    return cached
+  }
+  try{
+    return await network
+  }catch(err){
+    // offline navigation to an unknown path: fall back to the app shell
+    if(req.mode === 'navigate') return (await cache.match('/index.html')) || Response.error()
+    return Response.error()
+  }
+}
+
+// ---------- API GETs: stale-while-revalidate with per-route TTL ----------
+function ageSeconds(res){
+  const at = Number(res.headers.get(FETCHED_AT) || 0)
+  return (Date.now() - at) / 1000
+}
+
+async function storeApi(cache, req, res){
+  const cc = res.headers.get('Cache-Control') || ''
+  if(!res.ok || cc.includes('no-store')) return
+  // stamp the copy so ttl checks don't depend on the server's Date header
+  const headers = new Headers(res.headers)
+  headers.set(FETCHED_AT, String(Date.now()))
+  const body = await res.blob()
+  await cache.put(req, new Response(body, { status: res.status, statusText: res.statusText, headers }))
+  const keys = await cache.keys()
+  for(const old of keys.slice(0, Math.max(0, keys.length - MAX_API_ENTRIES))) await cache.delete(old)
+}
+
+function withState(res, state){
+  const headers = new Headers(res.headers)
+  headers.set('X-SW-Cache', state)
+  return new Response(res.body, { status: res.status, statusText: res.statusText, headers })
+}
+
+async function apiStaleWhileRevalidate(event, req, route){
+  const cache = await caches.open(API_CACHE)
+  const cached = await cache.match(req)
+  if(cached && ageSeconds(cached) < route.ttl) return withState(cached, 'fresh')
+
+  // the browser HTTP cache turns this into a conditional request (ETag -> 304)
+  const network = fetch(req).then(async res=>{
+    await storeApi(cache, req, res.clone())
+    return res
+  })
+  if(cached){
+    event.waitUntil(network.catch(()=>{}))
+    return withState(cached, 'stale')
+  }
+  try{
+    return await network
+  }catch(err){
+    return jsonResponse({ error: 'You are offline and this data has not been loaded before.', offline: true }, 503)
+  }
+}
+
+// ---------- POST outbox: IndexedDB queue + Background Sync ----------
+function jsonResponse(obj, status){
+  return new Response(JSON.stringify(obj), { status, headers: { 'Content-Type': 'application/json' } })
+}
+
+function openDb(){
+  return new Promise((resolve, reject)=>{
+    const open = indexedDB.open(DB_NAME, 1)
+    open.onupgradeneeded = ()=> open.result.createObjectStore(STORE, { keyPath: 'id', autoIncrement: true })
+    open.onsuccess = ()=> resolve(open.result)
+    open.onerror = ()=> reject(open.error)
+  })
+}
+
+async function withStore(mode, fn){
+  const db = await openDb()
+  return new Promise((resolve, reject)=>{
+    const tx = db.transaction(STORE, mode)
+    const result = fn(tx.objectStore(STORE))
+    tx.oncomplete = ()=>{ db.close(); resolve(result && 'result' in result ? result.result : result) }
+    tx.onerror = ()=>{ db.close(); reject(tx.error) }
+  })
+}
+
+async function postOrQueue(req){
+  const copy = req.clone()
+  try{
+    return await fetch(req)
+  }catch(err){
+    const entry = {
+      url: copy.url,
+      headers: [...copy.headers.entries()],
+      body: await copy.blob(),
+      queuedAt: Date.now(),
+    }
+    await withStore('readwrite', s=>s.add(entry))
+    if(self.registration.sync){
+      try{ await self.registration.sync.register(SYNC_TAG) }catch(e){ /* page falls back to 'online' replay */ }
+    }
+    await notify({ type: 'sca-queued', url: entry.url, pending: await pendingCount() })
+    return jsonResponse({
+      queued: true,
+      message: 'You are offline. This request was saved and will be sent automatically when you are back online.',
+    }, 202)
+  }
+}
+
+function pendingCount(){
+  return withStore('readonly', s=>s.count())
+}
+
+let replaying = null
+function replayOutbox(){
+  // one replay at a time: sync and 'online' messages can arrive together
+  replaying = replaying || doReplay().finally(()=>{ replaying = null })
+  return replaying
+}
+
+async function doReplay(){
+  const entries = await withStore('readonly', s=>s.getAll())
+  for(const entry of entries){
+    // throws while still offline: the rest stay queued and sync retries later
+    const res = await fetch(entry.url, { method: 'POST', headers: entry.headers, body: entry.body })
+    await withStore('readwrite', s=>s.delete(entry.id))
+    let body = null
+    try{ body = await res.json() }catch(e){ /* non-JSON error page */ }
+    await notify({ type: 'sca-synced', url: entry.url, status: res.status, body, pending: await pendingCount() })
+  }
+}
+
+async function notify(msg){
+  const clients = await self.clients.matchAll({ includeUncontrolled: true })
+  for(const c of clients) c.postMessage(msg)
+}
+
+self.addEventListener('sync', e=>{
+  if(e.tag === SYNC_TAG) e.waitUntil(replayOutbox())
+})
+
+self.addEventListener('message', e=>{
+  // browsers without Background Sync ask for a replay when they come back online
+  if(e.data && e.data.type === 'sca-replay') e.waitUntil(replayOutbox().catch(()=>{}))
 })
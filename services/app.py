@@ -1,28 +1,108 @@
 import os
-import io
-import pickle
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, List, Optional
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import Depends, FastAPI, File, Header, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from PIL import Image
-import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
 
+# Only light modules are imported here. numpy, PIL, httpx and the model
+# files load inside the routes that need them, so a cold start (api/index.py
+# on Vercel mounts this same app) pays only for the route being served.
 from utils.soil_helper import fertilizer_plan
-from utils.market_api import get_prices
+from utils.market_api import MARKET_CACHE_MAX_AGE, MARKET_PAGE_SIZE, get_price_analytics, get_prices, get_store
+from utils.http_cache import FastJSONResponse, StaticJSON, cached_json, json_response, no_store_json
+from utils.lazy import Lazy
+from utils.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    DECODE_LATENCY,
+    INFERENCE_LATENCY,
+    REGISTRY,
+    MetricsMiddleware,
+    timer,
+)
+from utils.model_registry import ModelRegistry
+from utils.upload_limit import MAX_BATCH_UPLOAD_BYTES, MAX_UPLOAD_BYTES, UploadLimitMiddleware
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # Optional: weather (requires env var OPENWEATHER_API_KEY)
-WEATHER_ENABLED = True
-try:
-    from utils.weather_api import WeatherClient
-    weather_client = WeatherClient()
-except Exception:
-    WEATHER_ENABLED = False
-    weather_client = None
+WEATHER_ENABLED = bool(os.getenv("OPENWEATHER_API_KEY"))
+# Keep the cache warm for the most requested pincodes within the OpenWeather quota
+WEATHER_PREFETCH = WEATHER_ENABLED and os.getenv("WEATHER_PREFETCH", "0") != "0"
+
+
+def _make_weather_client():
+    try:
+        from utils.weather_api import AsyncWeatherClient
+        from utils.weather_cache import WeatherCache
+        from utils.weather_prefetch import QUOTA_PER_MIN, TokenBucket
+
+        # every worker process has its own bucket, so each gets an equal share
+        # and N workers together stay within the account's quota (worker 0
+        # prefetches on its share; run_server.py --prod sets WEB_CONCURRENCY)
+        workers = max(1, int(os.getenv("WEB_CONCURRENCY") or 1))
+        quota = TokenBucket.per_minute(QUOTA_PER_MIN / workers) if WEATHER_PREFETCH else None
+        return AsyncWeatherClient(cache=WeatherCache.from_env(), quota=quota)
+    except Exception:
+        return None
+
+
+WEATHER = Lazy(_make_weather_client)
+
+
+def get_weather_client():
+    return WEATHER.get() if WEATHER_ENABLED else None
 
-app = FastAPI(title="Smart Crop Advisory API", version="0.1.0")
+
+LOOP_MONITOR = None
+PREFETCHER = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global LOOP_MONITOR, PREFETCHER
+    if MODEL_PRELOAD:
+        MODELS.preload(background=True)
+    if LOOP_LAG_MS > 0:
+        from utils.profiler import LoopLagMonitor
+
+        LOOP_MONITOR = LoopLagMonitor(threshold=LOOP_LAG_MS / 1000)
+        LOOP_MONITOR.start()
+    # under the prefork launcher only worker 0 prefetches, so the quota is
+    # not spent once per worker
+    if WEATHER_PREFETCH and os.getenv("WORKER_INDEX", "0") == "0" and WEATHER.get() is not None:
+        from utils.weather_prefetch import WeatherPrefetcher
+
+        PREFETCHER = WeatherPrefetcher.from_env(WEATHER.get())
+        PREFETCHER.start()
+    yield
+    if PREFETCHER is not None:
+        await PREFETCHER.stop()
+        PREFETCHER = None
+    if LOOP_MONITOR is not None:
+        await LOOP_MONITOR.stop()
+        LOOP_MONITOR = None
+    # reset, not just close: a later lifespan in the same process (tests,
+    # in-process benchmarks) must build fresh clients, not reuse closed ones
+    weather_client = WEATHER.reset()
+    if weather_client is not None:
+        await weather_client.aclose()
+    batcher = CROP_BATCHER.reset()
+    if batcher is not None:
+        await batcher.aclose()
+    disease_cache = DISEASE_CACHE.reset()
+    if disease_cache is not None:
+        disease_cache.close()
+
+
+app = FastAPI(
+    title="Smart Crop Advisory API", version="0.1.0", lifespan=lifespan, default_response_class=FastJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,23 +111,70 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES, paths=["/detect_disease"])
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_BATCH_UPLOAD_BYTES, paths=["/detect_disease/batch"])
+# Outermost, so latency includes the other middleware; METRICS_ENABLED=0 removes it
+if os.getenv("METRICS_ENABLED", "1") != "0":
+    app.add_middleware(MetricsMiddleware)
 
 # -------------------- Models -------------------- #
-CROP_MODEL = None
-FERT_MODEL = None
-
-MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
-try:
-    with open(os.path.join(MODELS_DIR, "crop_model.pkl"), "rb") as f:
-        CROP_MODEL = pickle.load(f)
-except Exception:
-    CROP_MODEL = None
-
-try:
-    with open(os.path.join(MODELS_DIR, "fertilizer_model.pkl"), "rb") as f:
-        FERT_MODEL = pickle.load(f)
-except Exception:
-    FERT_MODEL = None
+# Upper bound on rows accepted by the batch endpoints
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "50000"))
+
+MODELS_DIR = os.getenv("MODELS_DIR", os.path.join(os.path.dirname(__file__), "models"))
+# Artifacts load on first use; MODEL_PRELOAD=1 (default) warms them in a
+# background thread at startup so worker boot is not blocked on unpickling.
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "1") != "0"
+MODELS = ModelRegistry(MODELS_DIR)
+MODELS.register("crop", "crop_model")
+MODELS.register("fertilizer", "fertilizer_model")
+
+# Admin routes are disabled unless ADMIN_TOKEN is set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Log the stack of any handler that blocks the event loop longer than this (0 = off)
+LOOP_LAG_MS = float(os.getenv("LOOP_LAG_MS", "0"))
+
+
+async def get_model(name: str):
+    if MODELS.is_loaded(name):
+        return MODELS.get(name)
+    return await run_in_threadpool(MODELS.get, name)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+# Set INFERENCE_BATCHING=0 to score each request inline instead of micro-batching
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "1") != "0"
+
+
+def _score_crop_rows(features: "np.ndarray") -> list:
+    from utils.crop_reco import predict_crops
+
+    scored = predict_crops(MODELS.get("crop"), features)
+    return list(zip(scored["labels"].tolist(), scored["confidence"].tolist()))
+
+
+def _make_crop_batcher():
+    from utils.inference_queue import MicroBatcher
+
+    return MicroBatcher(_score_crop_rows, name="crop-model")
+
+
+def _make_disease_cache():
+    from utils.disease_detector import DETECTOR_VERSION
+    from utils.result_cache import ResultCache
+
+    return ResultCache.from_env(DETECTOR_VERSION)
+
+
+CROP_BATCHER = Lazy(_make_crop_batcher)
+
+# Identical photo bytes (re-uploads, WhatsApp forwards) skip decoding entirely
+DISEASE_CACHE = Lazy(_make_disease_cache)
 
 # -------------------- Schemas -------------------- #
 class SoilInput(BaseModel):
@@ -66,99 +193,329 @@ class FertRequest(SoilInput):
     crop: str
 
 # -------------------- Routes -------------------- #
-@app.get("/")
-async def root():
-    return {
-        "message": "Smart Crop Advisory API",
-        "version": "0.1.0",
-        "endpoints": {
-            "health": "/health",
-            "crop_recommendation": "/recommend_crop",
-            "fertilizer_recommendation": "/recommend_fertilizer", 
-            "disease_detection": "/detect_disease",
-            "weather": "/weather",
-            "market_prices": "/market",
-            "documentation": "/docs"
-        }
+ROOT_INFO = StaticJSON({
+    "message": "Smart Crop Advisory API",
+    "version": "0.1.0",
+    "endpoints": {
+        "health": "/health",
+        "crop_recommendation": "/recommend_crop",
+        "crop_recommendation_batch": "/recommend_crop/batch",
+        "fertilizer_recommendation": "/recommend_fertilizer",
+        "fertilizer_recommendation_batch": "/recommend_fertilizer/batch",
+        "disease_detection": "/detect_disease",
+        "disease_detection_batch": "/detect_disease/batch",
+        "weather": "/weather",
+        "market_prices": "/market",
+        "locate": "/locate",
+        "documentation": "/docs"
     }
+})
+LANGUAGES = StaticJSON({"supported": ["en", "hi", "gu", "mr", "bn", "ta", "te", "kn", "pa"]})
+
+@app.get("/")
+async def root(request: Request):
+    return ROOT_INFO.respond(request)
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "weather": WEATHER_ENABLED}
+    # reports only what earlier requests have built; never triggers a load
+    weather_client = WEATHER.peek()
+    status = {"status": "ok", "weather": WEATHER_ENABLED and (weather_client is not None or not WEATHER.built)}
+    if weather_client is not None and weather_client.cache is not None:
+        status["weather_cache"] = weather_client.cache.snapshot()
+    if PREFETCHER is not None:
+        status["weather_prefetch"] = PREFETCHER.snapshot()
+    if CROP_BATCHER.built and CROP_BATCHER.get().stats["batches"]:
+        status["crop_batching"] = CROP_BATCHER.get().stats
+    if DISEASE_CACHE.built:
+        status["disease_cache"] = DISEASE_CACHE.get().snapshot()
+    status["models"] = MODELS.status()
+    if LOOP_MONITOR is not None:
+        status["event_loop"] = LOOP_MONITOR.stats
+    return json_response(status)
+
+@app.get("/ready")
+async def ready():
+    # 503 until preloaded models are in memory, so load balancers (and the
+    # prefork launcher during a rolling restart) only send traffic to warm workers
+    if MODEL_PRELOAD and not MODELS.ready():
+        return no_store_json({"ready": False}, status_code=503)
+    return no_store_json({"ready": True, "worker": os.getenv("WORKER_INDEX")})
+
+def _rendered(build, *args) -> Response:
+    """Build a large payload and serialise it in the same worker thread"""
+    return json_response(build(*args))
+
+async def _place(location: Optional[str]) -> Optional[dict]:
+    """Gazetteer entry for a pincode or "lat,lon" string; None if unresolved"""
+    if not location:
+        return None
+    from utils.gazetteer import get_gazetteer
+
+    try:
+        # the first call parses the CSV and builds the grid; keep that off the loop
+        gazetteer = await run_in_threadpool(get_gazetteer)
+        return gazetteer.locate(location)
+    except (ValueError, OSError):
+        return None
 
 @app.post("/recommend_crop")
 async def recommend_crop(payload: CropRecoRequest):
-    features = np.array([[payload.N, payload.P, payload.K, payload.ph, payload.rainfall]])
-    if CROP_MODEL is not None:
-        pred = CROP_MODEL.predict(features)[0]
-        proba = getattr(CROP_MODEL, "predict_proba", None)
-        conf = float(max(proba(features)[0])) if proba else 0.75
-        return {"crop": str(pred), "confidence": round(conf, 3)}
-    
-    # Fallback heuristic
-    ph = payload.ph
-    if 6.0 <= ph <= 7.5:
-        guess = "wheat"
-    elif ph < 6.0:
-        guess = "rice"
-    else:
-        guess = "maize"
-    return {"crop": guess, "confidence": 0.6, "note": "heuristic fallback (train and drop crop_model.pkl to enable ML)"}
+    place = await _place(payload.location)
+    extra = {"location": place} if place else {}
+    if await get_model("crop") is not None:
+        import numpy as np
+
+        features = np.array([[payload.N, payload.P, payload.K, payload.ph, payload.rainfall]])
+        if INFERENCE_BATCHING:
+            crop, conf = await CROP_BATCHER.get().submit(features[0])
+        else:
+            with timer(INFERENCE_LATENCY.labels("crop-model")):
+                crop, conf = _score_crop_rows(features)[0]
+        return json_response({"crop": crop, "confidence": round(conf, 3), **extra})
+
+    # Fallback heuristic, shared with the batch routes
+    from utils.crop_reco import HEURISTIC_CONFIDENCE, HEURISTIC_NOTE, features_from_rows, heuristic_crops
+
+    guess = heuristic_crops(features_from_rows([payload]))[0].item()
+    return json_response({"crop": guess, "confidence": HEURISTIC_CONFIDENCE, "note": HEURISTIC_NOTE, **extra})
+
+@app.post("/recommend_crop/batch")
+async def recommend_crop_batch(payload: List[CropRecoRequest], top_k: int = 3):
+    """Score many soil samples with a single model call"""
+    from utils.crop_reco import batch_response, features_from_rows
+
+    if len(payload) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {MAX_BATCH_ROWS} rows")
+    features = features_from_rows(payload)
+    return await run_in_threadpool(_rendered, batch_response, features, await get_model("crop"), top_k)
+
+@app.post("/recommend_crop/batch/csv")
+async def recommend_crop_batch_csv(file: UploadFile = File(...), top_k: int = 3):
+    """Score a soil-card CSV upload (columns N,P,K,ph[,rainfall])"""
+    from utils.crop_reco import batch_response, features_from_csv
+
+    try:
+        features = features_from_csv(await file.read())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+    if len(features) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {MAX_BATCH_ROWS} rows")
+    return await run_in_threadpool(_rendered, batch_response, features, await get_model("crop"), top_k)
 
 @app.post("/recommend_fertilizer")
 async def recommend_fertilizer(payload: FertRequest):
     soil = payload.model_dump()
     soil.pop("crop", None)
     plan = fertilizer_plan(payload.crop, soil)
-    return {"crop": payload.crop, **plan}
+    return json_response({"crop": payload.crop, **plan})
+
+@app.post("/recommend_fertilizer/batch")
+async def recommend_fertilizer_batch(payload: List[FertRequest]):
+    """Fertilizer plans for many soil samples, identical to the single-row endpoint"""
+    from utils.soil_engine import fertilizer_batch_response, soil_matrix
+
+    if len(payload) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {MAX_BATCH_ROWS} rows")
+    values = soil_matrix([p.model_dump() for p in payload])
+    return await run_in_threadpool(_rendered, fertilizer_batch_response, [p.crop for p in payload], values)
+
+@app.post("/recommend_fertilizer/batch/csv")
+async def recommend_fertilizer_batch_csv(file: UploadFile = File(...)):
+    """Fertilizer plans for a CSV upload (columns crop,N,P,K,ph)"""
+    from utils.soil_engine import fertilizer_batch_response, soil_from_csv
+
+    try:
+        crops, values = soil_from_csv(await file.read())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+    if len(crops) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {MAX_BATCH_ROWS} rows")
+    return await run_in_threadpool(_rendered, fertilizer_batch_response, crops, values)
 
 @app.post("/detect_disease")
 async def detect_disease(file: UploadFile = File(...)):
+    from utils.disease_detector import classify_leaves
+    from utils.image_pipeline import decode_leaf
+    from utils.result_cache import file_digest
+
+    cache = await run_in_threadpool(DISEASE_CACHE.get)
+    digest = await run_in_threadpool(file_digest, file.file)
+    cached = await run_in_threadpool(cache.get, digest)
+    if cached is not None:
+        return json_response(cached)
     try:
-        img_bytes = await file.read()
-        img = Image.open(io.BytesIO(img_bytes)).convert("RGB").resize((64, 64))
-        arr = np.array(img).astype(np.float32) / 255.0
-        mean_green = float(arr[:, :, 1].mean())
-        # Very naive heuristic: greener → "healthy" else "leaf_blight"
-        if mean_green > 0.35:
-            label = "healthy"
-            conf = 0.7
-        else:
-            label = "leaf_blight_suspected"
-            conf = 0.65
-        remedy = "Use copper-based fungicide; remove affected leaves; avoid overhead irrigation."
-        if label == "healthy":
-            remedy = "No action needed; maintain regular scouting."
-        return {"label": label, "confidence": round(conf, 3), "remedy": remedy}
+        # The multipart parser has already spooled large uploads to disk, so
+        # decode straight from that file instead of reading it into memory.
+        with timer(DECODE_LATENCY.labels("/detect_disease")):
+            arr = await decode_leaf(file.file)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
+    result = classify_leaves(arr[None])[0]
+    await run_in_threadpool(cache.put, digest, result)
+    return json_response(result)
+
+@app.post("/detect_disease/batch")
+async def detect_disease_batch(files: List[UploadFile] = File(...)):
+    """Score every leaf photo of a plot (individual files and/or .zip archives)"""
+    from utils.disease_detector import classify_leaves, plot_summary
+    from utils.image_pipeline import decode_leaf_batch, expand_archives
+
+    try:
+        named = await run_in_threadpool(expand_archives, [(f.filename, f.file) for f in files])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    with timer(DECODE_LATENCY.labels("/detect_disease/batch")):
+        batch, errors = await decode_leaf_batch([fp for _, fp in named])
+    labels = classify_leaves(batch)
+    results = [
+        {"filename": name, "error": err} if err else {"filename": name, **label}
+        for (name, _), err, label in zip(named, errors, labels)
+    ]
+    return json_response({"results": results, "plot": plot_summary(results)})
+
+def _weather_response(request: Request, weather_client, payload: dict, pincode: str, kinds) -> Response:
+    """Cache headers follow the weather cache: max-age is the time left
+    before the oldest input goes stale, Last-Modified its fetch time"""
+    if "error" in payload:
+        return no_store_json(payload)
+    fresh = weather_client.freshness(pincode, kinds=kinds)
+    if fresh is None:
+        return cached_json(request, payload, 0)
+    last_modified, max_age = fresh
+    stale = min(weather_client.cache.ttls[k][1] for k in kinds)
+    return cached_json(request, payload, max_age, last_modified, stale_while_revalidate=stale)
 
 @app.get("/weather")
-async def weather(pincode: str):
-    if not WEATHER_ENABLED or weather_client is None:
-        return {"error": "Weather disabled. Set OPENWEATHER_API_KEY env var."}
+async def weather(request: Request, pincode: str):
+    weather_client = get_weather_client()
+    if weather_client is None:
+        return no_store_json({"error": "Weather disabled. Set OPENWEATHER_API_KEY env var."})
     try:
-        summary = weather_client.get_agricultural_summary(pincode)
-        return summary
+        summary = await weather_client.get_agricultural_summary(pincode)
     except Exception as e:
-        return {"error": f"Weather data unavailable: {str(e)}"}
+        return no_store_json({"error": f"Weather data unavailable: {str(e)}"})
+    if PREFETCHER is not None and "error" not in summary:
+        PREFETCHER.record(pincode)
+    return _weather_response(request, weather_client, summary, pincode, ("current", "forecast"))
 
 @app.get("/weather/simple")
-async def weather_simple(pincode: str):
+async def weather_simple(request: Request, pincode: str):
     """Simple weather endpoint (backward compatibility)"""
-    if not WEATHER_ENABLED or weather_client is None:
-        return {"error": "Weather disabled. Set OPENWEATHER_API_KEY env var."}
+    weather_client = get_weather_client()
+    if weather_client is None:
+        return no_store_json({"error": "Weather disabled. Set OPENWEATHER_API_KEY env var."})
     try:
-        current = weather_client.current_by_pincode(pincode)
+        current = await weather_client.current_by_pincode(pincode)
         alerts = weather_client.simple_alerts(current)
-        return {"current": current, "alerts": alerts}
     except Exception as e:
-        return {"error": f"Weather data unavailable: {str(e)}"}
+        return no_store_json({"error": f"Weather data unavailable: {str(e)}"})
+    if PREFETCHER is not None:
+        PREFETCHER.record(pincode)
+    return _weather_response(request, weather_client, {"current": current, "alerts": alerts}, pincode, ("current",))
 
 @app.get("/market")
-async def market(crop: Optional[str] = None, state: Optional[str] = None):
-    return get_prices(crop=crop, state=state)
+async def market(
+    request: Request,
+    crop: Optional[str] = None,
+    state: Optional[str] = None,
+    market: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = MARKET_PAGE_SIZE,
+    offset: int = 0,
+    mode: str = "prices",
+    history: int = 0,
+    near: Optional[str] = None,
+):
+    """Indexed mandi price lookup with pagination (dates as YYYY-MM-DD).
+
+    ``mode=analytics`` returns per-mandi 7/30-day moving averages,
+    week-on-week change and the state's price range instead (crop required;
+    ``history`` adds that many recent daily points). ``near`` (a pincode or
+    "lat,lon") limits results to the mandis of that location's state.
+    """
+    if mode not in ("prices", "analytics"):
+        raise HTTPException(status_code=400, detail="mode must be 'prices' or 'analytics'")
+    if mode == "analytics" and not crop:
+        raise HTTPException(status_code=400, detail="mode=analytics requires crop")
+    place = None
+    if near:
+        place = await _place(near)
+        if place is None:
+            raise HTTPException(status_code=400, detail=f"Unknown location: {near}")
+        state = state or place["state"]
+    try:
+        if mode == "analytics":
+            data = await run_in_threadpool(
+                get_price_analytics, crop, state=state, market=market,
+                date_to=date_to, history=history, limit=limit, offset=offset,
+            )
+        else:
+            data = await run_in_threadpool(
+                get_prices, crop=crop, state=state, market=market,
+                date_from=date_from, date_to=date_to, limit=limit, offset=offset,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if place is not None:
+        data = {**data, "location": place}
+    return cached_json(request, data, MARKET_CACHE_MAX_AGE, get_store().updated_at)
+
+@app.get("/locate")
+async def locate(request: Request, q: str, k: int = 5):
+    """Offline pincode / "lat,lon" lookup: coordinates, district, state and
+    the ``k`` nearest pincodes"""
+    from utils.gazetteer import get_gazetteer, parse_location
+
+    if not 1 <= k <= 50:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 50")
+    try:
+        parse_location(q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        gazetteer = await run_in_threadpool(get_gazetteer)
+        place = gazetteer.locate(q, k=k)
+    except OSError:
+        raise HTTPException(status_code=503, detail="Pincode gazetteer not available")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return cached_json(request, place, MARKET_CACHE_MAX_AGE)
 
 @app.get("/languages")
-async def languages():
-    return {"supported": ["en", "hi", "gu", "mr", "bn", "ta", "te", "kn", "pa"]}
+async def languages(request: Request):
+    return LANGUAGES.respond(request)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Per-process counters and histograms in the Prometheus text format"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE, headers={"Cache-Control": "no-store"})
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def profile(seconds: float = 10.0, interval_ms: float = 5.0, idle: bool = False):
+    """Sample every thread of this worker for ``seconds``; returns collapsed
+    stacks for flamegraph.pl, speedscope or inferno"""
+    from utils.profiler import MAX_PROFILE_SECONDS, SamplingProfiler
+
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}]")
+    profiler = SamplingProfiler(interval=max(interval_ms, 1.0) / 1000, idle=idle)
+    try:
+        # the sampler sleeps on its own thread, so the loop keeps serving the traffic being profiled
+        collapsed = await run_in_threadpool(profiler.run, seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return Response(collapsed, media_type="text/plain", headers={
+        "Content-Disposition": f'attachment; filename="profile-{os.getpid()}.collapsed"',
+        "X-Profile-Samples": str(profiler.samples),
+        "Cache-Control": "no-store",
+    })
+
+@app.post("/admin/models/reload", dependencies=[Depends(require_admin)])
+async def reload_models(name: Optional[str] = None, force: bool = False):
+    """Hot-swap model artifacts that changed on disk without a restart"""
+    if name is not None and name not in MODELS.status():
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
+    versions = await run_in_threadpool(MODELS.reload, name, force)
+    return {"reloaded": versions, "models": MODELS.status()}
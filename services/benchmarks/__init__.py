@@ -0,0 +1 @@
+# Benchmarks and load-test harness for Smart Crop Advisory
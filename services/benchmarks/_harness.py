@@ -0,0 +1,182 @@
+"""Shared helpers for the benchmark scripts: app subprocess, percentiles, RSS and result comparison."""
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize(samples_s) -> dict:
+    ms = [s * 1000 for s in samples_s]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2) if ms else 0.0,
+    }
+
+
+def start_app(env: dict | None = None, port: int | None = None, args: list | None = None):
+    """Launch services/app.py under uvicorn in a subprocess and wait for /health."""
+    port = port or free_port()
+    proc_env = {**os.environ, **(env or {})}
+    cmd = [sys.executable, "-m", "uvicorn", "app:app", "--app-dir", SERVICES_DIR,
+           "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", *(args or [])]
+    proc = subprocess.Popen(cmd, env=proc_env, cwd=SERVICES_DIR)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"app exited with code {proc.returncode}")
+        try:
+            if httpx.get(base + "/health", timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("app did not become healthy within 30s")
+
+
+def stop_app(proc) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def write_demo_crop_model(models_dir: str, trees: int = 100) -> str:
+    """Fit a RandomForest on a jittered copy of the sample CSV and pickle it."""
+    import csv
+    import pickle
+
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+
+    sample = os.path.join(SERVICES_DIR, "sample_data", "crop_reco_sample.csv")
+    with open(sample) as f:
+        rows = list(csv.DictReader(f))
+    X = np.array([[float(r[k]) for k in ("N", "P", "K", "ph", "rainfall")] for r in rows])
+    y = np.array([r["crop"] for r in rows])
+    rng = np.random.default_rng(0)
+    X = np.vstack([X * rng.normal(1, 0.05, X.shape) for _ in range(50)])
+    y = np.tile(y, 50)
+    model = RandomForestClassifier(n_estimators=trees, random_state=0).fit(X, y)
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, "crop_model.pkl")
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    return path
+
+
+def rss_kb(pid: int) -> int:
+    """Current resident set size of ``pid`` (Linux /proc; 0 elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class RssSampler:
+    """Track the peak RSS of another process while a block runs."""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while True:
+            self.peak_kb = max(self.peak_kb, rss_kb(self.pid))
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak_kb / 1024, 1)
+
+
+def run_metadata() -> dict:
+    """Enough context to tell whether two result files are comparable"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVICES_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+# keys where larger is better; every other *_ms / *_us / *_ns / *_mb key is lower-is-better
+HIGHER_IS_BETTER = ("req_per_s", "ops_per_s")
+LOWER_IS_BETTER = ("_ms", "_us", "_ns", "_mb")
+
+
+def compare_results(current, baseline, tolerance: float = 0.10, path: str = "") -> list:
+    """Regressions of ``current`` against ``baseline`` beyond ``tolerance``.
+
+    Walks both result trees in parallel and returns one entry per numeric
+    metric that got worse by more than the given fraction.
+    """
+    regressions = []
+    if isinstance(current, dict) and isinstance(baseline, dict):
+        for key, value in current.items():
+            if key in ("config", "meta") or key not in baseline:
+                continue
+            regressions += compare_results(value, baseline[key], tolerance, f"{path}/{key}")
+        return regressions
+    if not isinstance(current, (int, float)) or not isinstance(baseline, (int, float)) or not baseline:
+        return regressions
+    key = path.rsplit("/", 1)[-1]
+    if key == "max_ms":  # a single sample: too noisy to gate on
+        return regressions
+    if key in HIGHER_IS_BETTER:
+        change = (baseline - current) / baseline
+    elif key.endswith(LOWER_IS_BETTER):
+        change = (current - baseline) / baseline
+    else:
+        return regressions
+    if change > tolerance:
+        regressions.append({"metric": path, "baseline": baseline, "current": current,
+                            "worse_by_pct": round(change * 100, 1)})
+    return regressions
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Serverless cold start per route: module import plus the first request.
+
+Each sample is a fresh interpreter that imports the Vercel entry point
+(api/index.py, the same app as services/app.py), sends one request straight
+to the ASGI callable and reports import time, first-request time and which
+heavy modules (numpy, PIL, httpx, sklearn) that route pulled in. The child
+uses the standard library only, so nothing is preloaded by the benchmark.
+/weather is served by the local OpenWeather stub.
+
+/health on a fresh instance is a liveness reply sent before FastAPI is
+imported (see api/index.py), so its figure is not an app cold start; /ready
+is the same minimal check through the full app. Pass MARKET_DATA with --env
+to compare a raw dump against the snapshot written by prewarm.py.
+
+    python services/benchmarks/bench_cold_start.py --repeats 5
+    python services/benchmarks/bench_cold_start.py --routes /market --env MARKET_DATA=dump.csv
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICES_DIR = os.path.dirname(BENCH_DIR)
+API_DIR = os.path.join(os.path.dirname(SERVICES_DIR), "api")
+HEAVY = ("numpy", "PIL", "httpx", "sklearn")
+
+SOIL = {"N": 60, "P": 40, "K": 45, "ph": 6.5, "rainfall": 120}
+ROUTES = {
+    "/health": ("GET", "/health", None),
+    "/ready": ("GET", "/ready", None),
+    "/": ("GET", "/", None),
+    "/languages": ("GET", "/languages", None),
+    "/market": ("GET", "/market?crop=rice", None),
+    "/recommend_fertilizer": ("POST", "/recommend_fertilizer", {**SOIL, "crop": "rice"}),
+    "/recommend_crop": ("POST", "/recommend_crop", SOIL),
+    "/weather": ("GET", "/weather?pincode=110001", None),
+    "/detect_disease": ("POST", "/detect_disease", "image"),
+}
+
+
+def tiny_png(size: int = 32) -> bytes:
+    """A solid green PNG built without PIL"""
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    raw = b"".join(b"\x00" + b"\x30\xa0\x30" * size for _ in range(size))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+def encode_body(body):
+    if body is None:
+        return b"", []
+    if body == "image":
+        boundary = "coldstartboundary"
+        payload = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"leaf.png\"\r\n"
+                   f"Content-Type: image/png\r\n\r\n").encode() + tiny_png() + f"\r\n--{boundary}--\r\n".encode()
+        return payload, [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())]
+    return json.dumps(body).encode(), [(b"content-type", b"application/json")]
+
+
+async def call_asgi(app, method: str, target: str, body) -> int:
+    path, _, query = target.partition("?")
+    payload, headers = encode_body(body)
+    headers += [(b"host", b"localhost"), (b"content-length", str(len(payload)).encode())]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 1), "server": ("localhost", 80),
+    }
+    sent = False
+    status = {}
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code", 0)
+
+
+def child(route: str) -> None:
+    method, target, body = ROUTES[route]
+    t0 = time.perf_counter()
+    sys.path.insert(0, API_DIR)
+    from index import app
+    imported = time.perf_counter()
+    code = asyncio.run(call_asgi(app, method, target, body))
+    done = time.perf_counter()
+    print(json.dumps({
+        "status": code,
+        "import_ms": round((imported - t0) * 1000, 1),
+        "first_request_ms": round((done - imported) * 1000, 1),
+        "loaded": [m for m in HEAVY if m in sys.modules],
+    }))
+
+
+def sample(route: str, env: dict) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", route], env=env, cwd=SERVICES_DIR,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5, help="fresh processes per route")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma-separated subset of routes")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the app, e.g. MARKET_DATA=dump.csv (repeatable)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    sys.path.insert(0, BENCH_DIR)
+    import stub_openweather
+
+    server, _, upstream = stub_openweather.start()
+    env = {**os.environ, "OPENWEATHER_API_KEY": "stub", "OPENWEATHER_BASE_URL": upstream,
+           "PYTHONDONTWRITEBYTECODE": "1", **dict(kv.split("=", 1) for kv in args.env)}
+    results = {}
+    try:
+        for route in args.routes.split(","):
+            runs = [sample(route, env) for _ in range(args.repeats)]
+            results[route] = {
+                "status": runs[-1]["status"],
+                "import_ms": round(statistics.median(r["import_ms"] for r in runs), 1),
+                "first_request_ms": round(statistics.median(r["first_request_ms"] for r in runs), 1),
+                "total_ms": round(statistics.median(r["import_ms"] + r["first_request_ms"] for r in runs), 1),
+                "loaded": runs[-1]["loaded"],
+            }
+    finally:
+        server.shutdown()
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Load test for /recommend_crop with and without server-side micro-batching.
+
+Trains a throwaway RandomForest into a temp MODELS_DIR, then boots the app
+twice (INFERENCE_BATCHING=0 and =1) and drives the same closed-loop load
+against each, reporting req/s and p50/p99 latency.
+
+With --direct the HTTP layer is skipped and coroutines call the handler path
+in-process, which isolates the scheduler when the load generator and server
+share too few cores for the HTTP numbers to mean much.
+
+    python services/benchmarks/bench_crop_batching.py --requests 2000 --concurrency 64
+    python services/benchmarks/bench_crop_batching.py --direct
+"""
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from _harness import SERVICES_DIR, start_app, stop_app, summarize, write_demo_crop_model
+
+sys.path.insert(0, SERVICES_DIR)
+
+import numpy as np
+
+from utils.crop_reco import predict_crops
+from utils.inference_queue import MicroBatcher
+
+
+async def drive(base: str, total: int, concurrency: int) -> dict:
+    rng = random.Random(0)
+    payloads = [
+        {"N": rng.uniform(20, 140), "P": rng.uniform(10, 70), "K": rng.uniform(10, 70),
+         "ph": rng.uniform(5, 8.5), "rainfall": rng.uniform(40, 300)}
+        for _ in range(total)
+    ]
+    samples = []
+    next_idx = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        for p in payloads[:20]:  # warm-up
+            await client.post("/recommend_crop", json=p)
+
+        async def worker():
+            for i in next_idx:
+                t0 = time.perf_counter()
+                r = await client.post("/recommend_crop", json=payloads[i])
+                r.raise_for_status()
+                samples.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+    return {"req_per_s": round(total / wall, 1), **summarize(samples)}
+
+
+async def drive_direct(model, total: int, concurrency: int, batched: bool, max_rows: int, wait_ms: float) -> dict:
+    def score(X):
+        scored = predict_crops(model, X)
+        return list(zip(scored["labels"].tolist(), scored["confidence"].tolist()))
+
+    batcher = MicroBatcher(score, max_rows=max_rows, max_wait_ms=wait_ms)
+    rows = np.random.default_rng(0).uniform([20, 10, 10, 5, 40], [140, 70, 70, 8.5, 300], (total, 5))
+    samples = []
+    next_idx = iter(range(total))
+
+    async def worker():
+        for i in next_idx:
+            t0 = time.perf_counter()
+            if batched:
+                await batcher.submit(rows[i])
+            else:
+                score(rows[i:i + 1])
+                await asyncio.sleep(0)
+            samples.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    await batcher.aclose()
+    return {"req_per_s": round(total / wall, 1), **summarize(samples), "batcher": batcher.stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/recommend_crop with vs without micro-batching")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--max-rows", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--direct", action="store_true", help="skip HTTP and drive the scheduler in-process")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    result = {"config": vars(args)}
+    with tempfile.TemporaryDirectory() as models_dir:
+        path = write_demo_crop_model(models_dir, args.trees)
+        for label, flag in (("inline", "0"), ("batched", "1")):
+            if args.direct:
+                with open(path, "rb") as f:
+                    model = pickle.load(f)
+                result[label] = asyncio.run(drive_direct(
+                    model, args.requests, args.concurrency, flag == "1", args.max_rows, args.wait_ms))
+                continue
+            proc, base = start_app({
+                "MODELS_DIR": models_dir,
+                "INFERENCE_BATCHING": flag,
+                "INFERENCE_BATCH_MAX_ROWS": str(args.max_rows),
+                "INFERENCE_BATCH_WAIT_MS": str(args.wait_ms),
+            })
+            try:
+                result[label] = asyncio.run(drive(base, args.requests, args.concurrency))
+            finally:
+                stop_app(proc)
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Images per second: one /detect_disease/batch call vs N sequential /detect_disease calls.
+
+    python services/benchmarks/bench_disease_batch.py --images 30 --width 2000 --height 1500
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from _harness import start_app, stop_app
+from bench_image_pipeline import make_photo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="batch vs sequential disease detection throughput")
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--width", type=int, default=2000)
+    parser.add_argument("--height", type=int, default=1500)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leaf.jpg")
+        make_photo(path, (args.width, args.height))
+        with open(path, "rb") as f:
+            photo = f.read()
+
+        proc, base = start_app()
+        try:
+            with httpx.Client(base_url=base, timeout=120) as client:
+                client.post("/detect_disease", files={"file": ("leaf.jpg", photo)}).raise_for_status()
+
+                t0 = time.perf_counter()
+                for i in range(args.images):
+                    client.post("/detect_disease", files={"file": (f"{i}.jpg", photo)}).raise_for_status()
+                sequential = time.perf_counter() - t0
+
+                files = [("files", (f"{i}.jpg", photo)) for i in range(args.images)]
+                t0 = time.perf_counter()
+                client.post("/detect_disease/batch", files=files).raise_for_status()
+                batched = time.perf_counter() - t0
+        finally:
+            stop_app(proc)
+
+    result = {
+        "config": vars(args),
+        "sequential_images_per_s": round(args.images / sequential, 1),
+        "batch_images_per_s": round(args.images / batched, 1),
+        "speedup": round(sequential / batched, 2),
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Throughput of the vectorised farming-window engine over many forecasts.
+
+Generates --pincodes varied 5-day forecasts (40 three-hour steps each, with
+rain, heat, wind and missing fields), checks that batch_windows() returns
+exactly what a slot-by-slot Python evaluation of the same rules returns, then
+times: the per-slot loop, farming_windows() called once per pincode, and one
+batch_windows() call over all of them (the batch advisory job's path).
+
+    python services/benchmarks/bench_farming_windows.py --pincodes 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import SERVICES_DIR
+
+sys.path.insert(0, SERVICES_DIR)
+
+from utils import farming_windows as fw
+
+STEPS = 40
+
+
+def make_forecasts(n: int, seed: int, start: int) -> list:
+    rng = random.Random(seed)
+    forecasts = []
+    for _ in range(n):
+        base, wet = rng.uniform(2, 40), rng.random()
+        items = []
+        for i in range(STEPS):
+            item = {"dt": start + i * fw.STEP_S, "wind": {"speed": round(rng.uniform(0, 18), 1)},
+                    "main": {"temp": round(base + rng.uniform(-6, 6), 1), "humidity": rng.randrange(20, 100)}}
+            if rng.random() < wet * 0.4:
+                item["rain"] = {"3h": round(rng.expovariate(1.0), 2)}
+            if rng.random() < 0.01:
+                del item["main"]["temp"]
+            items.append(item)
+        forecasts.append({"list": items, "city": {"timezone": rng.choice([19800, 19800, 20700])}})
+    return forecasts
+
+
+def scalar_windows(forecast: dict, now: float) -> dict:
+    """The engine's rules evaluated one slot at a time (reference)"""
+    slots = [it for it in forecast["list"] if it["dt"] + fw.STEP_S > now]
+    tz = forecast.get("city", {}).get("timezone", fw.IST_OFFSET_S)
+    rain = [it.get("rain", {}).get("3h", 0.0) for it in slots]
+    ratings = {a: [] for a in fw.ACTIVITIES}
+    for i, it in enumerate(slots):
+        temp = it["main"].get("temp", 25.0)
+        wind, humidity, r = it["wind"]["speed"], it["main"]["humidity"], rain[i]
+        hour = (it["dt"] + tz) // 3600 % 24
+        day = fw.DAYLIGHT[0] <= hour < fw.DAYLIGHT[1]
+        r6, r24 = sum(rain[i:i + 2]), sum(rain[i:i + 8])
+        if day and r6 < fw.DRY_MM and wind <= 6 and temp <= 30:
+            ratings["spraying"].append(fw.GOOD)
+        elif day and r < fw.DRY_MM and wind <= 10 and temp <= 35:
+            ratings["spraying"].append(fw.MODERATE)
+        else:
+            ratings["spraying"].append(fw.POOR)
+        if day and r < fw.DRY_MM and wind <= 15 and temp <= 32 and humidity < 85:
+            ratings["harvesting"].append(fw.GOOD)
+        elif day and r < fw.WET_MM and wind <= 15 and temp <= 38:
+            ratings["harvesting"].append(fw.MODERATE)
+        else:
+            ratings["harvesting"].append(fw.POOR)
+        if r24 < fw.HEAVY_RAIN_MM and r6 < fw.DRY_MM and temp <= 30 and wind <= 6:
+            ratings["irrigation"].append(fw.GOOD)
+        elif r6 < fw.WET_MM and temp <= 35:
+            ratings["irrigation"].append(fw.MODERATE)
+        else:
+            ratings["irrigation"].append(fw.POOR)
+    out = {}
+    for activity, rating in ratings.items():
+        out[activity] = []
+        i = 0
+        while i < len(rating):
+            j = i
+            while j + 1 < len(rating) and rating[j + 1] == rating[i]:
+                j += 1
+            if rating[i] >= fw.MODERATE:
+                out[activity].append({"start": fw._iso(slots[i]["dt"], tz),
+                                      "end": fw._iso(slots[j]["dt"] + fw.STEP_S, tz),
+                                      "rating": fw.RATINGS[rating[i]]})
+            i = j + 1
+    return out
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pincodes", type=int, default=5000)
+    parser.add_argument("--verify", type=int, default=1000, help="forecasts compared against the scalar path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    now = time.time()
+    # an hour-old cached forecast: its first slot has already ended
+    forecasts = make_forecasts(args.pincodes, args.seed, int(now) // fw.STEP_S * fw.STEP_S - fw.STEP_S)
+    n = min(args.verify, args.pincodes)
+    reference = [scalar_windows(f, now) for f in forecasts[:n]]
+    mismatches = sum(a != b for a, b in zip(reference, fw.batch_windows(forecasts[:n], now)))
+
+    scalar_s = timed(lambda: [scalar_windows(f, now) for f in forecasts])
+    single_s = timed(lambda: [fw.farming_windows(f, now) for f in forecasts])
+    batch_s = timed(lambda: fw.batch_windows(forecasts, now))
+    parse_s = timed(lambda: fw.stack_forecasts(forecasts))
+    rows, offsets, tz = fw.stack_forecasts(forecasts)
+    rate_s = timed(lambda: fw.rate_slots(rows, offsets, tz))
+    result = {
+        "pincodes": args.pincodes,
+        "slots": int(len(rows)),
+        "verified": n,
+        "mismatches": mismatches,
+        "scalar_ms": round(scalar_s * 1000, 1),
+        "per_pincode_ms": round(single_s * 1000, 1),
+        "batch_ms": round(batch_s * 1000, 1),
+        "batch_parse_ms": round(parse_s * 1000, 1),
+        "batch_rate_ms": round(rate_s * 1000, 2),
+        "batch_pincodes_per_s": round(args.pincodes / batch_s),
+        "speedup_vs_scalar": round(scalar_s / batch_s, 1),
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if mismatches:
+        sys.exit(f"{mismatches} forecasts differ from the scalar rules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Gazetteer lookup and nearest-neighbour speed on a full-size synthetic table.
+
+Generates --pincodes pincodes scattered over India's bounding box, builds
+and saves the gazetteer, then reports the memory-mapped load time, exact
+pincode lookups, prefix fallbacks and k-nearest queries. Every nearest-
+neighbour answer is checked against a brute-force haversine scan.
+
+    python services/benchmarks/bench_gazetteer.py --pincodes 19000 --queries 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import SERVICES_DIR
+
+sys.path.insert(0, SERVICES_DIR)
+
+import numpy as np
+
+from utils.gazetteer import Gazetteer, haversine_km
+
+
+def synthetic(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    pins = rng.sample(range(110001, 855999), n)
+    return [{"pincode": str(p), "latitude": rng.uniform(8, 34), "longitude": rng.uniform(69, 96),
+             "district": f"district{p // 1000}", "state": f"state{p // 100000}"} for p in pins]
+
+
+def per_call_us(fn, items) -> float:
+    t0 = time.perf_counter()
+    for item in items:
+        fn(item)
+    return round((time.perf_counter() - t0) / len(items) * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pincodes", type=int, default=19000, help="table size (India has ~19k)")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    records = synthetic(args.pincodes, args.seed)
+    t0 = time.perf_counter()
+    built = Gazetteer.build(records)
+    build_s = time.perf_counter() - t0
+    rng = random.Random(args.seed + 1)
+    with tempfile.TemporaryDirectory() as d:
+        built.save(d)
+        t0 = time.perf_counter()
+        g = Gazetteer.load(d)
+        load_ms = (time.perf_counter() - t0) * 1000
+
+        known = [r["pincode"] for r in rng.choices(records, k=args.queries)]
+        unknown = [str(int(p) // 1000 * 1000 + rng.randrange(1000)) for p in known]
+        points = [(rng.uniform(8, 34), rng.uniform(69, 96)) for _ in range(args.queries)]
+        g.lookup(known[0])
+
+        result = {
+            "pincodes": len(g),
+            "build_s": round(build_s, 3),
+            "load_ms": round(load_ms, 3),
+            "lookup_us": per_call_us(g.lookup, known),
+            "resolve_prefix_us": per_call_us(g.resolve, unknown),
+            "nearest_1_us": per_call_us(lambda p: g.nearest(*p, 1), points),
+            f"nearest_{args.k}_us": per_call_us(lambda p: g.nearest(*p, args.k), points),
+        }
+
+        lat, lon = np.asarray(g.lat), np.asarray(g.lon)
+        t0 = time.perf_counter()
+        mismatches = 0
+        for p in points[:1000]:
+            dist = haversine_km(p[0], p[1], lat, lon)
+            expected = np.sort(dist)[:args.k]
+            got = [r["distance_km"] for r in g.nearest(*p, args.k)]
+            mismatches += not np.allclose(got, expected, atol=0.01)
+        result["brute_force_us"] = round((time.perf_counter() - t0) / min(1000, len(points)) * 1e6, 3)
+        result["nearest_mismatches"] = mismatches
+
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if mismatches:
+        sys.exit(f"{mismatches} nearest-neighbour answers differ from the brute-force scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Latency and peak RSS of leaf-image preprocessing for 1, 12 and 48 MP photos.
+
+Compares the legacy path (read all bytes, full decode, convert, resize) with
+utils.image_pipeline.load_leaf_array (draft-mode JPEG decode from the spooled
+file). Each (pipeline, size) pair runs in a fresh process so the peak RSS is
+not polluted by earlier runs.
+
+    python services/benchmarks/bench_image_pipeline.py --repeat 5
+"""
+import argparse
+import io
+import json
+import multiprocessing as mp
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+SIZES = {"1MP": (1152, 864), "12MP": (4000, 3000), "48MP": (8000, 6000)}
+
+
+def make_photo(path: str, size: tuple) -> None:
+    import numpy as np
+    from PIL import Image
+
+    w, h = size
+    rng = np.random.default_rng(0)
+    base = np.zeros((h, w, 3), dtype=np.uint8)
+    base[..., 1] = np.linspace(60, 200, w, dtype=np.uint8)[None, :]
+    base[..., 0] = np.linspace(20, 120, h, dtype=np.uint8)[:, None]
+    base += rng.integers(0, 40, (h, w, 3), dtype=np.uint8)
+    Image.fromarray(base).save(path, "JPEG", quality=90)
+
+
+def legacy(path: str):
+    import numpy as np
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        img_bytes = f.read()
+    img = Image.open(io.BytesIO(img_bytes)).convert("RGB").resize((64, 64))
+    return np.array(img).astype(np.float32) / 255.0
+
+
+def streaming(path: str):
+    from utils.image_pipeline import load_leaf_array
+
+    with open(path, "rb") as f:
+        return load_leaf_array(f)
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss survives fork+exec on Linux, so prefer the per-mm high-water mark
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _child(pipeline: str, path: str, repeat: int, out) -> None:
+    fn = legacy if pipeline == "legacy" else streaming
+    import numpy  # noqa: F401  (import cost excluded from the RSS delta)
+    import PIL.Image  # noqa: F401
+    import utils.image_pipeline  # noqa: F401
+    base = peak_rss_kb()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(path)
+        samples.append(time.perf_counter() - t0)
+    peak = peak_rss_kb()
+    out.send({"median_ms": round(statistics.median(samples) * 1000, 2),
+              "peak_rss_mb": round(peak / 1024, 1),
+              "rss_growth_mb": round((peak - base) / 1024, 1)})
+
+
+def measure(pipeline: str, path: str, repeat: int) -> dict:
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_child, args=(pipeline, path, repeat, child))
+    proc.start()
+    result = parent.recv()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="leaf image preprocessing: latency and peak RSS")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma-separated subset of 1MP,12MP,48MP")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    result = {"config": vars(args)}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in args.sizes.split(","):
+            path = os.path.join(tmp, f"{label}.jpg")
+            make_photo(path, SIZES[label])
+            result[label] = {
+                "file_mb": round(os.path.getsize(path) / 1e6, 2),
+                "legacy": measure("legacy", path, args.repeat),
+                "streaming": measure("streaming", path, args.repeat),
+            }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
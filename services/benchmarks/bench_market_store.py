@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Query latency of the indexed MarketStore at several table sizes.
+
+Builds synthetic Agmarknet-shaped tables (crops x states x markets x days),
+checks every query shape against a brute-force NumPy scan, and reports
+p50/p99 latency per shape for one page of results. Also times CSV ingestion
+on a generated dump and the save/mmap-load round trip.
+
+With --analytics it also times the one-off build of the rolling aggregates,
+the incremental update for one new trading day, and mode=analytics queries
+(a single mandi series and a page of 50 mandis).
+
+    python services/benchmarks/bench_market_store.py --rows 10000,1000000,10000000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import SERVICES_DIR, summarize
+
+sys.path.insert(0, SERVICES_DIR)
+
+import numpy as np
+
+from utils.market_store import MarketStore
+
+N_CROPS, N_STATES, N_MARKETS, N_DAYS = 300, 30, 3000, 730
+DAY0 = 19_000
+
+
+def synthetic(rows: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    market = rng.integers(0, N_MARKETS, rows)
+    modal = rng.integers(800, 9000, rows).astype(np.float32)
+    return {
+        "crop": [f"crop{i}" for i in rng.integers(0, N_CROPS, rows)],
+        # every market belongs to one state, as in the real data
+        "state": [f"state{i}" for i in market % N_STATES],
+        "market": [f"market{i}" for i in market],
+        "date": (DAY0 + rng.integers(0, N_DAYS, rows)).astype(np.int32),
+        "min_price": modal - 100,
+        "max_price": modal + 100,
+        "modal_price": modal,
+    }
+
+
+def brute_force(store: MarketStore, crop=None, state=None, market=None, date_from=None, date_to=None):
+    mask = np.ones(len(store), dtype=bool)
+    for col, val in (("crop", crop), ("state", state), ("market", market)):
+        if val:
+            mask &= store.cols[col] == store.vocab[col].lookup(val)
+    d = store.cols["date"]
+    if date_from:
+        mask &= d >= date_from
+    if date_to:
+        mask &= d <= date_to
+    return np.flatnonzero(mask)
+
+
+def shapes(rng: random.Random):
+    m = rng.randrange(N_MARKETS)
+    crop, state, market = f"crop{rng.randrange(N_CROPS)}", f"state{m % N_STATES}", f"market{m}"
+    lo = DAY0 + rng.randrange(N_DAYS - 30)
+    return {
+        "crop": {"crop": crop},
+        "crop+state": {"crop": crop, "state": state},
+        "crop+state+market+30d": {"crop": crop, "state": state, "market": market, "date_from": lo, "date_to": lo + 29},
+        "state": {"state": state},
+        "market": {"market": market},
+        "crop+30d": {"crop": crop, "date_from": lo, "date_to": lo + 29},
+    }
+
+
+def bench_analytics(store: MarketStore, rows: int, queries: int, seed: int) -> dict:
+    t = time.perf_counter()
+    store.analytics
+    build = time.perf_counter() - t
+    day = synthetic(max(1, rows // N_DAYS), seed + 1)
+    day["date"][:] = DAY0 + N_DAYS
+    t = time.perf_counter()
+    store.add_columns(day, build=False)
+    update = time.perf_counter() - t
+
+    rng = random.Random(seed)
+    single, page = [], []
+    for _ in range(queries):
+        m = rng.randrange(N_MARKETS)
+        crop = f"crop{rng.randrange(N_CROPS)}"
+        t = time.perf_counter()
+        store.analytics_query(crop, market=f"market{m}")
+        single.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        store.analytics_query(crop, state=f"state{m % N_STATES}", limit=50)
+        page.append(time.perf_counter() - t)
+    return {
+        "build_seconds": round(build, 3),
+        "one_day_update_ms": round(update * 1000, 2),
+        "series": len(store.analytics.series),
+        "single_market": summarize(single),
+        "state_page": summarize(page),
+    }
+
+
+def bench_size(rows: int, queries: int, seed: int, analytics: bool = False) -> dict:
+    t0 = time.perf_counter()
+    store = MarketStore()
+    store.add_columns(synthetic(rows, seed))
+    build = time.perf_counter() - t0
+
+    rng = random.Random(seed)
+    for _ in range(5):
+        for filters in shapes(rng).values():
+            assert np.array_equal(store.select(**filters), brute_force(store, **filters)), filters
+
+    timings = {}
+    for _ in range(queries):
+        for name, filters in shapes(rng).items():
+            t = time.perf_counter()
+            store.query(limit=50, **filters)
+            timings.setdefault(name, []).append(time.perf_counter() - t)
+    report = {"rows": rows, "build_seconds": round(build, 3)}
+    report["queries"] = {name: summarize(samples) for name, samples in timings.items()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store.save(tmp)
+        t = time.perf_counter()
+        loaded = MarketStore.load(tmp)
+        report["mmap_load_ms"] = round((time.perf_counter() - t) * 1000, 2)
+        filters = shapes(rng)["crop+state"]
+        assert loaded.query(**filters) == store.query(**filters)
+    if analytics:
+        report["analytics"] = bench_analytics(store, rows, queries, seed)
+    return report
+
+
+def bench_csv(rows: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as f:
+        writer = csv.writer(f)
+        writer.writerow(["State", "District", "Market", "Commodity", "Variety", "Arrival_Date",
+                         "Min_x0020_Price", "Max_x0020_Price", "Modal_x0020_Price"])
+        for _ in range(rows):
+            m = rng.randrange(N_MARKETS)
+            modal = rng.randrange(800, 9000)
+            writer.writerow([f"state{m % N_STATES}", "-", f"market{m}", f"Crop{rng.randrange(N_CROPS)}", "Other",
+                             f"{rng.randrange(1, 29):02d}/{rng.randrange(1, 13):02d}/2025",
+                             modal - 100, modal + 100, modal])
+        path = f.name
+    try:
+        t = time.perf_counter()
+        store = MarketStore()
+        store.ingest_csv(path)
+        seconds = time.perf_counter() - t
+    finally:
+        os.remove(path)
+    return {"rows": rows, "seconds": round(seconds, 3), "rows_per_second": int(rows / seconds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="10000,1000000,10000000", help="comma-separated table sizes")
+    parser.add_argument("--queries", type=int, default=200, help="queries per shape and size")
+    parser.add_argument("--csv-rows", type=int, default=200_000, help="rows for the CSV ingestion timing (0 to skip)")
+    parser.add_argument("--analytics", action="store_true", help="also benchmark mode=analytics aggregates")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = {"sizes": [bench_size(int(n), args.queries, args.seed, args.analytics) for n in args.rows.split(",")]}
+    if args.csv_rows:
+        results["csv_ingest"] = bench_csv(args.csv_rows, args.seed)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
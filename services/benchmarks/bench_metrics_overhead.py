@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Cost of the /metrics instrumentation per request.
+
+In-process: calls a trivial ASGI app a million times bare and wrapped in
+MetricsMiddleware (route labelled as the router would) and reports the added
+microseconds per request, plus the cost of one histogram observation and of
+rendering /metrics.
+
+Over HTTP (unless --no-http): boots the app with METRICS_ENABLED=0 and =1 and
+drives the same closed-loop /health load against each.
+
+    python services/benchmarks/bench_metrics_overhead.py --calls 1000000 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from _harness import SERVICES_DIR, start_app, stop_app, summarize
+
+sys.path.insert(0, SERVICES_DIR)
+
+from utils.metrics import HTTP_LATENCY, REGISTRY, MetricsMiddleware
+
+
+class _Route:
+    path = "/bench"
+
+
+ROUTE = _Route()
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"ok"}
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = ROUTE
+    await send(START)
+    await send(BODY)
+
+
+async def _noop_send(message):
+    pass
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def per_call_seconds(app, calls: int) -> float:
+    scope = {"type": "http", "path": "/bench", "method": "GET"}
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        await app(dict(scope), _receive, _noop_send)
+    return (time.perf_counter() - t0) / calls
+
+
+def in_process(calls: int) -> dict:
+    bare = asyncio.run(per_call_seconds(endpoint, calls))
+    wrapped = asyncio.run(per_call_seconds(MetricsMiddleware(endpoint), calls))
+    child = HTTP_LATENCY.labels("/bench", "GET")
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        child.observe(0.003)
+    observe = (time.perf_counter() - t0) / calls
+    t0 = time.perf_counter()
+    body = REGISTRY.render()
+    render = time.perf_counter() - t0
+    return {
+        "bare_us": round(bare * 1e6, 3),
+        "instrumented_us": round(wrapped * 1e6, 3),
+        "overhead_us_per_request": round((wrapped - bare) * 1e6, 3),
+        "histogram_observe_ns": round(observe * 1e9, 1),
+        "render_ms": round(render * 1000, 3),
+        "render_bytes": len(body),
+    }
+
+
+async def drive(base: str, total: int, concurrency: int) -> dict:
+    samples = []
+    next_idx = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        for _ in range(50):  # warm-up
+            await client.get("/health")
+
+        async def worker():
+            for _ in next_idx:
+                t0 = time.perf_counter()
+                (await client.get("/health")).raise_for_status()
+                samples.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+    return {"req_per_s": round(total / wall, 1), **summarize(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000, help="in-process ASGI calls per variant")
+    parser.add_argument("--requests", type=int, default=5000, help="HTTP requests per variant")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--no-http", action="store_true", help="only run the in-process measurement")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    result = {"in_process": in_process(args.calls)}
+    if not args.no_http:
+        for label, flag in (("metrics_off", "0"), ("metrics_on", "1")):
+            proc, base = start_app({"METRICS_ENABLED": flag})
+            try:
+                result[label] = asyncio.run(drive(base, args.requests, args.concurrency))
+            finally:
+                stop_app(proc)
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
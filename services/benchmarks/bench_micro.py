@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the per-request hot paths, without HTTP.
+
+Times fertilizer_plan, get_prices (mock store and, with --market-rows, a
+synthetic Agmarknet-sized one), simple_alerts and leaf-image preprocessing
+(load_leaf_array on JPEGs of several sizes). Each case runs --rounds rounds
+of enough calls to last ~--round-ms; the median round is reported, with the
+best round alongside to show the noise floor.
+
+    python services/benchmarks/bench_micro.py --json micro.json
+    python services/benchmarks/bench_micro.py --compare micro.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stub_openweather
+from _harness import SERVICES_DIR, compare_results, run_metadata
+
+sys.path.insert(0, SERVICES_DIR)
+
+IMAGE_SIZES = {"1MP": (1152, 864), "4MP": (2304, 1728), "12MP": (4000, 3000)}
+
+
+def measure(fn, rounds: int, round_ms: float) -> dict:
+    """Median and best time per call; calls per round calibrated to round_ms"""
+    fn()
+    n, t0 = 1, time.perf_counter()
+    while True:
+        for _ in range(n):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= round_ms / 1000 / 10 or n >= 1 << 20:
+            break
+        n *= 2
+        t0 = time.perf_counter()
+    loops = max(1, int(n * (round_ms / 1000) / max(elapsed, 1e-9)))
+    per_call = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - t0) / loops)
+    median = statistics.median(per_call)
+    return {"loops": loops, "us_per_op": round(median * 1e6, 3), "best_us": round(min(per_call) * 1e6, 3),
+            "ops_per_s": round(1 / median, 1)}
+
+
+def cycle(items):
+    it = iter(range(1 << 62))
+    return lambda: items[next(it) % len(items)]
+
+
+def bench_fertilizer(rounds, round_ms) -> dict:
+    from utils.soil_helper import fertilizer_plan
+
+    rng = random.Random(0)
+    cases = [(rng.choice(["rice", "wheat", "maize", "cotton", "sugarcane"]),
+              {"N": rng.uniform(0, 200), "P": rng.uniform(0, 100), "K": rng.uniform(0, 100), "ph": rng.uniform(4, 9)})
+             for _ in range(1024)]
+    pick = cycle(cases)
+    return measure(lambda: fertilizer_plan(*pick()), rounds, round_ms)
+
+
+def bench_prices(rounds, round_ms, market_rows: int) -> dict:
+    from utils import market_api
+
+    out = {"mock": measure(lambda: market_api.get_prices(crop="wheat"), rounds, round_ms)}
+    if market_rows:
+        from bench_market_store import DAY0, N_CROPS, N_MARKETS, N_STATES, synthetic
+        from utils.market_store import MarketStore
+
+        store = MarketStore()
+        store.add_columns(synthetic(market_rows, 0))
+        market_api._store = store
+        rng = random.Random(0)
+        queries = []
+        for _ in range(1024):
+            m = rng.randrange(N_MARKETS)
+            # ISO dates, as /market receives them
+            first = date(1970, 1, 1) + timedelta(days=DAY0 + rng.randrange(700))
+            queries.append({"crop": f"crop{rng.randrange(N_CROPS)}", "state": f"state{m % N_STATES}",
+                            "date_from": first.isoformat(), "date_to": (first + timedelta(days=29)).isoformat()})
+        pick = cycle(queries)
+        out[f"{market_rows}_rows"] = measure(lambda: market_api.get_prices(**pick()), rounds, round_ms)
+        market_api._store = None
+    return out
+
+
+def bench_alerts(rounds, round_ms) -> dict:
+    from utils.weather_api import AsyncWeatherClient
+
+    rng = random.Random(0)
+    payloads = []
+    for i in range(256):
+        p = stub_openweather.current_payload(str(110001 + i))
+        p["main"]["temp"] = rng.uniform(0, 45)
+        p["wind"]["speed"] = rng.uniform(0, 20)
+        if rng.random() < 0.3:
+            p["rain"] = {"1h": rng.uniform(0, 5)}
+        payloads.append(p)
+    pick = cycle(payloads)
+    return measure(lambda: AsyncWeatherClient.simple_alerts(pick()), rounds, round_ms)
+
+
+def bench_images(rounds, round_ms) -> dict:
+    import numpy as np
+    from PIL import Image
+
+    from utils.image_pipeline import load_leaf_array
+
+    out = {}
+    rng = np.random.default_rng(0)
+    for label, (w, h) in IMAGE_SIZES.items():
+        img = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(img).save(buf, "JPEG", quality=90)
+        data = buf.getvalue()
+        out[label] = measure(lambda: load_leaf_array(io.BytesIO(data)), rounds, round_ms)
+    return out
+
+
+CASES = ("fertilizer_plan", "get_prices", "simple_alerts", "image_preprocess")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of " + ", ".join(CASES))
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--round-ms", type=float, default=200.0)
+    parser.add_argument("--market-rows", type=int, default=1_000_000, help="synthetic store size (0 to skip)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before flagging (fraction)")
+    args = parser.parse_args()
+
+    cases = args.cases.split(",")
+    result = {"meta": run_metadata(), "config": vars(args)}
+    if "fertilizer_plan" in cases:
+        result["fertilizer_plan"] = bench_fertilizer(args.rounds, args.round_ms)
+    if "get_prices" in cases:
+        result["get_prices"] = bench_prices(args.rounds, args.round_ms, args.market_rows)
+    if "simple_alerts" in cases:
+        result["simple_alerts"] = bench_alerts(args.rounds, args.round_ms)
+    if "image_preprocess" in cases:
+        result["image_preprocess"] = bench_images(args.rounds, args.round_ms)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(result, json.load(f), args.tolerance)
+        result["regressions"] = regressions
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if regressions:
+        sys.exit(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
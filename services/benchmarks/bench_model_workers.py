@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Model load time and per-worker memory for N worker processes.
+
+Writes the same demo model as crop_model.pkl and crop_model.joblib, then
+starts N processes per format that each load it through ModelRegistry and
+hold it while RSS and PSS (proportional set size, which splits shared pages
+between processes) are sampled. Joblib + mmap_mode only shares plain numpy
+attributes; sklearn trees copy their nodes on unpickle, so compare --family
+rf with --family knn.
+
+    python services/benchmarks/bench_model_workers.py --workers 4,16 --family knn
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+
+def write_models(models_dir: str, family: str, rows: int) -> None:
+    import pickle
+
+    import joblib
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform([20, 10, 10, 5, 40], [140, 70, 70, 8.5, 300], (rows, 5))
+    y = np.array(["rice", "wheat", "maize", "cotton"])[rng.integers(0, 4, rows)]
+    if family == "rf":
+        from sklearn.ensemble import RandomForestClassifier
+        model = RandomForestClassifier(n_estimators=200, random_state=0).fit(X, y)
+    else:
+        from sklearn.neighbors import KNeighborsClassifier
+        model = KNeighborsClassifier(n_neighbors=15, algorithm="brute").fit(X, y)
+    with open(os.path.join(models_dir, "pkl", "crop_model.pkl"), "wb") as f:
+        pickle.dump(model, f)
+    joblib.dump(model, os.path.join(models_dir, "joblib", "crop_model.joblib"))
+
+
+def memory_kb() -> dict:
+    out = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key = line.split(":")[0]
+            if key in ("Rss", "Pss"):
+                out[key.lower()] = int(line.split()[1])
+    return out
+
+
+def _worker(models_dir: str, ready, release, out) -> None:
+    import numpy  # noqa: F401  (import cost is not model load cost)
+    import sklearn.ensemble  # noqa: F401
+    import sklearn.neighbors  # noqa: F401
+    from utils.model_registry import ModelRegistry
+
+    registry = ModelRegistry(models_dir)
+    registry.register("crop", "crop_model")
+    t0 = time.perf_counter()
+    model = registry.get("crop")
+    load = time.perf_counter() - t0
+    model.predict([[90, 42, 43, 6.4, 120]])  # touch the weights
+    ready.wait()
+    out.put({"load_s": load, **memory_kb()})
+    release.wait()
+
+
+def measure(models_dir: str, workers: int) -> dict:
+    ctx = mp.get_context("spawn")
+    ready = ctx.Barrier(workers + 1)
+    release = ctx.Event()
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(models_dir, ready, release, out)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    rows = [out.get() for _ in range(workers)]
+    release.set()
+    for p in procs:
+        p.join()
+    return {
+        "load_ms_median": round(statistics.median(r["load_s"] for r in rows) * 1000, 2),
+        "rss_mb_per_worker": round(statistics.mean(r["rss"] for r in rows) / 1024, 1),
+        "pss_mb_per_worker": round(statistics.mean(r["pss"] for r in rows) / 1024, 1),
+        "pss_mb_total": round(sum(r["pss"] for r in rows) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="model load time and per-worker memory")
+    parser.add_argument("--workers", default="4,16")
+    parser.add_argument("--family", choices=("rf", "knn"), default="knn")
+    parser.add_argument("--rows", type=int, default=500000, help="training rows (drives model size)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    result = {"config": vars(args)}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("pkl", "joblib"):
+            os.makedirs(os.path.join(tmp, fmt))
+        write_models(tmp, args.family, args.rows)
+        for fmt in ("pkl", "joblib"):
+            path = os.path.join(tmp, fmt)
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            result[fmt] = {"artifact_mb": round(size / 1e6, 2)}
+            for n in (int(w) for w in args.workers.split(",")):
+                result[fmt][f"{n}_workers"] = measure(path, n)
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint JSON serialisation cost: FastAPI's default path vs render_json.
+
+Calls every JSON route once in-process (OpenWeather stub, demo crop model,
+generated leaf photos) to capture the payload it really returns, then times
+turning that payload into response bytes both ways:
+
+- default: what a route returning a dict costs under FastAPI's stock
+  JSONResponse (jsonable_encoder walk + stdlib json.dumps)
+- render_json: utils.http_cache.render_json as routes now use it (orjson on
+  the payload as built, when installed)
+
+and, for the static routes (/ and /languages), rebuilding the response per
+request against StaticJSON's prebuilt body and headers. Each case reports
+the median time per call (see bench_micro.py) and the body size.
+
+    python services/benchmarks/bench_serialization.py --json ser.json
+    python services/benchmarks/bench_serialization.py --compare ser.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stub_openweather
+from _harness import SERVICES_DIR, compare_results, run_metadata, write_demo_crop_model
+from bench_micro import measure
+from bench_suite import make_photos, soil
+
+sys.path.insert(0, SERVICES_DIR)
+
+
+def fastapi_default(content) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def capture(args) -> dict:
+    """The JSON each route returns, keyed by a short endpoint name"""
+    from fastapi.testclient import TestClient
+
+    from app import app
+
+    rng = random.Random(args.seed)
+    rows = [{**soil(rng), "crop": rng.choice(["rice", "wheat", "cotton"])} for _ in range(args.batch_rows)]
+    photos = make_photos(tempfile.gettempdir(), 4, args.seed)
+    calls = {
+        "root": ("GET", "/", {}),
+        "languages": ("GET", "/languages", {}),
+        "recommend_crop": ("POST", "/recommend_crop", {"json": {**soil(rng), "location": "110001"}}),
+        "recommend_fertilizer": ("POST", "/recommend_fertilizer", {"json": rows[0]}),
+        "recommend_crop_batch": ("POST", "/recommend_crop/batch", {"json": rows}),
+        "recommend_fertilizer_batch": ("POST", "/recommend_fertilizer/batch", {"json": rows}),
+        "detect_disease": ("POST", "/detect_disease", {"files": {"file": ("leaf.jpg", photos[0], "image/jpeg")}}),
+        "detect_disease_batch": ("POST", "/detect_disease/batch",
+                                 {"files": [("files", (f"leaf{i}.jpg", p, "image/jpeg")) for i, p in enumerate(photos)]}),
+        "weather": ("GET", "/weather", {"params": {"pincode": "110001"}}),
+        "weather_simple": ("GET", "/weather/simple", {"params": {"pincode": "110001"}}),
+        "market": ("GET", "/market", {"params": {"crop": "wheat"}}),
+        "locate": ("GET", "/locate", {"params": {"q": "110001", "k": 5}}),
+        "health": ("GET", "/health", {}),
+    }
+    payloads = {}
+    with TestClient(app) as client:
+        for name, (method, url, kwargs) in calls.items():
+            r = client.request(method, url, **kwargs)
+            if r.status_code != 200:
+                raise RuntimeError(f"{url} returned {r.status_code}: {r.text[:200]}")
+            payloads[name] = r.json()
+    return payloads
+
+
+def bench_static(rounds, round_ms, payloads) -> dict:
+    from starlette.requests import Request
+
+    from utils.http_cache import StaticJSON, cached_json
+
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"accept", b"*/*")]})
+    out = {}
+    for name in ("root", "languages"):
+        static = StaticJSON(payloads[name])
+        out[name] = {
+            "per_request_default": measure(lambda: fastapi_default(payloads[name]), rounds, round_ms),
+            "per_request_cached_json": measure(lambda: cached_json(request, payloads[name], 86400), rounds, round_ms),
+            "static": measure(lambda: static.respond(request), rounds, round_ms),
+        }
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-rows", type=int, default=1000, help="rows in the batch route payloads")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--round-ms", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before flagging (fraction)")
+    args = parser.parse_args()
+
+    server, _, upstream = stub_openweather.start(delay=0)
+    try:
+        with tempfile.TemporaryDirectory() as models_dir:
+            write_demo_crop_model(models_dir)
+            os.environ.update({"OPENWEATHER_API_KEY": "stub", "OPENWEATHER_BASE_URL": upstream,
+                               "MODELS_DIR": models_dir, "INFERENCE_BATCHING": "0"})
+            payloads = capture(args)
+    finally:
+        server.shutdown()
+
+    from utils.http_cache import orjson, render_json
+
+    result = {"meta": run_metadata(), "config": vars(args), "orjson": orjson is not None and orjson.__version__,
+              "endpoints": {}}
+    for name, payload in payloads.items():
+        default = measure(lambda: fastapi_default(payload), args.rounds, args.round_ms)
+        fast = measure(lambda: render_json(payload), args.rounds, args.round_ms)
+        if json.loads(render_json(payload)) != json.loads(fastapi_default(payload)):
+            sys.exit(f"{name}: render_json and the default encoder disagree")
+        result["endpoints"][name] = {
+            "body_bytes": len(render_json(payload)),
+            "default": default,
+            "render_json": fast,
+            "speedup": round(default["us_per_op"] / fast["us_per_op"], 1),
+        }
+    result["static"] = bench_static(args.rounds, args.round_ms, payloads)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(result, json.load(f), args.tolerance)
+        result["regressions"] = regressions
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if regressions:
+        sys.exit(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Throughput of the vectorised fertilizer engine against the per-sample loop.
+
+Generates random soil cards (including out-of-range and missing values and
+crops outside FERTILIZER_GUIDE), checks that fertilizer_plans() serialises
+byte-for-byte like fertilizer_plan() on a verification slice, then times both
+paths.
+
+    python services/benchmarks/bench_soil_engine.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import SERVICES_DIR
+
+sys.path.insert(0, SERVICES_DIR)
+
+import numpy as np
+
+from utils.soil_engine import SOIL_KEYS, fertilizer_batch_response, fertilizer_plans
+from utils.soil_helper import fertilizer_plan
+
+CROPS = ["rice", "Wheat", "MAIZE", "cotton", "sugarcane"]
+
+
+def make_samples(rows: int, seed: int):
+    rng = np.random.default_rng(seed)
+    ranges = {"ph": (4.0, 9.0), "N": (0, 200), "P": (0, 100), "K": (0, 100)}
+    values = np.column_stack([rng.uniform(*ranges[k], rows) for k in SOIL_KEYS]).round(1)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    crops = [CROPS[i] for i in rng.integers(0, len(CROPS), rows)]
+    return crops, values
+
+
+def as_dict(row) -> dict:
+    return {k: float(v) for k, v in zip(SOIL_KEYS, row) if not np.isnan(v)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--verify", type=int, default=100_000, help="rows compared against the scalar path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    crops, values = make_samples(args.rows, args.seed)
+    n = min(args.verify, args.rows)
+    dicts = [as_dict(row) for row in values[:n]]
+
+    t0 = time.perf_counter()
+    reference = [fertilizer_plan(c, s) for c, s in zip(crops[:n], dicts)]
+    scalar = time.perf_counter() - t0
+    fast = fertilizer_plans(crops[:n], values[:n])
+    mismatches = sum(json.dumps(a) != json.dumps(b) for a, b in zip(reference, fast))
+
+    t0 = time.perf_counter()
+    fertilizer_plans(crops, values)
+    engine = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fertilizer_batch_response(crops, values)
+    response = time.perf_counter() - t0
+
+    print(json.dumps({
+        "rows": args.rows,
+        "verified_rows": n,
+        "mismatches": mismatches,
+        "scalar_us_per_row": round(scalar / n * 1e6, 2),
+        "engine_seconds": round(engine, 3),
+        "engine_us_per_row": round(engine / args.rows * 1e6, 3),
+        "batch_response_seconds": round(response, 3),
+        "speedup": round((scalar / n) / (engine / args.rows), 1),
+    }, indent=2))
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
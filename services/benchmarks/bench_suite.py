@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Reproducible load test: every endpoint alone, then a realistic mix.
+
+Boots the app under uvicorn (or in-process through httpx's ASGI transport
+with --in-process) against the local OpenWeather stub, a demo crop model and
+a set of generated leaf photos. Each endpoint is first driven on its own to
+get throughput, p50/p95/p99 and the server's peak RSS, then a weighted mix
+(crop/fertilizer/weather/market/disease) runs at the same concurrency.
+Requests are generated from --seed, so two runs send identical traffic.
+
+Results are saved as JSON; --compare flags any latency/throughput/RSS that
+got worse than a previous run by more than --tolerance (exit code 1).
+
+    python services/benchmarks/bench_suite.py --json baseline.json
+    python services/benchmarks/bench_suite.py --json new.json --compare baseline.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+import stub_openweather
+from _harness import (
+    RssSampler,
+    SERVICES_DIR,
+    compare_results,
+    run_metadata,
+    start_app,
+    stop_app,
+    summarize,
+    write_demo_crop_model,
+)
+
+CROPS = ["rice", "wheat", "maize", "cotton", "sugarcane"]
+MARKET_CROPS = ["wheat", "cotton", "tomato", "soybean", "rice"]
+DEFAULT_MIX = "crop=30,fertilizer=25,market=20,weather=15,disease=10"
+# photo sizes a phone upload might have after (or without) client-side downscaling
+PHOTO_SIZES = [(1024, 768), (1600, 1200), (4000, 3000)]
+
+
+def make_photos(directory: str, count: int, seed: int) -> list:
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    photos = []
+    for i in range(count):
+        w, h = PHOTO_SIZES[i % len(PHOTO_SIZES)]
+        img = np.zeros((h, w, 3), dtype=np.uint8)
+        img[..., 1] = rng.integers(60, 200)
+        img[..., 0] = np.linspace(20, 160, w, dtype=np.uint8)[None, :]
+        img += rng.integers(0, 40, (h, w, 3), dtype=np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(img).save(buf, "JPEG", quality=88)
+        photos.append(buf.getvalue())
+    return photos
+
+
+def soil(rng: random.Random) -> dict:
+    return {"N": round(rng.uniform(20, 140), 1), "P": round(rng.uniform(10, 70), 1),
+            "K": round(rng.uniform(10, 70), 1), "ph": round(rng.uniform(5, 8.5), 2),
+            "rainfall": round(rng.uniform(40, 300), 1)}
+
+
+def make_request(endpoint: str, rng: random.Random, photos: list, pincodes: list) -> tuple:
+    if endpoint == "crop":
+        return endpoint, "POST", "/recommend_crop", {"json": soil(rng)}
+    if endpoint == "fertilizer":
+        return endpoint, "POST", "/recommend_fertilizer", {"json": {**soil(rng), "crop": rng.choice(CROPS)}}
+    if endpoint == "weather":
+        # 80% of traffic from 10% of pincodes, like a few busy districts
+        hot = pincodes[: len(pincodes) // 10]
+        return endpoint, "GET", "/weather", {"params": {"pincode": rng.choice(hot if rng.random() < 0.8 else pincodes)}}
+    if endpoint == "market":
+        return endpoint, "GET", "/market", {"params": {"crop": rng.choice(MARKET_CROPS)}}
+    if endpoint == "disease":
+        photo = rng.choice(photos)
+        return endpoint, "POST", "/detect_disease", {"files": {"file": ("leaf.jpg", photo, "image/jpeg")}}
+    raise ValueError(f"unknown endpoint {endpoint}")
+
+
+def plan(endpoints: list, weights: list, total: int, seed: int, photos: list, pincodes: list) -> list:
+    rng = random.Random(seed)
+    return [make_request(rng.choices(endpoints, weights)[0], rng, photos, pincodes) for _ in range(total)]
+
+
+async def drive(client: httpx.AsyncClient, requests: list, concurrency: int) -> dict:
+    results = {}
+    errors = {}
+    it = iter(requests)
+
+    async def worker():
+        for endpoint, method, url, kwargs in it:
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, url, **kwargs)
+                ok = r.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            results.setdefault(endpoint, []).append(time.perf_counter() - t0)
+            if not ok:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    per_endpoint = {
+        ep: {"req_per_s": round(len(samples) / wall, 1), "errors": errors.get(ep, 0), **summarize(samples)}
+        for ep, samples in sorted(results.items())
+    }
+    everything = [s for samples in results.values() for s in samples]
+    return {"overall": {"req_per_s": round(len(everything) / wall, 1),
+                        "errors": sum(errors.values()), **summarize(everything)},
+            "endpoints": per_endpoint}
+
+
+async def run_phases(client, pid: int, args, endpoints, weights, photos, pincodes) -> dict:
+    # warm-up: first use of each route pays lazy imports and model loading
+    warm = [make_request(ep, random.Random(0), photos, pincodes) for ep in endpoints]
+    await drive(client, warm, 1)
+    report = {}
+    if not args.skip_isolated:
+        report["isolated"] = {}
+        for i, ep in enumerate(endpoints):
+            requests = plan([ep], [1], args.requests, args.seed + i, photos, pincodes)
+            with RssSampler(pid) as rss:
+                result = await drive(client, requests, args.concurrency)
+            report["isolated"][ep] = {**result["overall"], "peak_rss_mb": rss.peak_mb}
+    requests = plan(endpoints, weights, args.mixed_requests, args.seed, photos, pincodes)
+    with RssSampler(pid) as rss:
+        report["mixed"] = await drive(client, requests, args.concurrency)
+    report["mixed"]["overall"]["peak_rss_mb"] = rss.peak_mb
+    return report
+
+
+def app_env(args, models_dir: str, upstream: str) -> dict:
+    env = {"OPENWEATHER_API_KEY": "stub", "OPENWEATHER_BASE_URL": upstream}
+    if models_dir:
+        env["MODELS_DIR"] = models_dir
+    return env
+
+
+async def in_process(args, env, endpoints, weights, photos, pincodes) -> dict:
+    os.environ.update(env)
+    sys.path.insert(0, SERVICES_DIR)
+    from app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        return await run_phases(client, os.getpid(), args, endpoints, weights, photos, pincodes)
+
+
+async def over_http(base: str, pid: int, args, endpoints, weights, photos, pincodes) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        return await run_phases(client, pid, args, endpoints, weights, photos, pincodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs for the mixed phase")
+    parser.add_argument("--requests", type=int, default=500, help="requests per isolated endpoint phase")
+    parser.add_argument("--mixed-requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--images", type=int, default=12, help="distinct leaf photos in the disease pool")
+    parser.add_argument("--pincodes", type=int, default=200, help="distinct pincodes in the weather pool")
+    parser.add_argument("--upstream-delay", type=float, default=0.05, help="stub OpenWeather latency (s)")
+    parser.add_argument("--no-model", action="store_true", help="serve /recommend_crop from the heuristic")
+    parser.add_argument("--in-process", action="store_true", help="call the ASGI app directly instead of uvicorn")
+    parser.add_argument("--skip-isolated", action="store_true", help="only run the mixed phase")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before flagging (fraction)")
+    args = parser.parse_args()
+
+    pairs = [kv.split("=") for kv in args.mix.split(",")]
+    endpoints, weights = [k for k, _ in pairs], [float(v) for _, v in pairs]
+    photos = make_photos(tempfile.gettempdir(), args.images, args.seed)
+    pincodes = [str(110001 + i) for i in range(args.pincodes)]
+
+    server, _, upstream = stub_openweather.start(delay=args.upstream_delay)
+    result = {"meta": run_metadata(), "config": vars(args)}
+    try:
+        with tempfile.TemporaryDirectory() as models_dir:
+            if not args.no_model:
+                write_demo_crop_model(models_dir)
+            env = app_env(args, None if args.no_model else models_dir, upstream)
+            if args.in_process:
+                result.update(asyncio.run(in_process(args, env, endpoints, weights, photos, pincodes)))
+            else:
+                proc, base = start_app(env)
+                try:
+                    result.update(asyncio.run(over_http(base, proc.pid, args, endpoints, weights, photos, pincodes)))
+                finally:
+                    stop_app(proc)
+    finally:
+        server.shutdown()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(result, json.load(f), args.tolerance)
+        result["regressions"] = regressions
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if regressions:
+        sys.exit(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
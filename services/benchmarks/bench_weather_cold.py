@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+End-to-end /weather latency for cold pincodes against a slow upstream.
+
+Each request uses a pincode the app has not seen, so every call pays the full
+upstream cost. Also reports upstream round trips per call for
+get_detailed_forecast on a cold and a warm pincode.
+
+    python services/benchmarks/bench_weather_cold.py --requests 20 --delay 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import httpx
+
+import stub_openweather
+from _harness import start_app, stop_app, summarize
+from utils.weather_api import AsyncWeatherClient
+
+
+def cold_weather(base: str, n: int) -> list:
+    samples = []
+    with httpx.Client(base_url=base, timeout=60) as client:
+        for i in range(n):
+            t0 = time.perf_counter()
+            client.get("/weather", params={"pincode": str(500001 + i)}).raise_for_status()
+            samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def detailed_round_trips(upstream: str, state) -> dict:
+    client = AsyncWeatherClient(api_key="stub", base_url=upstream)
+    try:
+        out = {}
+        for label in ("cold", "warm"):
+            before = sum(state.hits.values())
+            t0 = time.perf_counter()
+            await client.get_detailed_forecast("600001")
+            out[label] = {"upstream_calls": sum(state.hits.values()) - before,
+                          "latency_ms": round((time.perf_counter() - t0) * 1000, 2)}
+        return out
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/weather latency for cold pincodes")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.3, help="stub upstream latency (s)")
+    parser.add_argument("--no-onecall", action="store_true", help="make /onecall 404 to force fallback")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    server, state, upstream = stub_openweather.start(delay=args.delay, onecall=not args.no_onecall)
+    proc, base = start_app({"OPENWEATHER_API_KEY": "stub", "OPENWEATHER_BASE_URL": upstream})
+    try:
+        weather = summarize(cold_weather(base, args.requests))
+        weather_hits = dict(state.hits)
+        detailed = asyncio.run(detailed_round_trips(upstream, state))
+    finally:
+        stop_app(proc)
+        server.shutdown()
+    result = {"weather_cold": weather, "weather_upstream_hits": weather_hits,
+              "detailed_forecast": detailed, "config": vars(args)}
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+/health latency while /weather calls are in flight against a slow upstream.
+
+Boots the app against the local OpenWeather stub, fires N concurrent /weather
+requests and probes /health every few milliseconds until they finish. With a
+blocking weather client the /health p99 approaches the upstream delay; with
+the async client it should stay in the low milliseconds.
+
+    python services/benchmarks/bench_weather_loop.py --concurrency 200 --delay 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+import stub_openweather
+from _harness import start_app, stop_app, summarize
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    samples = []
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await client.get("/health")
+        samples.append(time.perf_counter() - t0)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def run(base: str, concurrency: int, interval: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 10)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as weather_http, \
+            httpx.AsyncClient(base_url=base, timeout=60) as health_http:
+        idle = [await probe_health_once(health_http) for _ in range(50)]
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(health_http, stop, interval))
+        t0 = time.perf_counter()
+
+        async def one(i: int) -> float:
+            s = time.perf_counter()
+            r = await weather_http.get("/weather", params={"pincode": str(390001 + i)})
+            r.raise_for_status()
+            return time.perf_counter() - s
+
+        weather = await asyncio.gather(*(one(i) for i in range(concurrency)))
+        wall = time.perf_counter() - t0
+        stop.set()
+        loaded = await prober
+    return {
+        "health_idle": summarize(idle),
+        "health_under_load": summarize(loaded),
+        "weather": summarize(weather),
+        "weather_wall_s": round(wall, 3),
+    }
+
+
+async def probe_health_once(client: httpx.AsyncClient) -> float:
+    t0 = time.perf_counter()
+    await client.get("/health")
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/health p99 under concurrent /weather load")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.5, help="stub upstream latency (s)")
+    parser.add_argument("--interval", type=float, default=0.005, help="/health probe interval (s)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    server, state, upstream = stub_openweather.start(delay=args.delay)
+    proc, base = start_app({"OPENWEATHER_API_KEY": "stub", "OPENWEATHER_BASE_URL": upstream})
+    try:
+        result = asyncio.run(run(base, args.concurrency, args.interval))
+    finally:
+        stop_app(proc)
+        server.shutdown()
+    result["config"] = vars(args)
+    result["upstream_hits"] = dict(state.hits)
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
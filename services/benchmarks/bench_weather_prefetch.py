@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Morning-peak /weather latency with and without the background prefetcher.
+
+Replays a "yesterday" of Zipf-skewed traffic into the popularity tracker,
+then sends a morning burst (same skew, new seed) to an empty cache twice
+against the local OpenWeather stub:
+
+- cold: every first request per pincode waits for the upstream
+- prefetched: one WeatherPrefetcher cycle runs first, paced by the quota
+  token bucket, then the same burst
+
+Reports burst p50/p95/p99 overall and separately for the --top pincodes the
+prefetcher warms and the long tail it does not, the cache hit ratio and
+upstream calls, plus how many calls the prefetch cycle made against what the
+bucket allowed.
+
+    python services/benchmarks/bench_weather_prefetch.py --pincodes 1000 --top 500 --delay 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stub_openweather
+from _harness import SERVICES_DIR, summarize
+
+sys.path.insert(0, SERVICES_DIR)
+
+from utils.weather_api import AsyncWeatherClient
+from utils.weather_cache import WeatherCache
+from utils.weather_prefetch import Popularity, TokenBucket, WeatherPrefetcher
+
+
+def zipf_traffic(pincodes: list, n: int, s: float, seed: int) -> list:
+    weights = [1 / (i + 1) ** s for i in range(len(pincodes))]
+    return random.Random(seed).choices(pincodes, weights, k=n)
+
+
+async def burst(client: AsyncWeatherClient, traffic: list, concurrency: int, hot: set) -> dict:
+    samples = []
+    it = iter(traffic)
+
+    async def worker():
+        for pincode in it:
+            t0 = time.perf_counter()
+            await client.get_agricultural_summary(pincode)
+            samples.append((pincode, time.perf_counter() - t0))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {
+        **summarize([t for _, t in samples]),
+        "hot_pincodes": summarize([t for p, t in samples if p in hot]),
+        "tail_pincodes": summarize([t for p, t in samples if p not in hot]),
+        "hot_share": round(sum(p in hot for p, _ in samples) / len(samples), 4),
+    }
+
+
+def upstream_calls(state) -> int:
+    with state.lock:
+        return sum(state.hits.values())
+
+
+async def scenario(args, upstream: str, state, popularity: Popularity, morning: list, prefetch: bool) -> dict:
+    quota = TokenBucket.per_minute(args.quota_per_min, burst=args.quota_burst)
+    client = AsyncWeatherClient(api_key="stub", base_url=upstream, cache=WeatherCache(), quota=quota)
+    hot = {p for p, _ in popularity.top(args.top)}
+    out = {}
+    try:
+        if prefetch:
+            prefetcher = WeatherPrefetcher(client, top_n=args.top, interval=args.cycle_budget, hours=None,
+                                           popularity=popularity, concurrency=args.prefetch_concurrency)
+            before = upstream_calls(state)
+            t0 = time.perf_counter()
+            started = await prefetcher.run_once()
+            elapsed = time.perf_counter() - t0
+            calls = upstream_calls(state) - before
+            out["prefetch"] = {
+                "refreshes": started,
+                "upstream_calls": calls,
+                "seconds": round(elapsed, 3),
+                "quota_allowed": int(args.quota_burst + elapsed * args.quota_per_min / 60),
+                "errors": prefetcher.stats["errors"],
+            }
+        client.cache.stats.update({k: 0 for k in client.cache.stats})
+        before = upstream_calls(state)
+        out["burst"] = await burst(client, morning, args.concurrency, hot)
+        stats = client.cache.stats
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        out["burst"]["cache_hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / max(1, lookups), 4)
+        out["burst"]["upstream_calls"] = upstream_calls(state) - before
+    finally:
+        await client.aclose()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pincodes", type=int, default=1000, help="distinct pincodes in the traffic")
+    parser.add_argument("--history", type=int, default=20000, help="requests replayed as yesterday's traffic")
+    parser.add_argument("--requests", type=int, default=3000, help="requests in the morning burst")
+    parser.add_argument("--zipf", type=float, default=1.5, help="traffic skew exponent")
+    parser.add_argument("--top", type=int, default=500, help="pincodes the prefetcher keeps warm")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--prefetch-concurrency", type=int, default=8)
+    parser.add_argument("--quota-per-min", type=float, default=6000, help="token bucket rate for the stub")
+    parser.add_argument("--quota-burst", type=float, default=20)
+    parser.add_argument("--cycle-budget", type=float, default=60, help="max seconds for the prefetch cycle")
+    parser.add_argument("--delay", type=float, default=0.2, help="stub OpenWeather latency (s)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    pincodes = [str(110001 + i) for i in range(args.pincodes)]
+    popularity = Popularity()
+    yesterday = time.time() - 86400  # same hour yesterday
+    for pincode in zipf_traffic(pincodes, args.history, args.zipf, seed=1):
+        popularity.hit(pincode, now=yesterday)
+    morning = zipf_traffic(pincodes, args.requests, args.zipf, seed=2)
+    server, state, upstream = stub_openweather.start(delay=args.delay)
+    try:
+        result = {
+            "cold": asyncio.run(scenario(args, upstream, state, popularity, morning, prefetch=False)),
+            "prefetched": asyncio.run(scenario(args, upstream, state, popularity, morning, prefetch=True)),
+        }
+    finally:
+        server.shutdown()
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    prefetch = result["prefetched"]["prefetch"]
+    if prefetch["upstream_calls"] > prefetch["quota_allowed"]:
+        sys.exit("prefetch exceeded the token bucket")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Throughput of the pre-fork launcher (run_server.py --prod) from 1 to N workers.
+
+For each worker count, starts the server against the local OpenWeather stub
+and a demo crop model, waits for /ready, warms every route, then drives the
+same seeded mixed workload as bench_suite.py. Reports req/s, p50/p99, the
+speedup and per-worker efficiency against one worker, and the total RSS and
+PSS of the master plus its workers (PSS charges pages shared copy-on-write
+once, so it shows what preloading in the parent saves).
+
+With --reload, the largest configuration gets a SIGHUP halfway through an
+extra mixed run; the rolling restart should cost no failed requests.
+
+Scaling is bounded by the cores the machine gives you (metadata "cpus");
+on a single core more workers only add memory and context switches.
+
+    python services/benchmarks/bench_workers.py --workers 1,2,4 --reload
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+import stub_openweather
+from _harness import SERVICES_DIR, free_port, run_metadata, write_demo_crop_model
+from bench_suite import DEFAULT_MIX, app_env, drive, make_photos, make_request, plan
+
+
+def children(pid: int) -> list:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory_kb(pids: list) -> dict:
+    """Summed Rss and Pss of ``pids`` (Linux smaps_rollup; zeros elsewhere)"""
+    total = {"Rss": 0, "Pss": 0}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    key = line.split(":")[0]
+                    if key in total:
+                        total[key] += int(line.split()[1])
+        except OSError:
+            pass
+    return total
+
+
+def start_server(env: dict, workers: int, port: int):
+    cmd = [sys.executable, os.path.join(SERVICES_DIR, "run_server.py"), "--prod",
+           "--workers", str(workers), "--port", str(port)]
+    proc = subprocess.Popen(cmd, env={**os.environ, **env}, cwd=SERVICES_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            if httpx.get(base + "/ready", timeout=1).status_code == 200 and len(children(proc.pid)) >= workers:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("server did not become ready within 60s")
+
+
+def stop_server(proc) -> None:
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+async def measure(base: str, args, requests: list, warm: list, proc=None) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        # every worker pays its own lazy imports; spread the warm-up across them
+        await drive(client, warm * args.warm_rounds, args.concurrency)
+        if proc is None:
+            return (await drive(client, requests, args.concurrency))["overall"]
+
+        async def hup():
+            await asyncio.sleep(args.reload_after)
+            proc.send_signal(signal.SIGHUP)
+
+        reload = asyncio.ensure_future(hup())
+        result = (await drive(client, requests, args.concurrency))["overall"]
+        await reload
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma-separated worker counts")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs")
+    parser.add_argument("--mixed-requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--pincodes", type=int, default=200)
+    parser.add_argument("--upstream-delay", type=float, default=0.05, help="stub OpenWeather latency (s)")
+    parser.add_argument("--warm-rounds", type=int, default=8, help="warm-up passes over every route")
+    parser.add_argument("--reload", action="store_true", help="SIGHUP the largest configuration mid-run")
+    parser.add_argument("--reload-after", type=float, default=1.0, help="seconds into the run to send SIGHUP")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    counts = sorted({int(n) for n in args.workers.split(",")})
+    pairs = [kv.split("=") for kv in args.mix.split(",")]
+    endpoints, weights = [k for k, _ in pairs], [float(v) for _, v in pairs]
+    photos = make_photos(tempfile.gettempdir(), args.images, args.seed)
+    pincodes = [str(110001 + i) for i in range(args.pincodes)]
+    requests = plan(endpoints, weights, args.mixed_requests, args.seed, photos, pincodes)
+    warm = [make_request(ep, random.Random(0), photos, pincodes) for ep in endpoints]
+
+    server, _, upstream = stub_openweather.start(delay=args.upstream_delay)
+    result = {"meta": run_metadata(), "config": vars(args), "workers": {}}
+    try:
+        with tempfile.TemporaryDirectory() as models_dir:
+            write_demo_crop_model(models_dir)
+            env = app_env(args, models_dir, upstream)
+            for n in counts:
+                proc, base = start_server(env, n, free_port())
+                try:
+                    run = asyncio.run(measure(base, args, requests, warm))
+                    pids = [proc.pid, *children(proc.pid)]
+                    mem = memory_kb(pids)
+                    run.update(processes=len(pids), rss_total_mb=round(mem["Rss"] / 1024, 1),
+                               pss_total_mb=round(mem["Pss"] / 1024, 1))
+                    if args.reload and n == counts[-1]:
+                        before = set(children(proc.pid))
+                        run["during_reload"] = asyncio.run(measure(base, args, requests, warm, proc))
+                        time.sleep(0.5)
+                        run["during_reload"]["workers_replaced"] = len(before - set(children(proc.pid)))
+                    result["workers"][str(n)] = run
+                finally:
+                    stop_server(proc)
+    finally:
+        server.shutdown()
+
+    base_rps = result["workers"][str(counts[0])]["req_per_s"] / counts[0]
+    for n, run in result["workers"].items():
+        run["speedup"] = round(run["req_per_s"] / (base_rps * counts[0]), 2)
+        run["efficiency"] = round(run["req_per_s"] / (base_rps * int(n)), 2)
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    failed = [n for n, run in result["workers"].items()
+              if run["errors"] or run.get("during_reload", {}).get("errors")]
+    if failed:
+        sys.exit(f"requests failed with {', '.join(failed)} worker(s)")
+
+
+if __name__ == "__main__":
+    main()
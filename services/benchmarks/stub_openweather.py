@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenWeather API used by benchmarks.
+
+Serves /data/2.5/weather, /forecast and /onecall with deterministic payloads
+after an optional artificial delay. Point the app at it with
+OPENWEATHER_BASE_URL=http://127.0.0.1:<port>.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def _coords(zip_code: str) -> tuple:
+    pin = int("".join(ch for ch in zip_code if ch.isdigit())[:6] or 110001)
+    return round(8 + (pin % 2800) / 100, 4), round(68 + (pin % 2900) / 100, 4)
+
+
+def current_payload(zip_code: str) -> dict:
+    lat, lon = _coords(zip_code)
+    return {
+        "coord": {"lat": lat, "lon": lon},
+        "name": f"Stub {zip_code.split(',')[0]}",
+        "main": {"temp": 31.5, "feels_like": 34.0, "humidity": 62},
+        "wind": {"speed": 4.2},
+        "weather": [{"description": "scattered clouds"}],
+    }
+
+
+def forecast_payload(zip_code: str, steps: int = 40) -> dict:
+    start = int(time.time()) // 10800 * 10800
+    items = []
+    for i in range(steps):
+        item = {
+            "dt": start + i * 10800,
+            "main": {"temp": 24 + (i % 8) * 1.6, "humidity": 55 + (i % 5) * 6},
+            "wind": {"speed": 2.0 + (i % 6) * 1.5},
+        }
+        if i % 7 == 3:
+            item["rain"] = {"3h": 1.2}
+        items.append(item)
+    return {"city": {"coord": dict(zip(("lat", "lon"), _coords(zip_code)))}, "list": items}
+
+
+class StubState:
+    def __init__(self, delay: float = 0.0, onecall: bool = True):
+        self.delay = delay
+        self.onecall = onecall
+        self.hits: Counter = Counter()
+        self.lock = threading.Lock()
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            with state.lock:
+                state.hits[parts.path] += 1
+            if state.delay:
+                time.sleep(state.delay)
+            zip_code = query.get("zip", "110001,IN")
+            at = {"lat": float(query["lat"]), "lon": float(query["lon"])} if "lat" in query else None
+            if parts.path.endswith("/weather"):
+                body = current_payload(zip_code)
+                body["coord"] = at or body["coord"]
+            elif parts.path.endswith("/forecast"):
+                body = forecast_payload(zip_code)
+                body["city"]["coord"] = at or body["city"]["coord"]
+            elif parts.path.endswith("/onecall") and state.onecall:
+                body = {"lat": float(query.get("lat", 0)), "lon": float(query.get("lon", 0)),
+                        "hourly": [], "daily": []}
+            else:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def start(port: int = 0, delay: float = 0.0, onecall: bool = True):
+    """Start the stub in a daemon thread; returns (server, state, base_url)."""
+    state = StubState(delay=delay, onecall=onecall)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds added to every response")
+    args = parser.parse_args()
+    server, _, url = start(args.port, args.delay)
+    print("🌦️  Stub OpenWeather listening on", url)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
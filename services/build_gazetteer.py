@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Build the offline pincode gazetteer used by /locate, /market?near= and the
+weather client.
+
+Reads the India Post "All India Pincode Directory" CSV from data.gov.in
+(one row per post office: pincode, officename, districtname / district,
+statename, latitude, longitude) and writes services/gazetteer: one .npy per
+array plus manifest.json, which the API memory-maps at startup. Rows with
+missing or out-of-India coordinates are skipped; a pincode's location is the
+mean of its post offices.
+
+    python build_gazetteer.py all_india_pincode_directory.csv
+    python build_gazetteer.py directory.csv --out /tmp/gazetteer --grid-deg 0.1
+"""
+import argparse
+import os
+import sys
+import time
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+from utils.gazetteer import GRID_DEG, Gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("csv", help="pincode directory CSV")
+    parser.add_argument("--out", default=os.path.join(backend_dir, "gazetteer"), help="output directory")
+    parser.add_argument("--grid-deg", type=float, default=GRID_DEG, help="spatial index cell size (degrees)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    gazetteer = Gazetteer.from_csv(args.csv, args.grid_deg)
+    if not len(gazetteer):
+        raise SystemExit(f"{args.csv}: no rows with a pincode and usable coordinates")
+    gazetteer.save(args.out)
+    size = sum(os.path.getsize(os.path.join(args.out, f)) for f in os.listdir(args.out))
+    print(f"✅ {len(gazetteer)} pincodes, {len(gazetteer.vocab['district'])} districts, "
+          f"{len(gazetteer.vocab['state'])} states -> {args.out} "
+          f"({size / 1e6:.1f} MB, {time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
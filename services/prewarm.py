@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Build-time prewarm: do the expensive one-off work before the first request.
+
+Run it before deploying (``npm run prewarm``, then ``vercel --prod``):
+
+- ingests MARKET_DATA (CSV/JSON) once and saves a memory-mappable snapshot
+  under services/snapshot/market, which /market then maps on a cold start
+- loads every registered model once, failing the build on a corrupt or
+  checksum-mismatched artifact instead of on a user's request
+- writes an import-time profile of the app to services/snapshot/startup_profile.json
+
+    python services/prewarm.py
+    python services/prewarm.py --market-data dumps/agmarknet_2025.csv
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+# the models are loaded below, synchronously
+os.environ["MODEL_PRELOAD"] = "0"
+
+from utils import market_api
+from utils.startup_profile import format_report, import_profile
+
+
+def prewarm_market(source: str | None, snapshot: str) -> dict:
+    if not source:
+        return {"skipped": "MARKET_DATA not set (mock prices need no snapshot)"}
+    if os.path.isdir(source):
+        return {"skipped": f"{source} is already a saved store"}
+    if market_api.snapshot_matches(snapshot, source):
+        return {"snapshot": snapshot, "up_to_date": True}
+    t0 = time.perf_counter()
+    store = market_api.write_snapshot(source, snapshot)
+    return {"snapshot": snapshot, "rows": len(store), "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def prewarm_models() -> dict:
+    from app import MODELS
+
+    MODELS.preload(background=False)
+    return MODELS.status()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--market-data", default=market_api.MARKET_DATA, help="dump to snapshot (default: $MARKET_DATA)")
+    parser.add_argument("--snapshot", default=market_api.MARKET_SNAPSHOT, help="snapshot directory")
+    parser.add_argument("--no-profile", action="store_true", help="skip the import-time profile")
+    args = parser.parse_args()
+
+    report = {"market": prewarm_market(args.market_data, args.snapshot), "models": prewarm_models()}
+    failed = {name: s["error"] for name, s in report["models"].items() if "error" in s}
+
+    if not args.no_profile:
+        profile = import_profile("app")
+        out = os.path.join(backend_dir, "snapshot", "startup_profile.json")
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(profile, f, indent=2)
+        print(format_report(profile), end="\n\n")
+        report["startup_profile"] = out
+
+    print(json.dumps(report, indent=2))
+    if failed:
+        sys.exit("model artifacts failed to load: " + ", ".join(f"{n} ({e})" for n, e in failed.items()))
+
+
+if __name__ == "__main__":
+    main()
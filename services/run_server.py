@@ -4,18 +4,100 @@ Simple server startup script for Smart Crop Advisory
 """
 import os
 import sys
+import signal
 
 # Add the backend directory to Python path
 backend_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, backend_dir)
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Smart Crop Advisory server")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import-time breakdown of the app (python -X importtime) and exit")
+    parser.add_argument("--json", action="store_true", help="with --profile-startup, print JSON")
+    parser.add_argument("--loop-lag-ms", type=float,
+                        help="log the stack of handlers blocking the event loop longer than this")
+    parser.add_argument("--profile-seconds", type=float, default=30.0,
+                        help="length of the profile taken on SIGUSR1 (kill -USR1 <pid>)")
+    parser.add_argument("--profile-dir", default=os.path.join(backend_dir, "profiles"),
+                        help="where SIGUSR1 profiles are written")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--prod", action="store_true",
+                        help="production mode: models preloaded once, then forked into --workers processes "
+                             "(SIGHUP = rolling restart, SIGTERM = graceful stop)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")) or None,
+                        help="worker processes with --prod (default: WEB_CONCURRENCY, else usable cores)")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="seconds a stopping worker may spend finishing requests")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        import json
+        from utils.startup_profile import format_report, import_profile
+
+        profile = import_profile("app")
+        print(json.dumps(profile, indent=2) if args.json else format_report(profile))
+        sys.exit(0)
+
+    if args.loop_lag_ms is not None:
+        os.environ["LOOP_LAG_MS"] = str(args.loop_lag_ms)
+
+    if args.prod:
+        from utils.prefork import available_cpus, configure_threads
+
+        workers = args.workers or available_cpus()
+        # read by the workers, e.g. to split the OpenWeather quota between them
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+        # before the app (and numpy) is imported, so each worker's native
+        # thread pools get their share of the cores, not all of them
+        per_worker = configure_threads(workers)
+        if not hasattr(os, "fork"):
+            import uvicorn
+
+            print(f"🌾 No fork() on this platform: starting {workers} independent workers")
+            uvicorn.run("app:app", host=args.host, port=args.port, workers=workers, app_dir=backend_dir)
+            sys.exit(0)
+
     import uvicorn
     from app import app
-    
+
+    def install_profiler():
+        if hasattr(signal, "SIGUSR1"):
+            from utils.profiler import install_signal_handler
+
+            install_signal_handler(signal.SIGUSR1, args.profile_seconds, args.profile_dir)
+
     print("🌾 Starting Smart Crop Advisory Server...")
     print("📍 Backend directory:", backend_dir)
-    print("🔗 Server will be available at: http://127.0.0.1:8000")
-    print("📖 API documentation: http://127.0.0.1:8000/docs")
-    
-    uvicorn.run(app, host="127.0.0.1", port=8000, reload=False)
+    print(f"🔗 Server will be available at: http://{args.host}:{args.port}")
+    print(f"📖 API documentation: http://{args.host}:{args.port}/docs")
+
+    if args.prod:
+        import logging
+        import time
+        from app import MODELS
+        from utils.prefork import PreforkServer
+
+        logging.basicConfig(level=logging.INFO, format="%(levelname)s:     [master] %(message)s")
+        t0 = time.perf_counter()
+        MODELS.preload(background=False)
+        print(f"📦 Models loaded in {time.perf_counter() - t0:.2f}s; forking {workers} workers "
+              f"({per_worker} native thread(s) each)")
+        print(f"🔁 kill -HUP {os.getpid()} reloads models and restarts workers one at a time")
+        if hasattr(signal, "SIGUSR1"):
+            print(f"🔬 kill -USR1 {os.getpid()} writes a {args.profile_seconds:g}s profile per worker "
+                  f"to {args.profile_dir}")
+        PreforkServer(
+            app, host=args.host, port=args.port, workers=workers, graceful_timeout=args.graceful_timeout,
+            on_reload=MODELS.reload, child_init=install_profiler,
+        ).run()
+        sys.exit(0)
+
+    install_profiler()
+    if hasattr(signal, "SIGUSR1"):
+        print(f"🔬 kill -USR1 {os.getpid()} writes a {args.profile_seconds:g}s profile to {args.profile_dir}")
+
+    uvicorn.run(app, host=args.host, port=args.port, reload=False)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Offline training pipeline for the crop recommendation model.
+
+Streams a soil-card CSV (columns N,P,K,ph,rainfall,crop, like
+sample_data/crop_reco_sample.csv) in fixed-size chunks, cross-validates one
+or more model families on all cores, and writes models/crop_model.joblib
+with a crop_model.json sidecar (version, sha256, feature order, classes,
+metrics) that ModelRegistry verifies on load.
+
+    python train_crop_model.py sample_data/crop_reco_sample.csv
+    python train_crop_model.py big.csv --compare rf,extra_trees,hgb,logreg,knn --family rf
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+from utils.crop_reco import DEFAULTS, FEATURES
+from utils.model_registry import sha256_file
+
+FAMILIES = ("rf", "extra_trees", "hgb", "logreg", "knn")
+
+
+def read_chunks(path: str, label: str = "crop", chunk_rows: int = 100_000):
+    """Yield (X float32 chunk, list of labels) without loading the whole file"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        missing = [c for c in (*FEATURES, label) if c not in header and c not in DEFAULTS]
+        if missing:
+            raise SystemExit(f"{path}: missing columns {', '.join(missing)}")
+        cols = [header.index(c) if c in header else None for c in FEATURES]
+        label_col = header.index(label)
+        X = np.empty((chunk_rows, len(FEATURES)), dtype=np.float32)
+        y = []
+        for row in reader:
+            if not row:
+                continue
+            i = len(y)
+            for j, (name, col) in enumerate(zip(FEATURES, cols)):
+                val = row[col].strip() if col is not None else ""
+                X[i, j] = float(val) if val else DEFAULTS[name]
+            y.append(row[label_col].strip().lower())
+            if len(y) == chunk_rows:
+                yield X.copy(), y
+                y = []
+        if y:
+            yield X[: len(y)].copy(), y
+
+
+def load_dataset(path: str, chunk_rows: int, max_rows: int | None, seed: int):
+    """Collect chunks into compact arrays, reservoir-sampling down to max_rows.
+
+    Memory is bounded by max_rows * 5 float32 features + one int16 label code
+    per row, however large the CSV is.
+    """
+    rng = np.random.default_rng(seed)
+    classes: dict = {}
+    X_parts, y_parts = [], []
+    if max_rows is not None:
+        res_X = np.empty((max_rows, len(FEATURES)), dtype=np.float32)
+        res_y = np.empty(max_rows, dtype=np.int16)
+    seen = 0
+    for X, labels in read_chunks(path, chunk_rows=chunk_rows):
+        codes = np.fromiter((classes.setdefault(c, len(classes)) for c in labels), dtype=np.int16, count=len(labels))
+        n = len(codes)
+        if max_rows is None:
+            X_parts.append(X)
+            y_parts.append(codes)
+        else:
+            # Algorithm R, vectorised per chunk: fill, then replace with prob max_rows / (i + 1)
+            take = min(n, max(0, max_rows - seen))
+            res_X[seen:seen + take] = X[:take]
+            res_y[seen:seen + take] = codes[:take]
+            if take < n:
+                slots = rng.integers(0, np.arange(seen + take, seen + n) + 1)
+                keep = slots < max_rows
+                res_X[slots[keep]] = X[take:][keep]
+                res_y[slots[keep]] = codes[take:][keep]
+        seen += n
+    if seen == 0:
+        raise SystemExit(f"{path}: no data rows")
+    names = np.array(sorted(classes, key=classes.get))
+    if max_rows is None:
+        return np.concatenate(X_parts), names[np.concatenate(y_parts)], seen
+    kept = min(seen, max_rows)
+    return res_X[:kept], names[res_y[:kept]], seen
+
+
+def make_model(family: str, seed: int, n_jobs: int = -1):
+    if family == "rf":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_estimators=200, n_jobs=n_jobs, random_state=seed)
+    if family == "extra_trees":
+        from sklearn.ensemble import ExtraTreesClassifier
+        return ExtraTreesClassifier(n_estimators=200, n_jobs=n_jobs, random_state=seed)
+    if family == "hgb":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier(random_state=seed)
+    if family == "logreg":
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000))
+    if family == "knn":
+        from sklearn.neighbors import KNeighborsClassifier
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        return make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=5))
+    raise SystemExit(f"Unknown model family: {family} (choose from {', '.join(FAMILIES)})")
+
+
+def cross_validate_family(family: str, X, y, folds: int, seed: int) -> dict:
+    from sklearn.model_selection import StratifiedKFold, cross_validate
+
+    _, counts = np.unique(y, return_counts=True)
+    folds = max(2, min(folds, int(counts.min())))
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    # folds in parallel, each fit single-threaded: nesting both would start cores² workers
+    scores = cross_validate(make_model(family, seed, n_jobs=1), X, y, cv=cv, n_jobs=-1,
+                            scoring=("accuracy", "f1_macro"))
+    return {
+        "cv_folds": folds,
+        "accuracy": round(float(scores["test_accuracy"].mean()), 4),
+        "accuracy_std": round(float(scores["test_accuracy"].std()), 4),
+        "f1_macro": round(float(scores["test_f1_macro"].mean()), 4),
+        "fit_seconds": round(float(scores["fit_time"].mean()), 3),
+    }
+
+
+def inference_latency(model, X, single_rows: int = 200, batch_rows: int = 10_000) -> dict:
+    """Per-row predict_proba cost for single requests and for a large batch"""
+    if hasattr(model, "set_params"):
+        # serving scores one request per call; thread fan-out only adds overhead
+        try:
+            model.set_params(n_jobs=1)
+        except ValueError:
+            pass
+    rows = X[np.random.default_rng(0).integers(0, len(X), max(single_rows, batch_rows))]
+    model.predict_proba(rows[:1])
+    samples = []
+    for row in rows[:single_rows]:
+        t0 = time.perf_counter()
+        model.predict_proba(row[None])
+        samples.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    model.predict_proba(rows[:batch_rows])
+    batch = time.perf_counter() - t0
+    samples.sort()
+    return {
+        "single_row_p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "single_row_p99_ms": round(samples[int(len(samples) * 0.99) - 1] * 1000, 3),
+        "batch_us_per_row": round(batch / batch_rows * 1e6, 2),
+    }
+
+
+def write_artifact(model, out_dir: str, family: str, classes, metrics: dict, rows: int, source: str) -> str:
+    import joblib
+    import sklearn
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, "crop_model.joblib")
+    tmp = path + ".tmp"
+    # uncompressed so ModelRegistry can memory-map the numpy weights
+    joblib.dump(model, tmp)
+    digest = sha256_file(tmp)
+    stamp = datetime.now(timezone.utc)
+    meta = {
+        "version": f"{family}-{stamp:%Y%m%d%H%M%S}-{digest[:8]}",
+        "sha256": digest,
+        "family": family,
+        "features": list(FEATURES),
+        "classes": [str(c) for c in classes],
+        "metrics": metrics,
+        "training_rows": rows,
+        "source": os.path.basename(source),
+        "trained_at": stamp.isoformat(),
+        "sklearn": sklearn.__version__,
+    }
+    with open(os.path.join(out_dir, "crop_model.json.tmp"), "w") as f:
+        json.dump(meta, f, indent=2)
+    # artifact first, metadata last: a reader never sees new metadata with an old file
+    os.replace(tmp, path)
+    os.replace(os.path.join(out_dir, "crop_model.json.tmp"), os.path.join(out_dir, "crop_model.json"))
+    return meta["version"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and export the crop recommendation model")
+    parser.add_argument("csv", help="training CSV with N,P,K,ph,rainfall,crop columns")
+    parser.add_argument("--family", default="rf", choices=FAMILIES, help="model family to export")
+    parser.add_argument("--compare", default="", help="comma-separated families to cross-validate and benchmark")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--max-rows", type=int, default=None, help="reservoir-sample down to this many rows")
+    parser.add_argument("--out", default=os.path.join(backend_dir, "models"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="report metrics without writing an artifact")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    X, y, seen = load_dataset(args.csv, args.chunk_rows, args.max_rows, args.seed)
+    print(f"📥 Loaded {len(y)} of {seen} rows, {len(np.unique(y))} crops in {time.perf_counter() - t0:.2f}s")
+
+    families = [f for f in args.compare.split(",") if f] or [args.family]
+    if args.family not in families:
+        families.append(args.family)
+    report = {}
+    chosen = None
+    for family in families:
+        metrics = cross_validate_family(family, X, y, args.folds, args.seed)
+        model = make_model(family, args.seed).fit(X, y)
+        metrics.update(inference_latency(model, X))
+        report[family] = metrics
+        # only the exported model is kept; the others are freed before the next fit
+        if family == args.family:
+            chosen = model
+        del model
+        print(f"🧪 {family:12s} acc={metrics['accuracy']:.3f}±{metrics['accuracy_std']:.3f} "
+              f"f1={metrics['f1_macro']:.3f} single-row p50={metrics['single_row_p50_ms']}ms "
+              f"p99={metrics['single_row_p99_ms']}ms batch={metrics['batch_us_per_row']}µs/row")
+
+    if args.dry_run:
+        return
+    version = write_artifact(chosen, args.out, args.family, chosen.classes_, report[args.family], len(y), args.csv)
+    print(f"✅ Wrote {os.path.join(args.out, 'crop_model.joblib')} ({version})")
+    if os.path.exists(os.path.join(args.out, "crop_model.pkl")):
+        print("ℹ️  crop_model.pkl is still there; the server loads the .joblib first, delete the .pkl when done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import io
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# Column order the crop model is trained on
+FEATURES = ("N", "P", "K", "ph", "rainfall")
+DEFAULTS = {"rainfall": 100.0}
+
+HEURISTIC_CONFIDENCE = 0.6
+HEURISTIC_NOTE = "heuristic fallback (train and drop crop_model.pkl to enable ML)"
+
+
+def features_from_rows(rows: Sequence) -> np.ndarray:
+    """Stack request models (or dicts) into one (n, 5) float matrix"""
+    get = (lambda r, k: r[k]) if rows and isinstance(rows[0], dict) else getattr
+    X = np.empty((len(rows), len(FEATURES)), dtype=np.float64)
+    for i, row in enumerate(rows):
+        for j, name in enumerate(FEATURES):
+            val = get(row, name)
+            X[i, j] = DEFAULTS.get(name, np.nan) if val is None else val
+    return X
+
+
+def features_from_csv(data: bytes) -> np.ndarray:
+    """Parse a soil-card CSV (same header as sample_data/crop_reco_sample.csv)"""
+    text = data.decode("utf-8-sig")
+    header = [h.strip() for h in text.split("\n", 1)[0].split(",")]
+    missing = [f for f in FEATURES if f not in header and f not in DEFAULTS]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    if not text.partition("\n")[2].strip():
+        raise ValueError("CSV has no data rows")
+    present = [f for f in FEATURES if f in header]
+    table = np.genfromtxt(
+        io.StringIO(text), delimiter=",", skip_header=1, dtype=np.float64,
+        usecols=[header.index(f) for f in present], ndmin=2,
+    )
+    X = np.empty((table.shape[0], len(FEATURES)), dtype=np.float64)
+    for j, name in enumerate(FEATURES):
+        X[:, j] = table[:, present.index(name)] if name in present else DEFAULTS[name]
+        if name in DEFAULTS:
+            X[np.isnan(X[:, j]), j] = DEFAULTS[name]
+    if np.isnan(X).any():
+        bad = int(np.flatnonzero(np.isnan(X).any(axis=1))[0]) + 2
+        raise ValueError(f"CSV row {bad} has a missing or non-numeric value")
+    return X
+
+
+def heuristic_crops(X: np.ndarray) -> np.ndarray:
+    """Vectorised pH rule used when no trained model is available"""
+    ph = X[:, FEATURES.index("ph")]
+    return np.select([(ph >= 6.0) & (ph <= 7.5), ph < 6.0], ["wheat", "rice"], default="maize")
+
+
+def predict_crops(model, X: np.ndarray, top_k: int = 1) -> Dict:
+    """Score every row with one model call.
+
+    Returns labels, confidences and the top-k (crop, probability) pairs per
+    row. Models without ``predict_proba`` fall back to ``predict`` with a
+    fixed confidence.
+    """
+    proba_fn = getattr(model, "predict_proba", None)
+    if proba_fn is None:
+        labels = np.asarray(model.predict(X)).astype(str)
+        conf = np.full(len(X), 0.75)
+        top = [[(label, 0.75)] for label in labels.tolist()]
+        return {"labels": labels, "confidence": conf, "top": top}
+
+    proba = np.asarray(proba_fn(X))
+    classes = np.asarray(model.classes_).astype(str)
+    best = proba.argmax(axis=1)
+    k = max(1, min(top_k, proba.shape[1]))
+    idx = np.argsort(-proba, axis=1, kind="stable")[:, :k]
+    top_p = np.take_along_axis(proba, idx, axis=1).round(3)
+    top_c = classes[idx]
+    top = [list(zip(c, p)) for c, p in zip(top_c.tolist(), top_p.tolist())]
+    return {"labels": classes[best], "confidence": proba[np.arange(len(X)), best], "top": top}
+
+
+def batch_response(X: np.ndarray, model, top_k: int = 3) -> Dict:
+    if len(X) == 0:
+        return {"count": 0, "results": []}
+    if model is not None:
+        scored = predict_crops(model, X, top_k)
+        results: List[Dict] = [
+            {
+                "crop": crop,
+                "confidence": round(conf, 3),
+                "top": [{"crop": c, "confidence": p} for c, p in top],
+            }
+            for crop, conf, top in zip(scored["labels"].tolist(), scored["confidence"].tolist(), scored["top"])
+        ]
+        return {"count": len(results), "results": results}
+
+    guesses = heuristic_crops(X).tolist()
+    results = [
+        {"crop": g, "confidence": HEURISTIC_CONFIDENCE,
+         "top": [{"crop": g, "confidence": HEURISTIC_CONFIDENCE}]}
+        for g in guesses
+    ]
+    return {"count": len(results), "results": results, "note": HEURISTIC_NOTE}
@@ -0,0 +1,53 @@
+from typing import Dict, List
+
+import numpy as np
+
+# Very naive heuristic: greener leaves -> "healthy" else "leaf_blight"
+GREEN_THRESHOLD = 0.35
+# Bump whenever labels can change for the same image; keys the result cache
+DETECTOR_VERSION = f"green-mean-{GREEN_THRESHOLD}-v1"
+LABELS = {
+    "healthy": {"confidence": 0.7, "remedy": "No action needed; maintain regular scouting."},
+    "leaf_blight_suspected": {
+        "confidence": 0.65,
+        "remedy": "Use copper-based fungicide; remove affected leaves; avoid overhead irrigation.",
+    },
+}
+
+
+def classify_leaves(batch: np.ndarray) -> List[Dict]:
+    """Label an (N, 64, 64, 3) float32 batch with one vectorised pass"""
+    mean_green = batch[..., 1].mean(axis=(1, 2), dtype=np.float64)
+    healthy = mean_green > GREEN_THRESHOLD
+    results = []
+    for is_healthy in healthy.tolist():
+        label = "healthy" if is_healthy else "leaf_blight_suspected"
+        info = LABELS[label]
+        results.append({"label": label, "confidence": round(info["confidence"], 3), "remedy": info["remedy"]})
+    return results
+
+
+def plot_summary(results: List[Dict]) -> Dict:
+    """Aggregate per-leaf labels into a plot-level verdict"""
+    scored = [r for r in results if "label" in r]
+    counts: Dict[str, int] = {}
+    for r in scored:
+        counts[r["label"]] = counts.get(r["label"], 0) + 1
+    affected = len(scored) - counts.get("healthy", 0)
+    share = affected / len(scored) if scored else 0.0
+    if not scored:
+        verdict, advice = "unknown", "No readable images in this batch."
+    elif share >= 0.3:
+        verdict, advice = "outbreak_suspected", LABELS["leaf_blight_suspected"]["remedy"]
+    elif affected:
+        verdict, advice = "localised", "Remove affected leaves and re-scout this plot within a week."
+    else:
+        verdict, advice = "healthy", LABELS["healthy"]["remedy"]
+    return {
+        "images": len(results),
+        "scored": len(scored),
+        "label_counts": counts,
+        "affected_share": round(share, 3),
+        "verdict": verdict,
+        "advice": advice,
+    }
@@ -0,0 +1,249 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Every 3-hour step of an OpenWeather /forecast "list" becomes one row of a
+# flat (slots, FIELDS) array; a batch of forecasts is just more rows plus the
+# offset where each forecast starts. Each activity's rules are then a handful
+# of array comparisons over all slots of all pincodes at once, and windows
+# are runs of equal rating found with one np.diff.
+
+FIELDS = ("dt", "temp", "wind", "humidity", "rain")
+DT, TEMP, WIND, HUMIDITY, RAIN = range(len(FIELDS))
+STEP_S = 3 * 3600
+IST_OFFSET_S = 19800  # used when the payload has no city.timezone
+ACTIVITIES = ("spraying", "harvesting", "irrigation")
+RATINGS = ("poor", "moderate", "good")
+POOR, MODERATE, GOOD = range(len(RATINGS))
+
+# Thresholds follow get_farming_conditions(); rain is mm per 3 h step
+DRY_MM = 0.2
+WET_MM = 0.5
+HEAVY_RAIN_MM = 2.0
+DAYLIGHT = (5, 19)  # local hours when field work is possible
+OUTLOOK_MEMO_SIZE = 1024
+
+
+def forecast_rows(forecast: Dict) -> np.ndarray:
+    """One forecast payload as a (steps, len(FIELDS)) float64 array"""
+    rows = [
+        (
+            it.get("dt", 0),
+            it.get("main", {}).get("temp", np.nan),
+            it.get("wind", {}).get("speed", 0.0),
+            it.get("main", {}).get("humidity", 50),
+            it.get("rain", {}).get("3h", 0.0),
+        )
+        for it in forecast.get("list") or ()
+    ]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(FIELDS))
+
+
+def stack_forecasts(forecasts: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rows, offsets, tz): all slots of every forecast in one array.
+
+    Forecast ``i`` is ``rows[offsets[i]:offsets[i + 1]]``; ``tz`` is each
+    forecast's UTC offset in seconds.
+    """
+    parts = [forecast_rows(f) for f in forecasts]
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([len(p) for p in parts], out=offsets[1:])
+    rows = np.concatenate(parts) if parts else np.empty((0, len(FIELDS)))
+    tz = np.array([(f.get("city") or {}).get("timezone", IST_OFFSET_S) for f in forecasts], dtype=np.int64)
+    return rows, offsets, tz
+
+
+def _rain_ahead(rain: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Rain over each slot plus the next one (6 h) and the next seven (24 h),
+    within the same forecast. Shifted adds rather than prefix sums: over
+    thousands of forecasts a running total loses the precision the
+    thresholds need."""
+    out = rain.copy()
+    idx = np.arange(len(rain))
+    rain_6h = None
+    for k in range(1, 8):
+        inside = idx[:-k][idx[:-k] + k < ends[:-k]]
+        out[inside] += rain[inside + k]
+        if k == 1:
+            rain_6h = out.copy()
+    return rain_6h if rain_6h is not None else out.copy(), out
+
+
+def rate_slots(rows: np.ndarray, offsets: np.ndarray, tz: np.ndarray) -> Dict[str, np.ndarray]:
+    """POOR/MODERATE/GOOD per slot for every activity, in one pass"""
+    lengths = np.diff(offsets)
+    ends = np.repeat(offsets[1:], lengths)
+    local = rows[:, DT].astype(np.int64) + np.repeat(tz, lengths)
+    hour = (local // 3600) % 24
+    temp, wind, humidity, rain = rows[:, TEMP], rows[:, WIND], rows[:, HUMIDITY], rows[:, RAIN]
+    temp = np.where(np.isnan(temp), 25.0, temp)
+
+    daylight = (hour >= DAYLIGHT[0]) & (hour < DAYLIGHT[1])
+    dry = rain < DRY_MM
+    # rain in the next 6 h washes spray off and makes irrigation pointless
+    rain_6h, rain_24h = _rain_ahead(rain, ends)
+
+    spraying = np.where(
+        daylight & (rain_6h < DRY_MM) & (wind <= 6) & (temp <= 30), GOOD,
+        np.where(daylight & dry & (wind <= 10) & (temp <= 35), MODERATE, POOR))
+    harvesting = np.where(
+        daylight & dry & (wind <= 15) & (temp <= 32) & (humidity < 85), GOOD,
+        np.where(daylight & (rain < WET_MM) & (wind <= 15) & (temp <= 38), MODERATE, POOR))
+    irrigation = np.where(
+        (rain_24h < HEAVY_RAIN_MM) & (rain_6h < DRY_MM) & (temp <= 30) & (wind <= 6), GOOD,
+        np.where((rain_6h < WET_MM) & (temp <= 35), MODERATE, POOR))
+    return {a: r.astype(np.int8) for a, r in zip(ACTIVITIES, (spraying, harvesting, irrigation))}
+
+
+def _runs(rating: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(start, stop, segment index) of every maximal run of equal rating
+    that does not cross a segment boundary in ``offsets``"""
+    n = len(rating)
+    if n == 0:
+        return (np.empty(0, dtype=np.int64),) * 3
+    change = np.ones(n, dtype=bool)
+    change[1:] = rating[1:] != rating[:-1]
+    change[offsets[:-1][offsets[:-1] < n]] = True
+    starts = np.flatnonzero(change)
+    stops = np.append(starts[1:], n)
+    owner = np.searchsorted(offsets, starts, side="right") - 1
+    return starts, stops, owner
+
+
+def _iso(ts: int, tz: int) -> str:
+    return datetime.fromtimestamp(ts, timezone(timedelta(seconds=tz))).isoformat(timespec="minutes")
+
+
+def _iso_many(ts: np.ndarray, tz: np.ndarray) -> List[str]:
+    """_iso() for whole arrays: local wall time via datetime64, plus the offset"""
+    local = np.datetime_as_string((ts + tz).astype("datetime64[s]"), unit="m").tolist()
+    # a batch has only a handful of distinct UTC offsets
+    zones, which = np.unique(tz, return_inverse=True)
+    suffix = [f"{'-' if z < 0 else '+'}{abs(z) // 3600:02d}:{abs(z) // 60 % 60:02d}" for z in zones.tolist()]
+    return [t + suffix[w] for t, w in zip(local, which.tolist())]
+
+
+def windows_from_rows(
+    rows: np.ndarray, offsets: np.ndarray, tz: np.ndarray, min_rating: int = MODERATE,
+) -> List[Dict[str, List[Dict]]]:
+    """Per forecast and activity, the chronological windows rated at least
+    ``min_rating``: ``{"start", "end", "rating"}`` in the location's time"""
+    ratings = rate_slots(rows, offsets, tz)
+    n, count = len(rows), len(offsets) - 1
+    # all activities back to back, so runs and timestamps are found in one pass
+    flat = np.concatenate([ratings[a] for a in ACTIVITIES])
+    segments = np.concatenate([offsets[:-1] + i * n for i in range(len(ACTIVITIES))] + [[len(ACTIVITIES) * n]])
+    starts, stops, owner = _runs(flat, segments)
+    keep = flat[starts] >= min_rating
+    starts, stops, owner = starts[keep], stops[keep], owner[keep]
+    forecast = owner % count if count else owner
+    dt = rows[:, DT].astype(np.int64)
+    zone = tz[forecast]
+    stamps = _iso_many(np.concatenate([dt[starts % n], dt[(stops - 1) % n] + STEP_S]) if n else dt,
+                       np.concatenate([zone, zone]))
+    begin, end = stamps[:len(starts)], stamps[len(starts):]
+    out = [{a: [] for a in ACTIVITIES} for _ in range(count)]
+    for i, a, b, e, r in zip(forecast.tolist(), (owner // max(count, 1)).tolist(), begin, end,
+                             flat[starts].tolist()):
+        out[i][ACTIVITIES[a]].append({"start": b, "end": e, "rating": RATINGS[r]})
+    return out
+
+
+def batch_windows(forecasts: Sequence[Dict], now: Optional[float] = None) -> List[Dict[str, List[Dict]]]:
+    """farming_windows() for many pincodes at once (batch advisory jobs)"""
+    now = time.time() if now is None else now
+    rows, offsets, tz = stack_forecasts(forecasts)
+    # cached payloads age: drop the slots that have already ended
+    live = rows[:, DT] + STEP_S > now
+    owner = np.repeat(np.arange(len(forecasts)), np.diff(offsets))
+    counts = np.bincount(owner[live], minlength=len(forecasts))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    return windows_from_rows(rows[live], offsets, tz)
+
+
+def farming_windows(forecast: Dict, now: Optional[float] = None) -> Dict[str, List[Dict]]:
+    """Spraying/harvesting/irrigation windows over the forecast's ~5 days"""
+    return batch_windows([forecast], now)[0]
+
+
+def rain_next_hours(rows: np.ndarray, now: float, hours: float = 24) -> float:
+    """Forecast rain (mm) in the slots of one forecast overlapping the next ``hours``"""
+    dt = rows[:, DT]
+    return float(rows[(dt + STEP_S > now) & (dt < now + hours * 3600), RAIN].sum())
+
+
+def forecast_alerts(rows: np.ndarray, now: float) -> List[str]:
+    """Alerts for the next two days that the current observation cannot show"""
+    dt = rows[:, DT]
+    soon = rows[(dt + STEP_S > now) & (dt < now + 48 * 3600)]
+    alerts = []
+    if not len(soon):
+        return alerts
+    rain_24h = rain_next_hours(rows, now)
+    if rain_24h >= 10:
+        alerts.append(f"🌧️ Heavy rain forecast: {rain_24h:.0f} mm in the next 24 hours. Secure harvested produce.")
+    temp = soon[~np.isnan(soon[:, TEMP]), TEMP]
+    if len(temp) and temp.max() >= 38:
+        alerts.append(f"🔥 Heat forecast: up to {temp.max():.0f}°C in the next 2 days.")
+    if len(temp) and temp.min() <= 5:
+        alerts.append(f"🧊 Frost risk: down to {temp.min():.0f}°C in the next 2 days.")
+    return alerts
+
+
+def _clock(t: datetime) -> str:
+    return f"{t.hour % 12 or 12}:{t:%M} {'AM' if t.hour < 12 else 'PM'}"
+
+
+def best_hours(windows: Dict[str, List[Dict]]) -> List[str]:
+    """First good (else moderate) window per activity, e.g.
+    "🌅 Tue 6:00 AM - 12:00 PM (spraying, good)"."""
+    lines = []
+    for activity in ACTIVITIES:
+        found = windows.get(activity) or []
+        best = next((w for w in found if w["rating"] == "good"), found[0] if found else None)
+        if best is None:
+            continue
+        start, end = datetime.fromisoformat(best["start"]), datetime.fromisoformat(best["end"])
+        icon = "🌅" if 4 <= start.hour < 11 else "🌞" if 11 <= start.hour < 16 else "🌆" if 16 <= start.hour < 20 else "🌙"
+        lines.append(f"{icon} {start:%a} {_clock(start)} - {end:%a} {_clock(end)} ({activity}, {best['rating']})")
+    return lines
+
+
+_outlooks: "OrderedDict[int, Tuple[Dict, int, Dict]]" = OrderedDict()
+# the sync WeatherClient's loop thread and the app's threads share the memo
+_outlooks_lock = threading.Lock()
+
+
+def forecast_outlook(forecast: Dict, now: Optional[float] = None) -> Dict:
+    """Rain in the next 24 h, forecast alerts, windows and best hours.
+
+    Cached weather payloads are shared objects, so the result is memoised
+    per payload until the next 3-hour slot starts (OpenWeather steps are
+    aligned to 3-hour UTC boundaries). The returned dict is shared and must
+    be treated as read-only.
+    """
+    now = time.time() if now is None else now
+    slot = int(now // STEP_S)
+    with _outlooks_lock:
+        memo = _outlooks.get(id(forecast))
+        if memo is not None and memo[0] is forecast and memo[1] == slot:
+            _outlooks.move_to_end(id(forecast))
+            return memo[2]
+    rows = forecast_rows(forecast)
+    windows = farming_windows(forecast, now)
+    outlook = {
+        "rain_next_24h": rain_next_hours(rows, now),
+        "alerts": forecast_alerts(rows, now),
+        "windows": windows,
+        "best_hours": best_hours(windows),
+    }
+    # holding the payload keeps its id from being reused while memoised
+    with _outlooks_lock:
+        _outlooks[id(forecast)] = (forecast, slot, outlook)
+        while len(_outlooks) > OUTLOOK_MEMO_SIZE:
+            _outlooks.popitem(last=False)
+    return outlook
@@ -0,0 +1,306 @@
+import os
+import csv
+import json
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Built by build_gazetteer.py from the India Post pincode directory; the
+# bundled sample (a few dozen head post offices) is used when it is absent.
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH") or (
+    os.path.join(SERVICES_DIR, "gazetteer")
+    if os.path.isdir(os.path.join(SERVICES_DIR, "gazetteer"))
+    else os.path.join(SERVICES_DIR, "sample_data", "pincode_sample.csv")
+)
+
+PIN_MIN, PIN_MAX = 100000, 999999
+GRID_DEG = 0.25
+EARTH_KM = 6371.0088
+KM_PER_DEG = math.pi * EARTH_KM / 180
+
+# Header spellings seen in the data.gov.in "All India Pincode Directory" exports
+_ALIASES = {
+    "pin": "pincode",
+    "lat": "latitude",
+    "lon": "longitude",
+    "long": "longitude",
+    "districtname": "district",
+    "district_name": "district",
+    "statename": "state",
+    "state_name": "state",
+}
+ARRAYS = ("pincode", "lat", "lon", "district", "state", "slot", "cell_offsets", "cell_rows")
+
+
+def _norm_header(name: str) -> str:
+    key = name.strip().lower().replace(" ", "_")
+    return _ALIASES.get(key, key)
+
+
+def _pin(value) -> int:
+    text = str(value).strip()
+    if len(text) != 6 or not text.isdigit() or text[0] == "0":
+        return -1
+    return int(text)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance; broadcasts over numpy arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def parse_location(text: str) -> Tuple[str, object]:
+    """``("pincode", 560034)`` or ``("coords", (lat, lon))`` for a free-text location"""
+    text = (text or "").strip()
+    pin = _pin(text)
+    if pin > 0:
+        return "pincode", pin
+    parts = text.replace(";", ",").split(",")
+    if len(parts) == 2:
+        try:
+            lat, lon = float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+        else:
+            if -90 <= lat <= 90 and -180 <= lon <= 180:
+                return "coords", (lat, lon)
+    raise ValueError(f"Location must be a 6-digit pincode or 'lat,lon': {text!r}")
+
+
+def share_cell(lat: float, lon: float, deg: float) -> Tuple[float, float]:
+    """Centre of the ``deg``-sized grid cell containing (lat, lon)"""
+    return (round((math.floor(lat / deg) + 0.5) * deg, 4), round((math.floor(lon / deg) + 0.5) * deg, 4))
+
+
+class Gazetteer:
+    """Pincode -> (lat, lon, district, state) with a spatial grid index.
+
+    One row per pincode in ascending order. ``slot`` is a dense array over
+    every possible 6-digit pincode holding its row (or -1), so lookups are a
+    single array read; once saved, all arrays are memory-mapped and only the
+    pages a request touches are read from disk.
+
+    Nearest-neighbour queries use a uniform ``GRID_DEG`` grid stored as CSR
+    (``cell_offsets``/``cell_rows``): rings of cells are scanned outwards
+    from the query point until no unscanned cell can hold a closer pincode.
+    """
+
+    def __init__(self):
+        self.pincode = np.empty(0, dtype=np.int32)
+        self.lat = np.empty(0, dtype=np.float32)
+        self.lon = np.empty(0, dtype=np.float32)
+        self.district = np.empty(0, dtype=np.int32)
+        self.state = np.empty(0, dtype=np.int32)
+        self.vocab: Dict[str, List[str]] = {"district": [], "state": []}
+        self.slot = np.full(PIN_MAX - PIN_MIN + 1, -1, dtype=np.int32)
+        self.grid = {"lat0": 0.0, "lon0": 0.0, "rows": 0, "cols": 0, "deg": GRID_DEG}
+        self.cell_offsets = np.zeros(1, dtype=np.int64)
+        self.cell_rows = np.empty(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.pincode)
+
+    # ---------------- building ---------------- #
+    @classmethod
+    def build(cls, records: Iterable[Dict], grid_deg: float = GRID_DEG) -> "Gazetteer":
+        """From dicts with pincode, latitude, longitude, district, state.
+
+        The directory lists every post office, so a pincode can appear many
+        times; its location is the mean of the offices that have coordinates.
+        """
+        sums: Dict[int, List] = {}
+        for r in records:
+            pin = _pin(r.get("pincode", ""))
+            try:
+                lat, lon = float(r.get("latitude")), float(r.get("longitude"))
+            except (TypeError, ValueError):
+                continue
+            # the directory has NA, 0 and swapped/out-of-country coordinates
+            if pin < 0 or not (5 <= lat <= 38 and 67 <= lon <= 98):
+                continue
+            acc = sums.get(pin)
+            if acc is None:
+                sums[pin] = [lat, lon, 1, (r.get("district") or "").strip().title(), (r.get("state") or "").strip().title()]
+            else:
+                acc[0] += lat
+                acc[1] += lon
+                acc[2] += 1
+
+        g = cls()
+        pins = sorted(sums)
+        vocab_ids = {"district": {}, "state": {}}
+        g.pincode = np.array(pins, dtype=np.int32)
+        g.lat = np.array([sums[p][0] / sums[p][2] for p in pins], dtype=np.float32)
+        g.lon = np.array([sums[p][1] / sums[p][2] for p in pins], dtype=np.float32)
+        for col, idx in (("district", 3), ("state", 4)):
+            ids = vocab_ids[col]
+            values = [ids.setdefault(sums[p][idx], len(ids)) for p in pins]
+            setattr(g, col, np.array(values, dtype=np.int32))
+            g.vocab[col] = list(ids)
+        g.grid["deg"] = grid_deg
+        g._index()
+        return g
+
+    @classmethod
+    def from_csv(cls, path: str, grid_deg: float = GRID_DEG) -> "Gazetteer":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = [_norm_header(h) for h in next(reader)]
+            return cls.build((dict(zip(header, row)) for row in reader), grid_deg)
+
+    def _index(self) -> None:
+        self.slot[:] = -1
+        self.slot[self.pincode - PIN_MIN] = np.arange(len(self), dtype=np.int32)
+        deg = self.grid["deg"]
+        if len(self) == 0:
+            return
+        lat0 = math.floor(float(self.lat.min()) / deg) * deg
+        lon0 = math.floor(float(self.lon.min()) / deg) * deg
+        rows = int((float(self.lat.max()) - lat0) // deg) + 1
+        cols = int((float(self.lon.max()) - lon0) // deg) + 1
+        self.grid.update(lat0=lat0, lon0=lon0, rows=rows, cols=cols)
+        cells = self._cells(self.lat, self.lon)
+        order = np.argsort(cells, kind="stable")
+        self.cell_rows = order.astype(np.int32)
+        self.cell_offsets = np.zeros(rows * cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=rows * cols), out=self.cell_offsets[1:])
+
+    def _cells(self, lat, lon):
+        g = self.grid
+        i = ((np.asarray(lat, dtype=np.float64) - g["lat0"]) // g["deg"]).astype(np.int64)
+        j = ((np.asarray(lon, dtype=np.float64) - g["lon0"]) // g["deg"]).astype(np.int64)
+        return np.clip(i, 0, g["rows"] - 1) * g["cols"] + np.clip(j, 0, g["cols"] - 1)
+
+    # ---------------- persistence ---------------- #
+    def save(self, directory: str) -> None:
+        """Write one .npy per array plus a JSON manifest (memory-mappable)"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump({"rows": len(self), "grid": self.grid, "vocab": self.vocab}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "Gazetteer":
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        g = cls()
+        g.grid = manifest["grid"]
+        g.vocab = manifest["vocab"]
+        for name in ARRAYS:
+            setattr(g, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode))
+        return g
+
+    @classmethod
+    def from_path(cls, path: str) -> "Gazetteer":
+        return cls.load(path) if os.path.isdir(path) else cls.from_csv(path)
+
+    # ---------------- queries ---------------- #
+    def row(self, pincode) -> int:
+        pin = _pin(pincode)
+        return -1 if pin < 0 else int(self.slot[pin - PIN_MIN])
+
+    def record(self, row: int) -> Dict:
+        return {
+            "pincode": str(int(self.pincode[row])),
+            "lat": round(float(self.lat[row]), 4),
+            "lon": round(float(self.lon[row]), 4),
+            "district": self.vocab["district"][int(self.district[row])],
+            "state": self.vocab["state"][int(self.state[row])],
+        }
+
+    def lookup(self, pincode) -> Optional[Dict]:
+        row = self.row(pincode)
+        return None if row < 0 else self.record(row)
+
+    def resolve(self, pincode) -> Optional[Dict]:
+        """Exact match, else the numerically closest pincode of the same
+        sorting district (same first three digits), marked ``approximate``"""
+        pin = _pin(pincode)
+        if pin < 0:
+            return None
+        row = int(self.slot[pin - PIN_MIN])
+        if row >= 0:
+            return self.record(row)
+        prefix = pin // 1000
+        lo = int(np.searchsorted(self.pincode, prefix * 1000))
+        hi = int(np.searchsorted(self.pincode, prefix * 1000 + 1000))
+        if lo == hi:
+            return None
+        near = lo + int(np.argmin(np.abs(self.pincode[lo:hi].astype(np.int64) - pin)))
+        return {**self.record(near), "pincode": str(pin), "matched_pincode": str(int(self.pincode[near])),
+                "approximate": True}
+
+    def _block(self, ci: int, cj: int, r: int) -> np.ndarray:
+        """Rows in the square of cells within ``r`` of (ci, cj); each grid row
+        of the square is one contiguous slice of ``cell_rows``"""
+        g = self.grid
+        j0, j1 = max(cj - r, 0), min(cj + r, g["cols"] - 1)
+        i0, i1 = max(ci - r, 0), min(ci + r, g["rows"] - 1)
+        starts = self.cell_offsets[np.arange(i0, i1 + 1) * g["cols"] + j0]
+        stops = self.cell_offsets[np.arange(i0, i1 + 1) * g["cols"] + j1 + 1]
+        return np.concatenate([self.cell_rows[a:b] for a, b in zip(starts.tolist(), stops.tolist())])
+
+    def nearest(self, lat: float, lon: float, k: int = 1, max_km: Optional[float] = None) -> List[Dict]:
+        """The ``k`` pincodes closest to (lat, lon), nearest first, with distance_km"""
+        if len(self) == 0 or k < 1:
+            return []
+        g = self.grid
+        ci = int(min(max((lat - g["lat0"]) // g["deg"], 0), g["rows"] - 1))
+        cj = int(min(max((lon - g["lon0"]) // g["deg"], 0), g["cols"] - 1))
+        r = 1
+        while True:
+            rows = self._block(ci, cj, r)
+            dist = haversine_km(lat, lon, self.lat[rows], self.lon[rows])
+            covered = r >= max(ci, cj, g["rows"] - 1 - ci, g["cols"] - 1 - cj)
+            # anything outside the square is at least r cells away; a
+            # longitude cell is narrowest at the square's poleward edge
+            cos = math.cos(math.radians(min(abs(lat) + (r + 1) * g["deg"], 89.0)))
+            bound = r * g["deg"] * KM_PER_DEG * cos
+            if covered or (max_km is not None and bound >= max_km):
+                break
+            if len(rows) >= k and np.partition(dist, k - 1)[k - 1] <= bound:
+                break
+            r *= 2
+        order = np.argsort(dist, kind="stable")[:k]
+        return [{**self.record(int(rows[i])), "distance_km": round(float(dist[i]), 2)}
+                for i in order if max_km is None or dist[i] <= max_km]
+
+    def within(self, lat: float, lon: float, radius_km: float, limit: int = 100) -> List[Dict]:
+        return self.nearest(lat, lon, k=limit, max_km=radius_km)
+
+    def locate(self, text: str, k: int = 1) -> Dict:
+        """Resolve a pincode or "lat,lon" string to a place; raises ValueError"""
+        kind, value = parse_location(text)
+        if kind == "pincode":
+            place = self.resolve(value)
+            if place is None:
+                raise ValueError(f"Unknown pincode: {value}")
+            if k > 1:
+                place["nearby"] = self.nearest(place["lat"], place["lon"], k + 1)[1:]
+            return place
+        lat, lon = value
+        near = self.nearest(lat, lon, k)
+        if not near:
+            raise ValueError("Gazetteer is empty")
+        return {"lat": lat, "lon": lon, "pincode": near[0]["pincode"], "district": near[0]["district"],
+                "state": near[0]["state"], "distance_km": near[0]["distance_km"], "nearby": near[1:]}
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """The process-wide gazetteer, loaded (and numpy imported) on first use"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.from_path(GAZETTEER_PATH)
+    return _gazetteer
@@ -0,0 +1,164 @@
+import json
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json below produces the same documents
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def render_json(content: Any) -> bytes:
+    """Serialise a response body, with orjson when it is installed.
+
+    Payloads built by our own routes are plain dicts/lists (or numpy
+    arrays) and are dumped as they are; ``jsonable_encoder`` only runs for
+    types orjson does not know (pydantic models, sets, Decimal). Without
+    orjson this is FastAPI's default JSONResponse rendering.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=_ORJSON_OPTIONS)
+        except TypeError:
+            return orjson.dumps(jsonable_encoder(content), option=_ORJSON_OPTIONS)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """The app's default response class: bodies go through :func:`render_json`"""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """A route's own output, serialised once.
+
+    FastAPI runs every returned dict through ``jsonable_encoder`` before the
+    response class sees it; our payloads are already JSON types, so routes
+    on the hot path return this instead and skip that walk.
+    """
+    return Response(content=render_json(content), status_code=status_code, media_type=JSON_MEDIA_TYPE)
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def cache_control(max_age: int, stale_while_revalidate: Optional[int] = None, private: bool = False) -> str:
+    parts = ["private" if private else "public", f"max-age={max(0, int(max_age))}"]
+    if stale_while_revalidate:
+        parts.append(f"stale-while-revalidate={int(stale_while_revalidate)}")
+    return ", ".join(parts)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(last_modified) <= since
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    cache: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[float] = None,
+    media_type: str = JSON_MEDIA_TYPE,
+) -> Response:
+    """Answer with 304 when the client's validators still match, else ``body``.
+
+    ``If-None-Match`` takes precedence; ``If-Modified-Since`` is only
+    consulted when the request carries no entity tags.
+    """
+    etag = etag or strong_etag(body)
+    headers: Dict[str, str] = {"ETag": etag, "Cache-Control": cache}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    if _is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _is_fresh(request: Request, etag: str, last_modified: Optional[float]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    since = request.headers.get("if-modified-since")
+    return since is not None and last_modified is not None and _not_modified_since(since, last_modified)
+
+
+class _Prebuilt(Response):
+    """A 200 whose body and encoded headers were built ahead of time"""
+
+    def __init__(self, body: bytes, raw_headers: List[Tuple[bytes, bytes]]):
+        self.status_code = 200
+        self.body = body
+        self.background = None
+        # a copy: middleware (CORS) edits the header list of the message in place
+        self.raw_headers = list(raw_headers)
+
+
+def cached_json(
+    request: Request,
+    content: Any,
+    max_age: int,
+    last_modified: Optional[float] = None,
+    stale_while_revalidate: Optional[int] = None,
+) -> Response:
+    return conditional_response(
+        request, render_json(content), cache_control(max_age, stale_while_revalidate), last_modified=last_modified,
+    )
+
+
+def no_store_json(content: Any, status_code: int = 200) -> Response:
+    """For error payloads that must never be reused by a cache"""
+    return Response(
+        content=render_json(content), status_code=status_code, media_type=JSON_MEDIA_TYPE,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+class StaticJSON:
+    """A response body serialised and hashed once, served with validators.
+
+    For payloads fixed for the life of the process (``/``, ``/languages``):
+    the per-request cost is a header comparison, not a JSON dump.
+    """
+
+    def __init__(self, content: Any, max_age: int = 86400):
+        self.body = render_json(content)
+        self.etag = strong_etag(self.body)
+        self.last_modified = time.time()
+        self.cache = cache_control(max_age)
+        self.headers = {
+            "ETag": self.etag, "Cache-Control": self.cache,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+        }
+        self._raw_headers = Response(self.body, media_type=JSON_MEDIA_TYPE, headers=self.headers).raw_headers
+
+    def respond(self, request: Request) -> Response:
+        if _is_fresh(request, self.etag, self.last_modified):
+            return Response(status_code=304, headers=self.headers)
+        return _Prebuilt(self.body, self._raw_headers)
@@ -0,0 +1,103 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import INFERENCE_LATENCY, INFERENCE_ROWS, timer
+
+BATCH_MAX_ROWS = int(os.getenv("INFERENCE_BATCH_MAX_ROWS", "64"))
+BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """Merge concurrent single-row predictions into one vectorised call.
+
+    ``predict_fn`` receives an ``(n, d)`` matrix and must return ``n`` per-row
+    results. Rows are collected for up to ``max_wait_ms`` or ``max_rows``,
+    scored on a dedicated worker thread (keeping sklearn off the event loop)
+    and the results are fanned back out to the awaiting callers.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Sequence],
+        max_rows: int = BATCH_MAX_ROWS,
+        max_wait_ms: float = BATCH_WAIT_MS,
+        name: str = "inference",
+    ):
+        self.predict_fn = predict_fn
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self.stats = {"rows": 0, "batches": 0, "max_batch": 0}
+
+    async def submit(self, row: np.ndarray):
+        if self._worker is None or self._worker.done():
+            if self._executor is None:
+                # created here, not in __init__, so the batcher survives aclose()
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((np.asarray(row, dtype=np.float64).ravel(), fut))
+        return await fut
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_rows:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            live = [(row, fut) for row, fut in batch if not fut.cancelled()]
+            if not live:
+                continue
+            X = np.stack([row for row, _ in live])
+            try:
+                with timer(INFERENCE_LATENCY.labels(self.name)):
+                    results = await loop.run_in_executor(self._executor, self.predict_fn, X)
+            except Exception as e:
+                for _, fut in live:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), result in zip(live, results):
+                if not fut.done():
+                    fut.set_result(result)
+            self.stats["rows"] += len(live)
+            INFERENCE_ROWS.labels(self.name).inc(len(live))
+            self.stats["batches"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(live))
+
+    async def aclose(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
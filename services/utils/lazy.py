@@ -0,0 +1,41 @@
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """A process-wide object built by ``factory`` on first :meth:`get`.
+
+    Lets the app module import without paying for numpy, PIL, httpx or model
+    files: each route builds only what it uses, once, under a lock. A
+    factory that raises is retried on the next call.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._value = self._factory()
+                    self._built = True
+        return self._value
+
+    def peek(self) -> Optional[T]:
+        """The value if already built, without building it"""
+        return self._value if self._built else None
+
+    def reset(self) -> Optional[T]:
+        """Forget the value (returned, for closing) so the next get() rebuilds it"""
+        with self._lock:
+            value, self._value, self._built = self._value, None, False
+        return value
+
+    @property
+    def built(self) -> bool:
+        return self._built
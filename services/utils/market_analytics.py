@@ -0,0 +1,161 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MA_WINDOWS = (7, 30)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _price(value: float):
+    # Agmarknet prices are whole rupees; keep them ints in JSON like the mock did
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+def _iso(day: int) -> str:
+    return date.fromordinal(_EPOCH_ORDINAL + day).isoformat()
+
+
+def _group_starts(*keys: np.ndarray) -> np.ndarray:
+    """Start offsets of runs of equal key tuples in already-sorted arrays"""
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[0] = True
+    for k in keys:
+        change[1:] |= k[1:] != k[:-1]
+    return np.flatnonzero(change)
+
+
+class _Series:
+    """Daily modal prices of one (crop, market) with running prefix sums.
+
+    ``csum``/``ccount`` carry a leading zero, so the total over days
+    ``[i, j)`` is ``csum[j] - csum[i]``. Appending a later day is O(1); a
+    back-filled day only rewrites the prefix sums after it.
+    """
+
+    __slots__ = ("state", "days", "sums", "counts", "csum", "ccount")
+
+    def __init__(self, state: int):
+        self.state = state
+        self.days: List[int] = []
+        self.sums: List[float] = []
+        self.counts: List[int] = []
+        self.csum: List[float] = [0.0]
+        self.ccount: List[int] = [0]
+
+    def add(self, day: int, total: float, count: int) -> None:
+        days = self.days
+        if not days or day > days[-1]:
+            days.append(day)
+            self.sums.append(total)
+            self.counts.append(count)
+            self.csum.append(self.csum[-1] + total)
+            self.ccount.append(self.ccount[-1] + count)
+            return
+        i = bisect_left(days, day)
+        if i < len(days) and days[i] == day:
+            self.sums[i] += total
+            self.counts[i] += count
+        else:
+            days.insert(i, day)
+            self.sums.insert(i, total)
+            self.counts.insert(i, count)
+            self.csum.append(0.0)
+            self.ccount.append(0)
+        for j in range(i, len(days)):
+            self.csum[j + 1] = self.csum[j] + self.sums[j]
+            self.ccount[j + 1] = self.ccount[j] + self.counts[j]
+
+    def mean(self, first_day: int, last_day: int) -> Optional[float]:
+        """Mean modal price over rows dated within ``[first_day, last_day]``"""
+        lo = bisect_left(self.days, first_day)
+        hi = bisect_right(self.days, last_day)
+        n = self.ccount[hi] - self.ccount[lo]
+        return (self.csum[hi] - self.csum[lo]) / n if n else None
+
+
+class PriceAnalytics:
+    """Rolling price aggregates maintained incrementally on ingestion.
+
+    Per (crop, market) it keeps a :class:`_Series` of daily modal prices,
+    so 7/30-day moving averages and week-on-week change are two bisects
+    regardless of history length. Per (crop, state, day) it keeps the
+    cheapest and dearest mandi quote. :meth:`update` only touches the groups
+    present in the new batch.
+    """
+
+    def __init__(self):
+        self.series: Dict[Tuple[int, int], _Series] = {}
+        self.by_crop: Dict[int, List[Tuple[int, int]]] = {}
+        # (crop, state) -> {day: (min, min_market, max, max_market)}
+        self.ranges: Dict[Tuple[int, int], Dict[int, Tuple[float, int, float, int]]] = {}
+
+    def update(self, crop: np.ndarray, state: np.ndarray, market: np.ndarray, day: np.ndarray, modal: np.ndarray) -> None:
+        if not len(crop):
+            return
+        modal = modal.astype(np.float64)
+
+        order = np.lexsort((day, market, crop))
+        c, m, d, s, p = crop[order], market[order], day[order], state[order], modal[order]
+        starts = _group_starts(c, m, d)
+        totals = np.add.reduceat(p, starts).tolist()
+        counts = np.diff(np.append(starts, len(p))).tolist()
+        for i, start in enumerate(starts.tolist()):
+            key = (int(c[start]), int(m[start]))
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = _Series(int(s[start]))
+                self.by_crop.setdefault(key[0], []).append(key)
+            series.add(int(d[start]), totals[i], counts[i])
+
+        order = np.lexsort((modal, day, state, crop))
+        c, s, d, m, p = crop[order], state[order], day[order], market[order], modal[order]
+        starts = _group_starts(c, s, d)
+        ends = np.append(starts[1:], len(p)) - 1
+        for first, last in zip(starts.tolist(), ends.tolist()):
+            days = self.ranges.setdefault((int(c[first]), int(s[first])), {})
+            dd = int(d[first])
+            lo, lo_m, hi, hi_m = float(p[first]), int(m[first]), float(p[last]), int(m[last])
+            prev = days.get(dd)
+            if prev is not None:
+                if prev[0] <= lo:
+                    lo, lo_m = prev[0], prev[1]
+                if prev[2] >= hi:
+                    hi, hi_m = prev[2], prev[3]
+            days[dd] = (lo, lo_m, hi, hi_m)
+
+    def summary(self, key: Tuple[int, int], as_of: Optional[int] = None, history: int = 0) -> Optional[Dict]:
+        """Latest price, moving averages and week-on-week change for one series"""
+        series = self.series[key]
+        idx = len(series.days) if as_of is None else bisect_right(series.days, as_of)
+        if idx == 0:
+            return None
+        last = series.days[idx - 1]
+        ref = last if as_of is None else as_of
+        out: Dict = {
+            "date": _iso(last),
+            "modal_price": _price(series.sums[idx - 1] / series.counts[idx - 1]),
+        }
+        for w in MA_WINDOWS:
+            ma = series.mean(ref - w + 1, ref)
+            out[f"ma_{w}"] = None if ma is None else round(ma, 2)
+        this_week = series.mean(ref - 6, ref)
+        last_week = series.mean(ref - 13, ref - 7)
+        out["wow_change_pct"] = (
+            round((this_week - last_week) / last_week * 100, 2) if this_week and last_week else None
+        )
+        if history:
+            points = []
+            for j in range(max(0, idx - history), idx):
+                d = series.days[j]
+                points.append({
+                    "date": _iso(d),
+                    "modal_price": _price(series.sums[j] / series.counts[j]),
+                    "ma_7": round(series.mean(d - 6, d), 2),
+                })
+            out["history"] = points
+        return out
+
+    def state_range(self, crop: int, state: int, day: int) -> Optional[Tuple[float, int, float, int]]:
+        return self.ranges.get((crop, state), {}).get(day)
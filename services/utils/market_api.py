@@ -1,20 +1,129 @@
-from datetime import datetime
-from typing import Dict, List
+import os
+import json
+import hashlib
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from .market_store import MarketStore
 
 # In production, integrate Agmarknet/eNAM official APIs.
 # For hackathon, we provide a mock with a few crops and prices.
+# Set MARKET_DATA to an Agmarknet CSV/JSON dump (or a directory written by
+# MarketStore.save) to serve real data instead.
+MARKET_DATA = os.getenv("MARKET_DATA")
+# prewarm.py ingests a MARKET_DATA file at build time and saves it here, so a
+# cold start memory-maps the arrays instead of parsing the dump again
+MARKET_SNAPSHOT = os.getenv(
+    "MARKET_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snapshot", "market"),
+)
+SNAPSHOT_SOURCE = "source.json"
+MARKET_PAGE_SIZE = int(os.getenv("MARKET_PAGE_SIZE", "50"))
+MARKET_MAX_PAGE_SIZE = 1000
+MARKET_MAX_HISTORY = 365
+# Mandi prices are published daily; clients may reuse a response this long
+MARKET_CACHE_MAX_AGE = int(os.getenv("MARKET_CACHE_MAX_AGE", "300"))
 
 MOCK_PRICES = [
-    {"market": "Ahmedabad (APMC)", "crop": "wheat", "modal_price": 2250, "unit": "INR/qtl"},
-    {"market": "Surat (APMC)", "crop": "cotton", "modal_price": 6500, "unit": "INR/qtl"},
-    {"market": "Pune (APMC)", "crop": "tomato", "modal_price": 1200, "unit": "INR/qtl"},
-    {"market": "Indore (APMC)", "crop": "soybean", "modal_price": 4800, "unit": "INR/qtl"},
+    {"market": "Ahmedabad (APMC)", "state": "Gujarat", "crop": "wheat", "modal_price": 2250, "unit": "INR/qtl"},
+    {"market": "Surat (APMC)", "state": "Gujarat", "crop": "cotton", "modal_price": 6500, "unit": "INR/qtl"},
+    {"market": "Pune (APMC)", "state": "Maharashtra", "crop": "tomato", "modal_price": 1200, "unit": "INR/qtl"},
+    {"market": "Indore (APMC)", "state": "Madhya Pradesh", "crop": "soybean", "modal_price": 4800, "unit": "INR/qtl"},
 ]
 
+_store: Optional["MarketStore"] = None
+_store_lock = threading.Lock()
+
+
+def _mock_store() -> "MarketStore":
+    from .market_store import MarketStore, today_number
+
+    store = MarketStore()
+    today = today_number()
+    store.add_records({**row, "date": today} for row in MOCK_PRICES)
+    return store
+
+
+def source_fingerprint(path: str) -> Dict:
+    # a content hash rather than mtime (deploy uploads do not preserve
+    # mtimes) or size alone (a daily refresh often keeps the same size)
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return {"name": os.path.basename(os.path.normpath(path)), "size": os.path.getsize(path),
+            "blake2b": h.hexdigest()}
+
+
+def snapshot_matches(snapshot: str, source: str) -> bool:
+    """True when ``snapshot`` was written from the current ``source`` file"""
+    if os.path.isdir(source):
+        return False
+    try:
+        with open(os.path.join(snapshot, SNAPSHOT_SOURCE)) as f:
+            saved = json.load(f)
+        if saved.get("size") != os.path.getsize(source):
+            return False  # skip hashing a dump that has visibly changed
+        return saved == source_fingerprint(source)
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def write_snapshot(source: str, snapshot: str = MARKET_SNAPSHOT) -> "MarketStore":
+    """Ingest ``source`` and save it in the mmap layout read by get_store()"""
+    from .market_store import MarketStore
+
+    store = MarketStore.from_path(source)
+    store.save(snapshot)
+    with open(os.path.join(snapshot, SNAPSHOT_SOURCE), "w") as f:
+        json.dump(source_fingerprint(source), f)
+    return store
+
+
+def get_store() -> "MarketStore":
+    """The process-wide price store, built (and numpy imported) on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if MARKET_DATA:
+                    from .market_store import MarketStore
+
+                    current = snapshot_matches(MARKET_SNAPSHOT, MARKET_DATA)
+                    _store = MarketStore.from_path(MARKET_SNAPSHOT if current else MARKET_DATA)
+                else:
+                    _store = _mock_store()
+    return _store
+
+
+def get_prices(
+    crop: str | None = None,
+    state: str | None = None,
+    market: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    limit: int = MARKET_PAGE_SIZE,
+    offset: int = 0,
+) -> Dict:
+    limit = max(1, min(limit, MARKET_MAX_PAGE_SIZE))
+    return get_store().query(
+        crop=crop, state=state, market=market, date_from=date_from, date_to=date_to,
+        limit=limit, offset=max(0, offset),
+    )
+
 
-def get_prices(crop: str | None = None, state: str | None = None) -> Dict:
-    items: List[Dict] = MOCK_PRICES
-    if crop:
-        items = [x for x in items if x["crop"].lower() == crop.lower()]
-    # state filtering omitted in mock
-    return {"as_of": datetime.utcnow().isoformat() + "Z", "results": items}
+def get_price_analytics(
+    crop: str,
+    state: str | None = None,
+    market: str | None = None,
+    date_to: str | None = None,
+    history: int = 0,
+    limit: int = MARKET_PAGE_SIZE,
+    offset: int = 0,
+) -> Dict:
+    limit = max(1, min(limit, MARKET_MAX_PAGE_SIZE))
+    return get_store().analytics_query(
+        crop, state=state, market=market, date_to=date_to,
+        history=max(0, min(history, MARKET_MAX_HISTORY)), limit=limit, offset=max(0, offset),
+    )
@@ -0,0 +1,465 @@
+import os
+import csv
+import json
+import time
+import threading
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .market_analytics import PriceAnalytics, _price
+
+# Index order: rows are sorted by this composite key, so any prefix of it
+# (crop / crop+state / crop+state+market[+date range]) is one contiguous slice.
+INDEX_COLUMNS = ("crop", "state", "market")
+PRICE_COLUMNS = ("min_price", "max_price", "modal_price")
+DEFAULT_UNIT = "INR/qtl"
+INGEST_CHUNK_ROWS = 200_000
+
+_EPOCH = date(1970, 1, 1)
+
+# Header spellings seen in Agmarknet / data.gov.in exports, normalised by _norm_header
+_ALIASES = {
+    "commodity": "crop",
+    "market_name": "market",
+    "apmc": "market",
+    "arrival_date": "date",
+    "price_date": "date",
+    "reported_date": "date",
+    "min_price_(rs./quintal)": "min_price",
+    "max_price_(rs./quintal)": "max_price",
+    "modal_price_(rs./quintal)": "modal_price",
+}
+
+
+def _norm_header(name: str) -> str:
+    key = name.strip().lower().replace("_x0020_", "_").replace(" ", "_")
+    return _ALIASES.get(key, key)
+
+
+def _parse_day(text: str) -> int:
+    text = text.strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return (datetime.strptime(text[:19], fmt).date() - _EPOCH).days
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {text!r}")
+
+
+def day_number(value) -> int:
+    """Days since 1970-01-01 for a date, datetime or ISO/Agmarknet date string"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return (value - _EPOCH).days
+    return _parse_day(str(value))
+
+
+def _bits(n: int) -> int:
+    return max(1, (max(n, 1) - 1).bit_length())
+
+
+class _Vocab:
+    """Dictionary encoding for a string column (case-insensitive lookup)"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for v in values:
+            self.add(v)
+
+    def add(self, value: str) -> int:
+        key = value.strip().lower()
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value.strip())
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.codes.get(value.strip().lower())
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class MarketStore:
+    """Columnar, indexed store of daily mandi prices.
+
+    Strings are dictionary-encoded into int32 code columns, dates are int32
+    day numbers and prices float32, so 10M rows take ~300 MB. Rows are kept
+    sorted by a packed int64 key over (crop, state, market, date) and
+    queries with a key prefix are two ``searchsorted`` calls; state- or
+    market-only filters use CSR posting lists. Ingestion appends and
+    rebuilds the index once per batch, not per row.
+    """
+
+    def __init__(self, unit: str = DEFAULT_UNIT):
+        self.unit = unit
+        self.vocab = {c: _Vocab() for c in INDEX_COLUMNS}
+        self.cols: Dict[str, np.ndarray] = {c: np.empty(0, np.int32) for c in (*INDEX_COLUMNS, "date")}
+        self.cols.update({c: np.empty(0, np.float32) for c in PRICE_COLUMNS})
+        self.key = np.empty(0, np.int64)
+        self._shifts: Dict[str, int] = {}
+        self._day0 = 0
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.as_of: Optional[str] = None
+        self.updated_at: Optional[float] = None
+        self.build_seconds: Optional[float] = None
+        self._analytics: Optional[PriceAnalytics] = None
+        self._analytics_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+    # -------------------- ingestion -------------------- #
+
+    def add_columns(self, columns: Dict[str, Sequence], build: bool = True) -> int:
+        """Append already-columnar data: strings for crop/state/market,
+        day numbers (or date strings) for ``date`` and numbers for prices.
+
+        Pass ``build=False`` when appending several chunks and call
+        :meth:`build` once at the end.
+        """
+        n = len(columns["crop"])
+        new: Dict[str, np.ndarray] = {}
+        for c in INDEX_COLUMNS:
+            vals = columns.get(c)
+            if vals is None:
+                vals = [""] * n
+            vocab = self.vocab[c]
+            # factorise via a per-batch dict: one vocab lookup per distinct string
+            seen: Dict[str, int] = {}
+            new[c] = np.fromiter(
+                (seen[v] if v in seen else seen.setdefault(v, vocab.add(v)) for v in vals),
+                dtype=np.int32, count=n,
+            )
+        dates = columns["date"]
+        if n and not isinstance(dates[0], (int, np.integer)):
+            parsed: Dict[str, int] = {}
+            dates = [parsed[d] if d in parsed else parsed.setdefault(d, day_number(d)) for d in dates]
+        new["date"] = np.asarray(dates, dtype=np.int32)
+        modal = np.asarray(columns["modal_price"], dtype=np.float32)
+        new["modal_price"] = modal
+        for c in ("min_price", "max_price"):
+            vals = columns.get(c)
+            new[c] = modal if vals is None else np.asarray(vals, dtype=np.float32)
+        for c, arr in new.items():
+            self.cols[c] = np.concatenate([self.cols[c], arr]) if len(self.cols[c]) else arr
+        if self._analytics is not None:
+            self._analytics.update(new["crop"], new["state"], new["market"], new["date"], new["modal_price"])
+        if build:
+            self.build()
+        return n
+
+    def add_records(self, records: Iterable[Dict]) -> int:
+        """Append dict rows (JSON API payloads, CSV rows, fixtures)"""
+        total = 0
+        batch: Dict[str, List] = {}
+        for rec in records:
+            row = {_norm_header(k): v for k, v in rec.items()}
+            if row.get("modal_price") in (None, ""):
+                raise ValueError(f"Market row without modal_price: {rec}")
+            for c in (*INDEX_COLUMNS, "date", "modal_price"):
+                batch.setdefault(c, []).append(row.get(c, ""))
+            for c in ("min_price", "max_price"):
+                val = row.get(c)
+                batch.setdefault(c, []).append(row["modal_price"] if val in (None, "") else val)
+            if len(batch["crop"]) >= INGEST_CHUNK_ROWS:
+                total += self._add_batch(batch)
+                batch = {}
+        if batch:
+            total += self._add_batch(batch)
+        self.build()
+        return total
+
+    def _add_batch(self, batch: Dict[str, List]) -> int:
+        batch["crop"] = [c.lower() for c in batch["crop"]]
+        for c in PRICE_COLUMNS:
+            batch[c] = [float(v) for v in batch[c]]
+        return self.add_columns(batch, build=False)
+
+    def ingest_csv(self, path: str) -> int:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return self.add_records(csv.DictReader(f))
+
+    def ingest_json(self, path: str) -> int:
+        """Accept a list of rows or a data.gov.in style ``{"records": [...]}``"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("records", [])
+        return self.add_records(data)
+
+    # -------------------- index -------------------- #
+
+    def _layout(self) -> None:
+        """Bit layout of the packed key for the current vocab sizes and dates"""
+        dates = self.cols["date"]
+        self._day0 = int(dates.min()) if len(dates) else 0
+        self._date_bits = _bits(int(dates.max()) - self._day0 + 1) if len(dates) else 1
+        widths = [_bits(len(self.vocab[c])) for c in INDEX_COLUMNS]
+        if sum(widths) + self._date_bits > 63:
+            raise ValueError("Market index key does not fit in 64 bits")
+        shift = self._date_bits
+        self._shifts = {"date": 0}
+        for c, w in zip(reversed(INDEX_COLUMNS), reversed(widths)):
+            self._shifts[c] = shift
+            shift += w
+        if len(dates):
+            self.as_of = date.fromordinal(_EPOCH.toordinal() + int(dates.max())).isoformat()
+
+    def build(self) -> None:
+        """Sort rows by the packed key and rebuild the posting lists"""
+        t0 = time.perf_counter()
+        self._layout()
+        key = self.cols["date"].astype(np.int64) - self._day0
+        for c in INDEX_COLUMNS:
+            key |= self.cols[c].astype(np.int64) << self._shifts[c]
+        order = np.argsort(key, kind="stable")
+        self.key = key[order]
+        for c in self.cols:
+            self.cols[c] = self.cols[c][order]
+        self._postings = {}
+        for c in ("state", "market"):
+            ids = np.argsort(self.cols[c], kind="stable").astype(np.int64)
+            offsets = np.zeros(len(self.vocab[c]) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.cols[c], minlength=len(self.vocab[c])), out=offsets[1:])
+            self._postings[c] = (offsets, ids)
+        self.updated_at = time.time()
+        self.build_seconds = round(time.perf_counter() - t0, 4)
+
+    # -------------------- queries -------------------- #
+
+    def _key_range(self, codes: List[int], lo_day: Optional[int], hi_day: Optional[int]) -> slice:
+        prefix = 0
+        for c, code in zip(INDEX_COLUMNS, codes):
+            prefix |= code << self._shifts[c]
+        lo, hi = prefix, prefix + (1 << self._shifts[INDEX_COLUMNS[len(codes) - 1]])
+        if len(codes) == len(INDEX_COLUMNS):
+            # full prefix: the date range is a sub-slice too
+            span = 1 << self._date_bits
+            if lo_day is not None:
+                lo = prefix + min(span, max(0, lo_day - self._day0))
+            if hi_day is not None:
+                hi = prefix + min(span, max(0, hi_day - self._day0 + 1))
+        start, stop = np.searchsorted(self.key, [lo, hi])
+        return slice(int(start), int(max(start, stop)))
+
+    def select(
+        self,
+        crop: Optional[str] = None,
+        state: Optional[str] = None,
+        market: Optional[str] = None,
+        date_from=None,
+        date_to=None,
+    ) -> np.ndarray:
+        """Row ids (in index order) matching every given filter"""
+        wanted = {"crop": crop, "state": state, "market": market}
+        codes: Dict[str, int] = {}
+        for c, value in wanted.items():
+            if value:
+                code = self.vocab[c].lookup(value)
+                if code is None:
+                    return np.empty(0, dtype=np.int64)
+                codes[c] = code
+        lo_day = day_number(date_from) if date_from else None
+        hi_day = day_number(date_to) if date_to else None
+
+        prefix = []
+        for c in INDEX_COLUMNS:
+            if c not in codes:
+                break
+            prefix.append(codes[c])
+        rng = None
+        if prefix:
+            rng = self._key_range(prefix, lo_day, hi_day)
+            ids = rng
+        elif codes:
+            # no crop: walk the smallest posting list among the given columns
+            def posting_len(c):
+                offsets = self._postings[c][0]
+                return offsets[codes[c] + 1] - offsets[codes[c]]
+
+            col = min(codes, key=posting_len)
+            offsets, postings = self._postings[col]
+            ids = postings[offsets[codes[col]]:offsets[codes[col] + 1]]
+        else:
+            rng = ids = slice(0, len(self))
+
+        mask = None
+        for c, code in codes.items():
+            if c in INDEX_COLUMNS[:len(prefix)]:
+                continue
+            m = self.cols[c][ids] == code
+            mask = m if mask is None else mask & m
+        if len(prefix) < len(INDEX_COLUMNS) and (lo_day is not None or hi_day is not None):
+            d = self.cols["date"][ids]
+            m = np.ones(len(d), dtype=bool)
+            if lo_day is not None:
+                m &= d >= lo_day
+            if hi_day is not None:
+                m &= d <= hi_day
+            mask = m if mask is None else mask & m
+        if rng is None:
+            return ids if mask is None else ids[mask]
+        if mask is None:
+            return np.arange(rng.start, rng.stop, dtype=np.int64)
+        # contiguous slice: filter a view, never materialise the full id range
+        return rng.start + np.flatnonzero(mask)
+
+    def rows(self, ids: np.ndarray) -> List[Dict]:
+        if not len(ids):
+            return []
+        out = {c: [self.vocab[c].values[i] for i in self.cols[c][ids].tolist()] for c in INDEX_COLUMNS}
+        day0 = _EPOCH.toordinal()
+        days = [date.fromordinal(day0 + d).isoformat() for d in self.cols["date"][ids].tolist()]
+        prices = {c: self.cols[c][ids].tolist() for c in PRICE_COLUMNS}
+        return [
+            {
+                "market": out["market"][i],
+                "state": out["state"][i],
+                "crop": out["crop"][i],
+                "date": days[i],
+                "min_price": _price(prices["min_price"][i]),
+                "max_price": _price(prices["max_price"][i]),
+                "modal_price": _price(prices["modal_price"][i]),
+                "unit": self.unit,
+            }
+            for i in range(len(ids))
+        ]
+
+    def query(self, limit: int = 50, offset: int = 0, **filters) -> Dict:
+        ids = self.select(**filters)
+        page = ids[offset:offset + limit]
+        return {
+            "as_of": self.as_of,
+            "total": int(len(ids)),
+            "limit": limit,
+            "offset": offset,
+            "results": self.rows(page),
+        }
+
+    # -------------------- analytics -------------------- #
+
+    @property
+    def analytics(self) -> PriceAnalytics:
+        """Rolling aggregates, built from the columns on first use and then
+        updated incrementally by every later ingestion batch"""
+        if self._analytics is None:
+            with self._analytics_lock:
+                if self._analytics is None:
+                    analytics = PriceAnalytics()
+                    analytics.update(*(np.asarray(self.cols[c]) for c in (*INDEX_COLUMNS, "date", "modal_price")))
+                    self._analytics = analytics
+        return self._analytics
+
+    def analytics_query(
+        self,
+        crop: str,
+        state: Optional[str] = None,
+        market: Optional[str] = None,
+        date_to=None,
+        history: int = 0,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict:
+        """Moving averages, week-on-week change and the state's cheapest /
+        dearest mandi for every (crop, market) series matching the filters"""
+        analytics = self.analytics
+        empty = {"as_of": self.as_of, "total": 0, "limit": limit, "offset": offset, "results": []}
+        crop_code = self.vocab["crop"].lookup(crop)
+        if crop_code is None:
+            return empty
+        wanted = {}
+        for c, value in (("state", state), ("market", market)):
+            if value:
+                code = self.vocab[c].lookup(value)
+                if code is None:
+                    return empty
+                wanted[c] = code
+        if "market" in wanted:
+            key = (crop_code, wanted["market"])
+            series = analytics.series.get(key)
+            keys = [key] if series and series.state == wanted.get("state", series.state) else []
+        else:
+            keys = [
+                k for k in analytics.by_crop.get(crop_code, [])
+                if "state" not in wanted or analytics.series[k].state == wanted["state"]
+            ]
+        as_of = day_number(date_to) if date_to else None
+        if as_of is not None:
+            # series that only start after date_to have no summary; leave them
+            # out before paging so total matches what the pages hold
+            keys = [k for k in keys if analytics.series[k].days[0] <= as_of]
+        markets, states = self.vocab["market"].values, self.vocab["state"].values
+        results = []
+        for key in keys[offset:offset + limit]:
+            summary = analytics.summary(key, as_of, history)
+            state_code = analytics.series[key].state
+            row = {"crop": self.vocab["crop"].values[crop_code], "state": states[state_code],
+                   "market": markets[key[1]], "unit": self.unit, **summary}
+            rng = analytics.state_range(crop_code, state_code, day_number(summary["date"]))
+            if rng is not None:
+                row["state_range"] = {
+                    "min_price": _price(rng[0]), "min_market": markets[rng[1]],
+                    "max_price": _price(rng[2]), "max_market": markets[rng[3]],
+                }
+            results.append(row)
+        return {**empty, "total": len(keys), "results": results}
+
+    # -------------------- persistence -------------------- #
+
+    def save(self, directory: str) -> None:
+        """Write one .npy per column plus a JSON manifest (memory-mappable)"""
+        os.makedirs(directory, exist_ok=True)
+        arrays = {**self.cols, "key": self.key}
+        for c, (offsets, ids) in self._postings.items():
+            arrays[f"{c}_offsets"], arrays[f"{c}_postings"] = offsets, ids
+        for name, arr in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), arr)
+        manifest = {
+            "unit": self.unit,
+            "rows": len(self),
+            "vocab": {c: self.vocab[c].values for c in INDEX_COLUMNS},
+        }
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "MarketStore":
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        store = cls(unit=manifest.get("unit", DEFAULT_UNIT))
+        store.vocab = {c: _Vocab(manifest["vocab"][c]) for c in INDEX_COLUMNS}
+        def read(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        # saved already sorted and indexed: map the arrays, nothing to rebuild
+        for c in store.cols:
+            store.cols[c] = read(c)
+        store.key = read("key")
+        store._postings = {c: (read(f"{c}_offsets"), read(f"{c}_postings")) for c in ("state", "market")}
+        store._layout()
+        store.updated_at = os.path.getmtime(os.path.join(directory, "manifest.json"))
+        return store
+
+    @classmethod
+    def from_path(cls, path: str) -> "MarketStore":
+        """Load a saved store directory, or ingest a .csv / .json dump"""
+        if os.path.isdir(path):
+            return cls.load(path)
+        store = cls()
+        if path.lower().endswith(".json"):
+            store.ingest_json(path)
+        else:
+            store.ingest_csv(path)
+        return store
+
+
+def today_number() -> int:
+    return (datetime.now(timezone.utc).date() - _EPOCH).days
@@ -0,0 +1,203 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds; covers a sub-millisecond fertilizer plan up to a slow upstream call
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED = "<unmatched>"
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # one slot per bucket plus +Inf, allocated once; observe() only increments
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Family:
+    """One metric name with a fixed set of label names.
+
+    Children are created on first use of a label combination and kept for the
+    life of the process; label values must come from a small closed set
+    (route templates, upstream paths), never from raw request data.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+        if child is None:
+            child = _Histogram(self.buckets) if self.kind == "histogram" else _Value()
+            # setdefault: two threads racing here still end up sharing one child
+            child = self.children.setdefault(values, child)
+        return child
+
+    def _label_str(self, values: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self.children.items()):
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{self._label_str(values)} {_num(child.value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*child.bounds, "+Inf"), child.counts):
+                cumulative += count
+                le = 'le="%s"' % (bound if bound == "+Inf" else _num(bound))
+                lines.append(f"{self.name}_bucket{self._label_str(values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(values)} {_num(child.sum)}")
+            lines.append(f"{self.name}_count{self._label_str(values)} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Registry:
+    """Process-local metrics rendered in the Prometheus text format.
+
+    There are no locks: counters are plain Python numbers updated from the
+    event loop thread (timings of thread-pool work are recorded after the
+    ``await`` returns), so an observation is a dict lookup, a bisect and two
+    increments. Each worker process exposes its own numbers.
+    """
+
+    def __init__(self):
+        self.families: Dict[str, Family] = {}
+
+    def _family(self, name: str, help: str, kind: str, labelnames: Iterable[str], **kw) -> Family:
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = Family(name, help, kind, tuple(labelnames), **kw)
+        return family
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Family:
+        return self._family(name, help, "counter", labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Family:
+        return self._family(name, help, "gauge", labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Family:
+        return self._family(name, help, "histogram", labelnames, buckets=buckets)
+
+    def render(self) -> bytes:
+        lines: List[str] = []
+        for family in self.families.values():
+            lines += family.render()
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("route", "method", "status"))
+HTTP_ERRORS = REGISTRY.counter(
+    "http_request_errors_total", "Requests that ended in a 5xx or an unhandled exception", ("route", "method"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body", ("route", "method"))
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests currently being served")
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "OpenWeather calls (cache misses only)", ("upstream", "endpoint", "outcome"))
+INFERENCE_LATENCY = REGISTRY.histogram(
+    "model_inference_duration_seconds", "One model call, batched or inline", ("model",))
+INFERENCE_ROWS = REGISTRY.counter("model_inference_rows_total", "Rows scored by the model", ("model",))
+DECODE_LATENCY = REGISTRY.histogram(
+    "image_decode_duration_seconds", "Leaf photo decode and resize, thread-pool time included", ("route",))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording count, latency and in-flight requests.
+
+    Routes are labelled with their template (``/weather/simple``), read from
+    the scope after the router has matched, so path parameters and 404 scans
+    cannot create new series.
+    """
+
+    def __init__(self, app, skip_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED
+            method = scope["method"]
+            HTTP_LATENCY.labels(route, method).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(route, method, str(status)).inc()
+            if status >= 500:
+                HTTP_ERRORS.labels(route, method).inc()
+
+
+class timer:
+    """``with timer(HISTOGRAM.labels(...)):`` observes the block's wall time"""
+
+    __slots__ = ("child", "start")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> Optional[bool]:
+        self.child.observe(time.perf_counter() - self.start)
+        return None
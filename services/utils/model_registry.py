@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Preferred first: joblib artifacts can be memory-mapped and shared between workers
+EXTENSIONS = (".joblib", ".pkl")
+
+
+class ArtifactError(RuntimeError):
+    """Raised when a model artifact is corrupt or fails its checksum"""
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class _Slot:
+    def __init__(self, name: str, stem: str):
+        self.name = name
+        self.stem = stem
+        self.model: Any = None
+        self.path: Optional[str] = None
+        self.version: Optional[str] = None
+        self.meta: Dict = {}
+        self.mtime: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+
+
+class ModelRegistry:
+    """Lazily loaded, checksum-verified model artifacts with hot swap.
+
+    Each model is looked up as ``<stem>.joblib`` or ``<stem>.pkl`` in
+    ``models_dir``. A ``<stem>.json`` sidecar (written by the training
+    pipeline) may carry ``sha256`` and ``version``; a checksum mismatch
+    refuses the artifact instead of serving a corrupt model. Joblib
+    artifacts are opened with ``mmap_mode="r"`` so plain numpy weights live
+    in the page cache once and are shared by every uvicorn worker (sklearn
+    trees still copy their nodes on load).
+    """
+
+    def __init__(self, models_dir: str, mmap_mode: Optional[str] = "r"):
+        self.models_dir = models_dir
+        self.mmap_mode = mmap_mode
+        self._slots: Dict[str, _Slot] = {}
+
+    def register(self, name: str, stem: str) -> None:
+        self._slots[name] = _Slot(name, stem)
+
+    def _find(self, slot: _Slot) -> Optional[str]:
+        for ext in EXTENSIONS:
+            path = os.path.join(self.models_dir, slot.stem + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _read(self, path: str, meta: Dict) -> Any:
+        expected = meta.get("sha256")
+        if expected and sha256_file(path) != expected:
+            raise ArtifactError(f"{os.path.basename(path)}: sha256 does not match metadata")
+        if path.endswith(".joblib"):
+            import joblib
+
+            return joblib.load(path, mmap_mode=self.mmap_mode)
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _load(self, slot: _Slot) -> None:
+        path = self._find(slot)
+        if path is None:
+            slot.error = None
+            slot.loaded.set()
+            return
+        meta_path = os.path.join(self.models_dir, slot.stem + ".json")
+        t0 = time.perf_counter()
+        try:
+            meta: Dict = {}
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            mtime = os.path.getmtime(path)
+            model = self._read(path, meta)
+        except Exception as e:
+            # keep serving whatever was loaded before; surface the failure
+            slot.error = f"{type(e).__name__}: {e}"
+            logger.exception("Failed to load model %s from %s", slot.name, path)
+            slot.loaded.set()
+            return
+        slot.model = model
+        slot.path = path
+        slot.meta = meta
+        slot.mtime = mtime
+        slot.version = meta.get("version") or f"{os.path.basename(path)}@{int(mtime)}"
+        slot.load_seconds = round(time.perf_counter() - t0, 4)
+        slot.error = None
+        slot.loaded.set()
+        logger.info("Loaded model %s %s in %.3fs", slot.name, slot.version, slot.load_seconds)
+
+    def get(self, name: str) -> Any:
+        """Return the model, loading it on first use (``None`` if absent)"""
+        slot = self._slots[name]
+        if not slot.loaded.is_set():
+            with slot.lock:
+                if not slot.loaded.is_set():
+                    self._load(slot)
+        return slot.model
+
+    def is_loaded(self, name: str) -> bool:
+        return self._slots[name].loaded.is_set()
+
+    def ready(self) -> bool:
+        """Every registered model has been attempted (loaded, absent or failed)"""
+        return all(slot.loaded.is_set() for slot in self._slots.values())
+
+    def version(self, name: str) -> Optional[str]:
+        return self._slots[name].version
+
+    def preload(self, background: bool = True) -> Optional[threading.Thread]:
+        def run():
+            for name in self._slots:
+                self.get(name)
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def reload(self, name: Optional[str] = None, force: bool = False) -> Dict[str, Optional[str]]:
+        """Hot-swap artifacts whose file changed on disk (or all, with ``force``).
+
+        The new model is fully loaded before the reference is swapped, so
+        requests in flight finish on the old one.
+        """
+        names = [name] if name else list(self._slots)
+        for n in names:
+            slot = self._slots[n]
+            with slot.lock:
+                path = self._find(slot)
+                changed = (
+                    path != slot.path
+                    or (path is not None and os.path.getmtime(path) != slot.mtime)
+                )
+                if force or changed or not slot.loaded.is_set():
+                    if path is None:
+                        slot.model, slot.path, slot.version, slot.mtime = None, None, None, None
+                        slot.loaded.set()
+                    else:
+                        self._load(slot)
+        return {n: self._slots[n].version for n in names}
+
+    def status(self) -> Dict[str, Dict]:
+        out = {}
+        for name, slot in self._slots.items():
+            out[name] = {
+                "loaded": slot.model is not None,
+                "version": slot.version,
+                "artifact": os.path.basename(slot.path) if slot.path else None,
+                "load_seconds": slot.load_seconds,
+            }
+            if slot.error:
+                out[name]["error"] = slot.error
+        return out
@@ -0,0 +1,332 @@
+import os
+import math
+import time
+import select
+import signal
+import socket
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+READY_PATH = "/ready"
+
+
+def _cgroup_cpus() -> Optional[int]:
+    """CPU limit of the container (cgroup v2, then v1), if one is set"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0:
+            return max(1, math.ceil(quota / period))
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """Cores this process may actually use: affinity mask and container quota"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    limit = _cgroup_cpus()
+    return max(1, min(cpus, limit) if limit else cpus)
+
+
+def configure_threads(workers: int) -> int:
+    """Split the cores between the workers' native thread pools.
+
+    Must run before numpy/PIL are imported (BLAS sizes its pool at import).
+    Explicit settings in the environment win. Returns threads per worker.
+    """
+    per_worker = max(1, available_cpus() // max(1, workers))
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(per_worker))
+    os.environ.setdefault("DISEASE_DECODE_WORKERS", str(min(4, per_worker)))
+    return per_worker
+
+
+async def asgi_get(app, path: str) -> int:
+    """Status code of an in-process GET (no socket, no HTTP client)"""
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"localhost")], "client": None, "server": None,
+    }
+    await app(scope, receive, send)
+    return status[0] if status else 500
+
+
+class _Worker:
+    def __init__(self, index: int, pid: int, ready_fd: int):
+        self.index = index
+        self.pid = pid
+        self.ready_fd = ready_fd
+        self.started = time.monotonic()
+        self.ready = False
+
+
+class PreforkServer:
+    """Runs ``workers`` uvicorn processes on one listening socket.
+
+    The caller imports the app (and loads whatever it wants shared, e.g. the
+    models) in the parent before :meth:`run`; the socket is bound once and
+    the workers are forked from there, sharing those pages copy-on-write.
+    A worker counts as started only once its own ``/ready`` answers 200,
+    checked in-process after the lifespan startup.
+
+    Signals to the parent:
+
+    - SIGHUP: rolling restart. ``on_reload`` runs first (e.g. reload changed
+      model artifacts in the parent), then each worker is replaced in turn:
+      the new one must become ready before the old one is sent SIGTERM and
+      drained, so capacity never drops and no connection is refused. Code
+      changes still need a full restart, as with any preloading server.
+    - SIGTERM / SIGINT: graceful stop, SIGKILL after ``graceful_timeout``.
+    - SIGUSR1: forwarded to every worker.
+
+    Workers that die are replaced; the environment of each carries
+    ``WORKER_INDEX`` (0..workers-1, kept across restarts).
+    """
+
+    def __init__(
+        self,
+        app,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 1,
+        graceful_timeout: float = 30.0,
+        ready_timeout: float = 60.0,
+        on_reload: Optional[Callable[[], None]] = None,
+        child_init: Optional[Callable[[], None]] = None,
+        log_level: str = "info",
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self.on_reload = on_reload
+        self.child_init = child_init
+        self.log_level = log_level
+        self.sock: Optional[socket.socket] = None
+        self._slots: Dict[int, _Worker] = {}
+        self._stopping = False
+        self._reload = False
+        self._restarts: List[float] = []
+
+    # ---------------- worker side ---------------- #
+    def _child(self, index: int, ready_w: int) -> None:
+        import uvicorn
+
+        for sig in (signal.SIGHUP, signal.SIGUSR1, signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        os.environ["WORKER_INDEX"] = str(index)
+        if self.child_init is not None:
+            self.child_init()
+        app = self.app
+        ready_timeout = self.ready_timeout
+        draining = []
+
+        async def drain_aware(scope, receive, send):
+            if scope["type"] != "http" or not draining:
+                return await app(scope, receive, send)
+
+            async def send_close(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": [*message.get("headers", []), (b"connection", b"close")]}
+                await send(message)
+
+            await app(scope, receive, send_close)
+
+        class Server(uvicorn.Server):
+            async def shutdown(self, sockets=None):
+                # Stop accepting (siblings keep taking connections from the
+                # shared socket) and let keep-alive clients move over: each
+                # connection's next response says "Connection: close", idle
+                # ones hit the keep-alive timeout. Closing idle connections at
+                # once, as uvicorn does, races clients already reusing them.
+                draining.append(True)
+                for server in self.servers:
+                    server.close()
+                deadline = time.monotonic() + self.config.timeout_keep_alive + 1
+                while self.server_state.connections and time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                await super().shutdown(sockets=sockets)
+
+            async def startup(self, sockets=None):
+                await super().startup(sockets=sockets)
+                if self.should_exit:
+                    return
+                deadline = time.monotonic() + ready_timeout
+                while await asgi_get(app, READY_PATH) != 200:
+                    if time.monotonic() > deadline:
+                        return  # never signals ready; the parent gives up on it
+                    await asyncio.sleep(0.1)
+                os.write(ready_w, b"1")
+                os.close(ready_w)
+
+        config = uvicorn.Config(
+            drain_aware, log_level=self.log_level, timeout_graceful_shutdown=self.graceful_timeout, lifespan="on",
+        )
+        Server(config).run(sockets=[self.sock])
+
+    def _spawn(self, index: int) -> _Worker:
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                os.close(ready_r)
+                self._child(index, ready_w)
+            except BaseException:
+                logger.exception("Worker %d crashed", index)
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(ready_w)
+        logger.info("Started worker %d (pid %d)", index, pid)
+        return _Worker(index, pid, ready_r)
+
+    def _wait_ready(self, worker: _Worker) -> bool:
+        deadline = time.monotonic() + self.ready_timeout
+        while not worker.ready:
+            left = deadline - time.monotonic()
+            if left <= 0 or self._exited(worker.pid):
+                break
+            readable, _, _ = select.select([worker.ready_fd], [], [], min(left, 0.5))
+            if readable and os.read(worker.ready_fd, 1) == b"1":
+                worker.ready = True
+        os.close(worker.ready_fd)
+        return worker.ready
+
+    # ---------------- process bookkeeping ---------------- #
+    def _exited(self, pid: int) -> bool:
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            return True
+        return done == pid
+
+    def _stop_worker(self, worker: _Worker, timeout: float) -> None:
+        try:
+            os.kill(worker.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._exited(worker.pid):
+                return
+            time.sleep(0.05)
+        logger.warning("Worker %d (pid %d) did not drain in %.0fs; killing it", worker.index, worker.pid, timeout)
+        try:
+            os.kill(worker.pid, signal.SIGKILL)
+            os.waitpid(worker.pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+    def _reap(self) -> None:
+        """Replace workers that died on their own, backing off on crash loops"""
+        for index, worker in list(self._slots.items()):
+            if not self._exited(worker.pid):
+                continue
+            now = time.monotonic()
+            self._restarts = [t for t in self._restarts if now - t < 60] + [now]
+            logger.warning("Worker %d (pid %d) exited; restarting", index, worker.pid)
+            if len(self._restarts) > 5 * self.workers:
+                time.sleep(1.0)
+            new = self._spawn(index)
+            self._slots[index] = new
+            self._wait_ready(new)
+
+    def _rolling_restart(self) -> None:
+        if self.on_reload is not None:
+            try:
+                self.on_reload()
+            except Exception:
+                logger.exception("Reload hook failed; keeping the running workers")
+                return
+        for index in sorted(self._slots):
+            old = self._slots[index]
+            new = self._spawn(index)
+            if not self._wait_ready(new):
+                logger.error("Replacement for worker %d never became ready; aborting reload", index)
+                self._stop_worker(new, 0)
+                return
+            self._slots[index] = new
+            self._stop_worker(old, self.graceful_timeout)
+        logger.info("Rolling restart of %d workers complete", len(self._slots))
+
+    # ---------------- parent ---------------- #
+    def bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        self.sock = sock
+        return sock
+
+    def _on_signal(self, signum, _frame) -> None:
+        if signum == signal.SIGHUP:
+            self._reload = True
+        elif signum == signal.SIGUSR1:
+            for worker in self._slots.values():
+                try:
+                    os.kill(worker.pid, signal.SIGUSR1)
+                except ProcessLookupError:
+                    pass
+        else:
+            self._stopping = True
+
+    def run(self) -> None:
+        if self.sock is None:
+            self.bind()
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+            signal.signal(sig, self._on_signal)
+        t0 = time.perf_counter()
+        for index in range(self.workers):
+            self._slots[index] = self._spawn(index)
+        ready = sum(self._wait_ready(w) for w in self._slots.values())
+        logger.info("%d/%d workers ready in %.2fs on %s:%d",
+                    ready, self.workers, time.perf_counter() - t0, self.host, self.port)
+        try:
+            while not self._stopping:
+                if self._reload:
+                    self._reload = False
+                    self._rolling_restart()
+                self._reap()
+                try:
+                    time.sleep(0.2)
+                except InterruptedError:
+                    pass
+        finally:
+            for worker in self._slots.values():
+                try:
+                    os.kill(worker.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            deadline = time.monotonic() + self.graceful_timeout
+            for worker in self._slots.values():
+                self._stop_worker(worker, max(0.0, deadline - time.monotonic()))
+            self.sock.close()
@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter
+from typing import Dict, Optional
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 120.0
+# Leaf frames of a thread parked in a blocking wait (idle pool workers, an
+# event loop with nothing to do); left out unless idle=True
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Delay of the loop-lag monitor's heartbeat past its schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_STALLS = REGISTRY.counter("event_loop_stalls_total", "Times the event loop was blocked past the threshold")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def collapse(frame, thread_name: str) -> str:
+    """One stack as ``thread;outer;...;leaf`` (flamegraph.pl / speedscope input)"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_LEAVES
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack from a background thread.
+
+    Each tick reads ``sys._current_frames()``, so the profiled code is not
+    instrumented at all: the cost is one stack walk per thread per interval,
+    paid by the sampler thread. Only one profile runs per process at a time.
+    """
+
+    _running = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, idle: bool = False):
+        self.interval = interval
+        self.idle = idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def run(self, seconds: float) -> str:
+        """Sample for ``seconds`` and return collapsed stacks, one per line"""
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("a profile is already running in this process")
+        try:
+            me = threading.get_ident()
+            deadline = time.perf_counter() + min(seconds, MAX_PROFILE_SECONDS)
+            while time.perf_counter() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me or (not self.idle and _is_idle(frame)):
+                        continue
+                    self.stacks[collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+                self.samples += 1
+                time.sleep(self.interval)
+        finally:
+            self._running.release()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def write_profile(seconds: float, directory: str, interval: float = 0.005) -> str:
+    profile = SamplingProfiler(interval).run(seconds)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"profile-{os.getpid()}-{int(time.time())}.collapsed")
+    with open(path, "w") as f:
+        f.write(profile)
+    return path
+
+
+def install_signal_handler(signum: int, seconds: float, directory: str) -> None:
+    """On ``signum``, profile the process for ``seconds`` and write a
+    ``.collapsed`` file to ``directory``. Must be called on the main thread.
+    """
+    import signal
+
+    def handler(_signum, _frame):
+        def run():
+            try:
+                logger.warning("Profile written to %s", write_profile(seconds, directory))
+            except RuntimeError as e:
+                logger.warning("Profile signal ignored: %s", e)
+
+        threading.Thread(target=run, name="profile-signal", daemon=True).start()
+
+    signal.signal(signum, handler)
+
+
+class LoopLagMonitor:
+    """Logs the stack of whatever is blocking the event loop.
+
+    A heartbeat task wakes every ``interval`` seconds and records how late it
+    ran. A watchdog thread checks the heartbeat; once the loop has not ticked
+    for ``threshold`` seconds it captures the loop thread's current stack,
+    which is the handler (or library call) holding the loop, and logs it once
+    per stall.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: Optional[float] = None):
+        self.threshold = threshold
+        self.interval = interval or min(threshold / 2, 0.05)
+        self.stats: Dict[str, float] = {"stalls": 0, "max_lag_ms": 0.0}
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            LOOP_LAG.labels().observe(lag)
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], round(lag * 1000, 1))
+            self._beat = now
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            blocked = time.monotonic() - beat
+            if blocked < self.threshold or reported == beat:
+                continue
+            reported = beat
+            self.stats["stalls"] += 1
+            LOOP_STALLS.labels().inc()
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no frame>\n"
+            logger.warning("Event loop blocked for %.0f ms (threshold %.0f ms) in:\n%s",
+                           blocked * 1000, self.threshold * 1000, stack)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from .weather_cache import SQLiteTier, _Entry
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("DISEASE_CACHE_MB", "16")) * 1024 * 1024)
+DEFAULT_MAX_DISK_BYTES = int(float(os.getenv("DISEASE_CACHE_DB_MB", "256")) * 1024 * 1024)
+CHUNK = 1024 * 1024
+
+
+def file_digest(fp: BinaryIO) -> str:
+    """Hash an upload in 1 MB chunks and rewind it for decoding"""
+    h = hashlib.blake2b(digest_size=16)
+    fp.seek(0)
+    for chunk in iter(lambda: fp.read(CHUNK), b""):
+        h.update(chunk)
+    fp.seek(0)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Byte-bounded LRU of detection results keyed by upload content hash.
+
+    The detector version is fixed for the life of the cache and part of
+    every key: on disk it is the entry's kind, and opening the cache drops
+    rows written under any other version. A new detector or rule change
+    (a new ``DETECTOR_VERSION``) therefore never serves old labels. The
+    disk tier has its own budget, ``max_disk_bytes``, and drops the oldest
+    writes first. Thread-safe: lookups run on the threadpool next to the
+    hashing.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        disk: SQLiteTier | None = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        self.version = version
+        self.max_bytes = max_bytes
+        self.disk = disk
+        if disk is not None:
+            disk.max_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0}
+        if disk is not None:
+            disk.delete_kind_except(version)
+
+    @classmethod
+    def from_env(cls, version: str) -> "ResultCache":
+        path = os.getenv("DISEASE_CACHE_DB")
+        return cls(version, disk=SQLiteTier(path, table="disease_cache") if path else None)
+
+    def snapshot(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            **self.stats,
+        }
+
+    def get(self, digest: str) -> Optional[Dict]:
+        with self._lock:
+            hit = self._entries.get(digest)
+            if hit is not None:
+                self._entries.move_to_end(digest)
+                self.stats["hits"] += 1
+                return hit[0]
+        if self.disk is not None:
+            entry = self.disk.get(self.version, digest)
+            if entry is not None:
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self.stats["disk_hits"] += 1
+                self._store(digest, entry.value)
+                return entry.value
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, digest: str, result: Dict) -> None:
+        self._store(digest, result)
+        if self.disk is not None:
+            self.disk.put(self.version, digest, _Entry(time.time(), result))
+
+    def _store(self, digest: str, result: Dict) -> None:
+        size = len(digest) + len(json.dumps(result, separators=(",", ":")))
+        with self._lock:
+            old = self._entries.pop(digest, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[digest] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.stats["evictions"] += 1
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
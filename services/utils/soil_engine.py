@@ -0,0 +1,103 @@
+import csv
+import io
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .soil_helper import FERTILIZER_GUIDE, SOIL_NORM, fertilizer_plan
+
+# fertilizer_plan() depends only on the crop and on each soil parameter's
+# status (missing/low/ok/high), so every distinct plan is compiled once from
+# the scalar rules in soil_helper and whole arrays of samples become a table
+# lookup. That keeps batch output bit-for-bit identical to the per-sample path.
+
+SOIL_KEYS = tuple(SOIL_NORM)
+_LO = np.array([SOIL_NORM[k][0] for k in SOIL_KEYS], dtype=np.float64)
+_HI = np.array([SOIL_NORM[k][1] for k in SOIL_KEYS], dtype=np.float64)
+STATUS_MISSING, STATUS_LOW, STATUS_OK, STATUS_HIGH = 0, 1, 2, 3
+_PLACES = 4 ** np.arange(len(SOIL_KEYS) - 1, -1, -1)
+_DEFAULT_CROP = "default"  # any name missing from FERTILIZER_GUIDE
+
+_PLAN_TABLE: Dict[tuple, Dict] = {}
+
+
+def soil_matrix(samples) -> np.ndarray:
+    """Stack soil dicts into an (n, len(SOIL_KEYS)) array, NaN for missing"""
+    out = np.full((len(samples), len(SOIL_KEYS)), np.nan)
+    for i, soil in enumerate(samples):
+        for j, k in enumerate(SOIL_KEYS):
+            val = soil.get(k)
+            if val is not None:
+                out[i, j] = val
+    return out
+
+
+def classify_soil(values: np.ndarray) -> np.ndarray:
+    """Encode every sample's per-parameter status as one base-4 integer"""
+    status = np.where(values < _LO, STATUS_LOW, np.where(values > _HI, STATUS_HIGH, STATUS_OK))
+    status[np.isnan(values)] = STATUS_MISSING
+    return status @ _PLACES
+
+
+def _crop_key(crop: str) -> str:
+    key = crop.lower()
+    return key if key in FERTILIZER_GUIDE else _DEFAULT_CROP
+
+
+def _compile_plan(crop_key: str, code: int) -> Dict:
+    soil = {}
+    for j, k in enumerate(SOIL_KEYS):
+        status = (code // int(_PLACES[j])) % 4
+        lo, hi = SOIL_NORM[k]
+        if status == STATUS_LOW:
+            soil[k] = lo - 1
+        elif status == STATUS_OK:
+            soil[k] = lo
+        elif status == STATUS_HIGH:
+            soil[k] = hi + 1
+    return fertilizer_plan(crop_key, soil)
+
+
+def soil_from_csv(data: bytes) -> Tuple[List[str], np.ndarray]:
+    """Parse a CSV with a ``crop`` column and any of ph,N,P,K (blank = missing)"""
+    reader = csv.reader(io.StringIO(data.decode("utf-8-sig")))
+    header = [h.strip() for h in next(reader, [])]
+    if "crop" not in header:
+        raise ValueError("CSV is missing columns: crop")
+    crop_col = header.index("crop")
+    cols = [(j, header.index(k)) for j, k in enumerate(SOIL_KEYS) if k in header]
+    crops: List[str] = []
+    rows: List[List[float]] = []
+    for line, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        vals = [np.nan] * len(SOIL_KEYS)
+        try:
+            for j, col in cols:
+                cell = row[col].strip()
+                if cell:
+                    vals[j] = float(cell)
+            crops.append(row[crop_col].strip())
+        except (IndexError, ValueError):
+            raise ValueError(f"CSV row {line} has a missing or non-numeric value")
+        rows.append(vals)
+    return crops, np.array(rows, dtype=np.float64).reshape(len(rows), len(SOIL_KEYS))
+
+
+def fertilizer_plans(crops: Sequence[str], values: np.ndarray) -> List[Dict]:
+    """Plans for many samples at once; results are shared and read-only"""
+    codes = classify_soil(values).tolist()
+    plans = []
+    for crop, code in zip(crops, codes):
+        key = (_crop_key(crop), code)
+        plan = _PLAN_TABLE.get(key)
+        if plan is None:
+            plan = _PLAN_TABLE[key] = _compile_plan(*key)
+        plans.append(plan)
+    return plans
+
+
+def fertilizer_batch_response(crops: Sequence[str], values: np.ndarray) -> Dict:
+    plans = fertilizer_plans(crops, values)
+    results = [{"crop": crop, **plan} for crop, plan in zip(crops, plans)]
+    return {"count": len(results), "results": results}
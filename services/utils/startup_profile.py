@@ -0,0 +1,67 @@
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "PIL", "httpx", "sklearn", "joblib")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Rows of ``python -X importtime`` output, in import order"""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cum_us, indent, name = m.groups()
+            rows.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cum_us),
+                         "depth": (len(indent) - 1) // 2})
+    return rows
+
+
+def import_profile(target: str = "app", env: Optional[Dict[str, str]] = None, top: int = 15) -> dict:
+    """Import ``target`` in a fresh interpreter under ``-X importtime``.
+
+    Self time is summed per top-level package, so the report answers "what
+    does a cold start pay for" rather than listing thousands of modules.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=SERVICES_DIR, env={**os.environ, **(env or {})}, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    by_package: Dict[str, int] = {}
+    for r in rows:
+        pkg = r["module"].split(".")[0]
+        by_package[pkg] = by_package.get(pkg, 0) + r["self_us"]
+    # the target's own row is the root: its cumulative time is the whole import
+    total = next((r["cumulative_us"] for r in rows if r["module"] == target and r["depth"] == 0), 0)
+    slowest = sorted(rows, key=lambda r: r["self_us"], reverse=True)[:top]
+    return {
+        "target": target,
+        "total_ms": round(total / 1000, 1),
+        "modules": len(rows),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in by_package],
+        "packages": [{"package": p, "self_ms": round(us / 1000, 1)}
+                     for p, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]],
+        "slowest_modules": [{"module": r["module"], "self_ms": round(r["self_us"] / 1000, 1),
+                             "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in slowest],
+    }
+
+
+def format_report(profile: dict) -> str:
+    lines = [
+        f"import {profile['target']}: {profile['total_ms']} ms, {profile['modules']} modules",
+        f"heavy modules loaded: {', '.join(profile['heavy_loaded']) or 'none'}",
+        "",
+        f"{'self ms':>9}  package",
+    ]
+    lines += [f"{p['self_ms']:>9.1f}  {p['package']}" for p in profile["packages"]]
+    lines += ["", f"{'self ms':>9}  {'cum ms':>9}  module"]
+    lines += [f"{m['self_ms']:>9.1f}  {m['cumulative_ms']:>9.1f}  {m['module']}" for m in profile["slowest_modules"]]
+    return "\n".join(lines)
@@ -0,0 +1,47 @@
+import os
+from typing import Sequence
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+# Kept free of numpy/PIL: the middleware is installed at app import time
+MAX_UPLOAD_BYTES = int(float(os.getenv("DISEASE_MAX_UPLOAD_MB", "20")) * 1024 * 1024)
+MAX_BATCH_UPLOAD_BYTES = int(float(os.getenv("DISEASE_BATCH_MAX_UPLOAD_MB", "200")) * 1024 * 1024)
+
+
+class UploadLimitMiddleware:
+    """Reject request bodies over ``max_bytes`` while they stream in.
+
+    A declared Content-Length over the cap is refused before any body is
+    read; chunked uploads are counted as they arrive and aborted with 413 as
+    soon as they cross it, so an oversized photo is never fully buffered.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES, paths: Sequence[str] = ("/detect_disease",)):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB limit"
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        seen = 0
+
+        async def limited_receive():
+            nonlocal seen
+            message = await receive()
+            if message["type"] == "http.request":
+                seen += len(message.get("body", b""))
+                if seen > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
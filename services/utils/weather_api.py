@@ -1,59 +1,39 @@
 import os
-import requests
-from typing import Dict, List
-from datetime import datetime, timedelta
-import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
 
-OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
-FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
-ONECALL_URL = "https://api.openweathermap.org/data/2.5/onecall"
+import httpx
 
-class WeatherClient:
-    def __init__(self, api_key: str | None = None):
-        self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY")
-        if not self.api_key:
-            raise RuntimeError("Set OPENWEATHER_API_KEY env var")
+from .metrics import UPSTREAM_LATENCY
+from .weather_cache import WeatherCache
+from .weather_prefetch import TokenBucket
 
-    def current_by_pincode(self, pincode: str, country: str = "IN") -> Dict:
-        params = {"zip": f"{pincode},{country}", "appid": self.api_key, "units": "metric"}
-        r = requests.get(OPENWEATHER_URL, params=params, timeout=10)
-        r.raise_for_status()
-        return r.json()
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org")
+CURRENT_PATH = "/data/2.5/weather"
+FORECAST_PATH = "/data/2.5/forecast"
+ONECALL_PATH = "/data/2.5/onecall"
 
-    def forecast_by_pincode(self, pincode: str, country: str = "IN") -> Dict:
-        params = {"zip": f"{pincode},{country}", "appid": self.api_key, "units": "metric"}
-        r = requests.get(FORECAST_URL, params=params, timeout=10)
-        r.raise_for_status()
-        return r.json()
-    
-    def get_coordinates_by_pincode(self, pincode: str, country: str = "IN") -> tuple:
-        """Get latitude and longitude for a pincode"""
-        try:
-            current = self.current_by_pincode(pincode, country)
-            lat = current["coord"]["lat"]
-            lon = current["coord"]["lon"]
-            return lat, lon
-        except Exception:
-            # Default coordinates for India (New Delhi)
-            return 28.6139, 77.2090
+OPENWEATHER_URL = OPENWEATHER_BASE_URL + CURRENT_PATH
+FORECAST_URL = OPENWEATHER_BASE_URL + FORECAST_PATH
+ONECALL_URL = OPENWEATHER_BASE_URL + ONECALL_PATH
 
-    def get_detailed_forecast(self, pincode: str, country: str = "IN") -> Dict:
-        """Get detailed 7-day weather forecast including agricultural data"""
-        try:
-            lat, lon = self.get_coordinates_by_pincode(pincode, country)
-            params = {
-                "lat": lat,
-                "lon": lon,
-                "appid": self.api_key,
-                "units": "metric",
-                "exclude": "minutely"
-            }
-            r = requests.get(ONECALL_URL, params=params, timeout=10)
-            r.raise_for_status()
-            return r.json()
-        except Exception as e:
-            # Fallback to basic forecast
-            return self.forecast_by_pincode(pincode, country)
+# Connection pool sizing for the shared keep-alive client
+MAX_CONNECTIONS = int(os.getenv("OPENWEATHER_MAX_CONNECTIONS", "100"))
+MAX_PER_HOST = int(os.getenv("OPENWEATHER_MAX_PER_HOST", "20"))
+REQUEST_TIMEOUT = 10.0
+# Pincode -> (lat, lon) memo; India has ~19k pincodes so this holds them all
+COORD_CACHE_SIZE = 20000
+# Pincodes whose gazetteer coordinates fall in the same grid cell of this many
+# degrees share one upstream fetch and cache entry (0 = key by pincode)
+WEATHER_CELL_DEG = float(os.getenv("WEATHER_CELL_DEG", "0"))
+
+
+class _WeatherAdvisory:
+    """Pure advisory rules shared by the async client and its sync wrapper"""
 
     @staticmethod
     def simple_alerts(current: Dict) -> List[str]:
@@ -64,40 +44,40 @@ class WeatherClient:
         wind = current.get("wind", {}).get("speed", 0.0)
         temp = current.get("main", {}).get("temp", 25)
         humidity = current.get("main", {}).get("humidity", 50)
-        
+
         if rain >= 2:
             alerts.append("🌧️ Heavy rain alert: Postpone spraying and field work.")
         elif rain >= 0.5:
             alerts.append("🌦️ Light rain expected: Plan indoor activities.")
-            
+
         if wind >= 15:
             alerts.append("💨 High wind alert: Avoid pesticide spraying and tall crop work.")
         elif wind >= 10:
             alerts.append("🌬️ Moderate wind: Use caution with spray applications.")
-            
+
         if temp >= 38:
             alerts.append("🔥 Heat alert: Irrigate during evening/early morning only.")
         elif temp >= 35:
             alerts.append("☀️ Hot weather: Increase irrigation frequency.")
         elif temp <= 5:
             alerts.append("🧊 Frost alert: Protect sensitive crops.")
-            
+
         if humidity <= 30:
             alerts.append("🏜️ Low humidity: Increase irrigation, monitor for pest stress.")
         elif humidity >= 85:
             alerts.append("💧 High humidity: Monitor for fungal diseases.")
-            
+
         return alerts
 
     @staticmethod
     def agricultural_recommendations(current: Dict, forecast: Dict = None) -> List[str]:
         """Generate crop-specific recommendations based on weather"""
         recommendations = []
-        
+
         temp = current.get("main", {}).get("temp", 25)
         humidity = current.get("main", {}).get("humidity", 50)
         wind = current.get("wind", {}).get("speed", 0.0)
-        
+
         # Temperature-based recommendations
         if temp > 35:
             recommendations.append("🌾 Wheat/Barley: Avoid harvesting during peak heat")
@@ -105,12 +85,12 @@ class WeatherClient:
         elif temp < 10:
             recommendations.append("🌾 Protect winter crops from frost damage")
             recommendations.append("🌱 Cover sensitive seedlings")
-            
+
         # Wind-based recommendations
         if wind > 12:
             recommendations.append("🚁 Avoid aerial spraying and drone operations")
             recommendations.append("🌾 Support tall crops to prevent lodging")
-            
+
         # Humidity-based recommendations
         if humidity > 80:
             recommendations.append("🦠 High disease risk: Monitor for blight and fungus")
@@ -118,51 +98,46 @@ class WeatherClient:
         elif humidity < 40:
             recommendations.append("💧 Increase irrigation frequency")
             recommendations.append("🌿 Monitor for pest stress and wilting")
-            
+
         return recommendations
 
-    def get_agricultural_summary(self, pincode: str, country: str = "IN") -> Dict:
-        """Get complete agricultural weather summary"""
-        try:
-            current = self.current_by_pincode(pincode, country)
-            forecast = self.forecast_by_pincode(pincode, country)
-            
-            # Extract key data
-            temp = current.get("main", {}).get("temp", 0)
-            humidity = current.get("main", {}).get("humidity", 0)
-            wind_speed = current.get("wind", {}).get("speed", 0)
-            description = current.get("weather", [{}])[0].get("description", "")
-            
-            # Get rain forecast for next 24 hours
-            next_24h_rain = 0
-            if "list" in forecast:
-                for item in forecast["list"][:8]:  # Next 24 hours (3-hour intervals)
-                    if "rain" in item:
-                        next_24h_rain += item["rain"].get("3h", 0)
-            
-            alerts = self.simple_alerts(current)
-            recommendations = self.agricultural_recommendations(current, forecast)
-            
-            return {
-                "location": current.get("name", "Unknown"),
-                "current_weather": {
-                    "temperature": temp,
-                    "humidity": humidity,
-                    "wind_speed": wind_speed,
-                    "description": description,
-                    "feels_like": current.get("main", {}).get("feels_like", temp)
-                },
-                "forecast": {
-                    "rain_next_24h": round(next_24h_rain, 2),
-                    "summary": f"Expected rainfall: {next_24h_rain:.1f}mm in next 24 hours"
-                },
-                "alerts": alerts,
-                "agricultural_recommendations": recommendations,
-                "farming_conditions": self.get_farming_conditions(current),
-                "best_farming_hours": self.get_best_farming_hours(current)
-            }
-        except Exception as e:
-            return {"error": f"Weather data unavailable: {str(e)}"}
+    def build_agricultural_summary(self, current: Dict, forecast: Dict) -> Dict:
+        """Assemble the agricultural summary from already-fetched payloads"""
+        from .farming_windows import forecast_outlook
+
+        # Extract key data
+        temp = current.get("main", {}).get("temp", 0)
+        humidity = current.get("main", {}).get("humidity", 0)
+        wind_speed = current.get("wind", {}).get("speed", 0)
+        description = current.get("weather", [{}])[0].get("description", "")
+
+        # Rain, alerts and work windows over the forecast slots that have not
+        # ended yet (a cached forecast's first entries may be in the past)
+        outlook = forecast_outlook(forecast)
+        next_24h_rain = outlook["rain_next_24h"]
+
+        alerts = self.simple_alerts(current) + outlook["alerts"]
+        recommendations = self.agricultural_recommendations(current, forecast)
+
+        return {
+            "location": current.get("name", "Unknown"),
+            "current_weather": {
+                "temperature": temp,
+                "humidity": humidity,
+                "wind_speed": wind_speed,
+                "description": description,
+                "feels_like": current.get("main", {}).get("feels_like", temp)
+            },
+            "forecast": {
+                "rain_next_24h": round(next_24h_rain, 2),
+                "summary": f"Expected rainfall: {next_24h_rain:.1f}mm in next 24 hours"
+            },
+            "alerts": alerts,
+            "agricultural_recommendations": recommendations,
+            "farming_conditions": self.get_farming_conditions(current),
+            "farming_windows": outlook["windows"],
+            "best_farming_hours": outlook["best_hours"] or self.get_best_farming_hours(current)
+        }
 
     @staticmethod
     def get_farming_conditions(current: Dict) -> Dict:
@@ -170,39 +145,39 @@ class WeatherClient:
         temp = current.get("main", {}).get("temp", 25)
         wind = current.get("wind", {}).get("speed", 0)
         humidity = current.get("main", {}).get("humidity", 50)
-        
+
         conditions = {
             "spraying": "good",
-            "harvesting": "good", 
+            "harvesting": "good",
             "planting": "good",
             "irrigation": "moderate"
         }
-        
+
         # Spraying conditions
         if wind > 10 or temp > 35:
             conditions["spraying"] = "poor"
         elif wind > 6 or temp > 30:
             conditions["spraying"] = "moderate"
-            
-        # Harvesting conditions  
+
+        # Harvesting conditions
         if temp > 38 or wind > 15:
             conditions["harvesting"] = "poor"
         elif temp > 32:
             conditions["harvesting"] = "moderate"
-            
+
         # Irrigation needs
         if temp > 35 or humidity < 40:
             conditions["irrigation"] = "high"
         elif temp < 20 and humidity > 70:
             conditions["irrigation"] = "low"
-            
+
         return conditions
 
     @staticmethod
     def get_best_farming_hours(current: Dict) -> List[str]:
-        """Recommend best hours for farming activities"""
+        """Generic hours by current temperature; used when there is no forecast"""
         temp = current.get("main", {}).get("temp", 25)
-        
+
         if temp > 35:
             return [
                 "🌅 Early morning: 5:00 AM - 8:00 AM (irrigation, spraying)",
@@ -220,3 +195,293 @@ class WeatherClient:
                 "🌞 Afternoon: 2:00 PM - 5:00 PM (field work)",
                 "🌆 Evening: 5:00 PM - 7:00 PM (irrigation)"
             ]
+
+
+class AsyncWeatherClient(_WeatherAdvisory):
+    """Non-blocking OpenWeather client backed by one keep-alive connection pool.
+
+    The pool is created lazily on first use so it binds to the running event
+    loop. Requests to each upstream host are capped by a semaphore so a burst
+    of /weather calls cannot open unbounded sockets to OpenWeather.
+
+    Identical GETs that overlap in time share one upstream call, and the
+    coordinates seen in any current/forecast payload are remembered so later
+    lookups for that pincode skip the round trip. Shared payloads are the
+    same dict object for every caller and must be treated as read-only.
+
+    When a :class:`WeatherCache` is supplied, current conditions and forecasts
+    are served from it with stale-while-revalidate semantics. With
+    ``cell_deg`` set, pincodes are located through the offline gazetteer and
+    neighbours in one grid cell are fetched (and cached) once, by coordinates.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = REQUEST_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+        max_per_host: int = MAX_PER_HOST,
+        cache: WeatherCache | None = None,
+        cell_deg: float = WEATHER_CELL_DEG,
+        quota: TokenBucket | None = None,
+    ):
+        self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY")
+        if not self.api_key:
+            raise RuntimeError("Set OPENWEATHER_API_KEY env var")
+        self.base_url = (base_url or OPENWEATHER_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.cache = cache
+        self.cell_deg = cell_deg
+        self.quota = quota
+        self._http: httpx.AsyncClient | None = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._coords: "OrderedDict[Tuple[str, str], Tuple[float, float]]" = OrderedDict()
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._http
+
+    async def _get(self, path: str, params: Dict, prepaid: bool = False) -> Dict:
+        key = (path, tuple(sorted(params.items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(path, params, prepaid))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: tuple, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    async def _fetch(self, path: str, params: Dict, prepaid: bool = False) -> Dict:
+        if self.quota is not None and not prepaid:
+            # user-facing calls are never delayed; they borrow from the
+            # bucket so background prefetching backs off instead
+            self.quota.consume()
+        url = self.base_url + path
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        async with limit:
+            # timed inside the per-host limit so queueing is not counted as upstream latency
+            start = time.perf_counter()
+            try:
+                r = await self._client().get(url, params=params)
+            except httpx.HTTPError:
+                UPSTREAM_LATENCY.labels("openweather", path, "error").observe(time.perf_counter() - start)
+                raise
+            UPSTREAM_LATENCY.labels("openweather", path, str(r.status_code)).observe(time.perf_counter() - start)
+        r.raise_for_status()
+        return r.json()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self._host_limits.clear()
+        if self.cache is not None:
+            self.cache.close()
+
+    @staticmethod
+    def gazetteer_coordinates(pincode: str, country: str = "IN") -> Tuple[float, float] | None:
+        """Offline coordinates for an Indian pincode, or None"""
+        if country != "IN":
+            return None
+        try:
+            from .gazetteer import get_gazetteer
+
+            place = get_gazetteer().resolve(pincode)
+        except Exception:
+            # numpy or the gazetteer table unavailable: fall back to OpenWeather
+            return None
+        return None if place is None else (place["lat"], place["lon"])
+
+    def _location(self, pincode: str, country: str) -> Tuple[str, Dict]:
+        """Cache key and OpenWeather query for a pincode's weather"""
+        if self.cell_deg > 0:
+            coords = self.gazetteer_coordinates(pincode, country)
+            if coords is not None:
+                from .gazetteer import share_cell
+
+                lat, lon = share_cell(*coords, self.cell_deg)
+                return f"{lat},{lon}", {"lat": lat, "lon": lon}
+        return f"{pincode},{country}", {"zip": f"{pincode},{country}"}
+
+    def cache_key(self, pincode: str, country: str = "IN") -> str:
+        return self._location(pincode, country)[0]
+
+    async def _cached_get(self, kind: str, path: str, pincode: str, country: str) -> Dict:
+        key, where = self._location(pincode, country)
+        params = {**where, "appid": self.api_key, "units": "metric"}
+        if self.cache is None:
+            return await self._get(path, params)
+        return await self.cache.get_or_fetch(kind, key, lambda: self._get(path, params))
+
+    async def prefetch(self, kind: str, pincode: str, country: str = "IN") -> Dict:
+        """Refresh one cached kind ("current"/"forecast") ahead of demand.
+
+        The caller has already taken a quota token, so the upstream call is
+        not charged again.
+        """
+        if self.cache is None:
+            raise RuntimeError("prefetching needs a WeatherCache")
+        path = {"current": CURRENT_PATH, "forecast": FORECAST_PATH}[kind]
+        key, where = self._location(pincode, country)
+        params = {**where, "appid": self.api_key, "units": "metric"}
+        value = await self.cache.refresh(kind, key, lambda: self._get(path, params, prepaid=True))
+        coord = value.get("coord") if kind == "current" else value.get("city", {}).get("coord")
+        self._remember_coords(pincode, country, coord)
+        return value
+
+    def _remember_coords(self, pincode: str, country: str, coord: Dict | None) -> None:
+        if not coord or "lat" not in coord or "lon" not in coord:
+            return
+        key = (pincode, country)
+        self._coords[key] = (coord["lat"], coord["lon"])
+        self._coords.move_to_end(key)
+        while len(self._coords) > COORD_CACHE_SIZE:
+            self._coords.popitem(last=False)
+
+    def cached_coordinates(self, pincode: str, country: str = "IN") -> Tuple[float, float] | None:
+        return self._coords.get((pincode, country))
+
+    def freshness(self, pincode: str, country: str = "IN", kinds=("current", "forecast")) -> Tuple[float, int] | None:
+        """(Last-Modified, max-age) for a response built from these cached kinds.
+
+        The response is as old as its newest input and goes stale with its
+        first input; ``None`` when any input is not cached.
+        """
+        if self.cache is None:
+            return None
+        key = self.cache_key(pincode, country)
+        info = [self.cache.freshness(kind, key) for kind in kinds]
+        if any(i is None for i in info):
+            return None
+        return max(i[0] for i in info), max(0, int(min(i[1] for i in info)))
+
+    async def current_by_pincode(self, pincode: str, country: str = "IN") -> Dict:
+        current = await self._cached_get("current", CURRENT_PATH, pincode, country)
+        self._remember_coords(pincode, country, current.get("coord"))
+        return current
+
+    async def forecast_by_pincode(self, pincode: str, country: str = "IN") -> Dict:
+        forecast = await self._cached_get("forecast", FORECAST_PATH, pincode, country)
+        self._remember_coords(pincode, country, forecast.get("city", {}).get("coord"))
+        return forecast
+
+    async def get_coordinates_by_pincode(self, pincode: str, country: str = "IN") -> tuple:
+        """Get latitude and longitude for a pincode.
+
+        Tries the offline gazetteer, then coordinates seen in earlier
+        payloads, then OpenWeather; raises LookupError when none of them knows the pincode.
+        """
+        coords = self.gazetteer_coordinates(pincode, country) or self.cached_coordinates(pincode, country)
+        if coords is not None:
+            return coords
+        try:
+            current = await self.current_by_pincode(pincode, country)
+            return current["coord"]["lat"], current["coord"]["lon"]
+        except Exception as e:
+            raise LookupError(f"No coordinates for pincode {pincode}") from e
+
+    async def _onecall(self, lat: float, lon: float) -> Dict:
+        params = {
+            "lat": lat,
+            "lon": lon,
+            "appid": self.api_key,
+            "units": "metric",
+            "exclude": "minutely"
+        }
+        return await self._get(ONECALL_PATH, params)
+
+    async def get_detailed_forecast(self, pincode: str, country: str = "IN") -> Dict:
+        """Get detailed 7-day weather forecast including agricultural data"""
+        coords = self.gazetteer_coordinates(pincode, country) or self.cached_coordinates(pincode, country)
+        if coords is not None:
+            try:
+                return await self._onecall(*coords)
+            except Exception:
+                # Fallback to basic forecast
+                return await self.forecast_by_pincode(pincode, country)
+
+        # Unknown pincode: the basic forecast carries city.coord, so one call both
+        # resolves the coordinates and pre-fetches the fallback payload.
+        forecast = await self.forecast_by_pincode(pincode, country)
+        coords = self.cached_coordinates(pincode, country)
+        if coords is None:
+            return forecast
+        try:
+            return await self._onecall(*coords)
+        except Exception:
+            return forecast
+
+    async def get_agricultural_summary(self, pincode: str, country: str = "IN") -> Dict:
+        """Get complete agricultural weather summary"""
+        try:
+            current, forecast = await asyncio.gather(
+                self.current_by_pincode(pincode, country),
+                self.forecast_by_pincode(pincode, country),
+            )
+            return self.build_agricultural_summary(current, forecast)
+        except Exception as e:
+            return {"error": f"Weather data unavailable: {str(e)}"}
+
+
+class WeatherClient(_WeatherAdvisory):
+    """Blocking wrapper around :class:`AsyncWeatherClient`.
+
+    Calls are scheduled on a private event loop in a daemon thread, so sync
+    callers (scripts, notebooks) share the same pool and host limits.
+    """
+
+    def __init__(self, api_key: str | None = None, **kwargs):
+        self._async = AsyncWeatherClient(api_key, **kwargs)
+        self.api_key = self._async.api_key
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+
+    def _run(self, coro):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="weather-client", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        if self._loop is not None:
+            self._run(self._async.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    def current_by_pincode(self, pincode: str, country: str = "IN") -> Dict:
+        return self._run(self._async.current_by_pincode(pincode, country))
+
+    def forecast_by_pincode(self, pincode: str, country: str = "IN") -> Dict:
+        return self._run(self._async.forecast_by_pincode(pincode, country))
+
+    def get_coordinates_by_pincode(self, pincode: str, country: str = "IN") -> tuple:
+        """Get latitude and longitude for a pincode"""
+        return self._run(self._async.get_coordinates_by_pincode(pincode, country))
+
+    def get_detailed_forecast(self, pincode: str, country: str = "IN") -> Dict:
+        """Get detailed 7-day weather forecast including agricultural data"""
+        return self._run(self._async.get_detailed_forecast(pincode, country))
+
+    def get_agricultural_summary(self, pincode: str, country: str = "IN") -> Dict:
+        """Get complete agricultural weather summary"""
+        return self._run(self._async.get_agricultural_summary(pincode, country))
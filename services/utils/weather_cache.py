@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# kind -> (fresh TTL, extra seconds a stale entry may still be served while it refreshes)
+DEFAULT_TTLS = {
+    "current": (int(os.getenv("WEATHER_CURRENT_TTL", "600")), 1800),
+    # forecasts are 3-hourly steps, so an hour-old one is still useful for hours
+    "forecast": (int(os.getenv("WEATHER_FORECAST_TTL", "3600")), 3 * 3600),
+}
+DEFAULT_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_SIZE", "4096"))
+# the on-disk tier is swept for expired and surplus rows once per this many writes
+PRUNE_EVERY = 64
+
+
+class _Entry(NamedTuple):
+    fetched_at: float
+    value: Dict
+
+
+class SQLiteTier:
+    """Optional on-disk tier so a restarted worker starts warm.
+
+    Bounded like the memory tier it backs: every :data:`PRUNE_EVERY` writes,
+    rows older than their kind's ``max_age`` (seconds) are deleted, then the
+    oldest beyond ``max_rows`` or beyond ``max_bytes`` of keys and payloads.
+    The owning cache sets the limits; between sweeps the table may run up to
+    ``PRUNE_EVERY`` rows over.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "weather_cache",
+        max_age: Dict[str, float] | None = None,
+        max_rows: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.path = path
+        self.table = table
+        self.max_age = max_age or {}
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " kind TEXT, key TEXT, fetched_at REAL, payload TEXT,"
+            " PRIMARY KEY (kind, key))"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_fetched_at ON {table} (fetched_at)")
+        self._conn.commit()
+
+    def get(self, kind: str, key: str) -> Optional[_Entry]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT fetched_at, payload FROM {self.table} WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+        if row is None:
+            return None
+        return _Entry(row[0], json.loads(row[1]))
+
+    def put(self, kind: str, key: str, entry: _Entry) -> None:
+        payload = json.dumps(entry.value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)",
+                (kind, key, entry.fetched_at, payload),
+            )
+            # the first write of a run also clears what earlier runs left behind
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune()
+            self._writes += 1
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        now = time.time()
+        for kind, age in self.max_age.items():
+            self._conn.execute(f"DELETE FROM {self.table} WHERE kind = ? AND fetched_at < ?", (kind, now - age))
+        if self.max_rows is not None:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN"
+                f" (SELECT rowid FROM {self.table} ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            )
+        if self.max_bytes is not None:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN (SELECT rowid FROM"
+                f" (SELECT rowid, SUM(length(key) + length(payload)) OVER"
+                f"  (ORDER BY fetched_at DESC, rowid DESC) AS kept FROM {self.table})"
+                f" WHERE kept > ?)",
+                (self.max_bytes,),
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def delete_kind_except(self, kind: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE kind != ?", (kind,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class WeatherCache:
+    """Bounded LRU of upstream weather payloads with stale-while-revalidate.
+
+    Entries younger than their kind's TTL are served directly. Older entries
+    still inside the stale window are served immediately while a single
+    background refresh runs. Concurrent misses for the same key share one
+    upstream fetch.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: Dict[str, Tuple[float, float]] | None = None,
+        disk: SQLiteTier | None = None,
+    ):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.disk = disk
+        if disk is not None:
+            # past ttl + max_stale an entry is a miss anyway
+            disk.max_age = {kind: fresh + stale for kind, (fresh, stale) in self.ttls.items()}
+            disk.max_rows = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "prefetches": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "WeatherCache":
+        path = os.getenv("WEATHER_CACHE_DB")
+        return cls(disk=SQLiteTier(path) if path else None)
+
+    def snapshot(self) -> Dict:
+        return {"size": len(self._entries), "max_entries": self.max_entries, **self.stats}
+
+    def peek(self, kind: str, key: str) -> Optional[_Entry]:
+        return self._entries.get((kind, key))
+
+    def entries(self, kind: str) -> List[Tuple[str, Dict]]:
+        """(key, payload) of every in-memory value of ``kind``, e.g. for a
+        batch advisory over all cached forecasts"""
+        return [(key, entry.value) for (k, key), entry in list(self._entries.items()) if k == kind]
+
+    def freshness(self, kind: str, key: str) -> Optional[Tuple[float, float]]:
+        """(fetched_at, seconds until the entry goes stale) for a cached value"""
+        entry = self._entries.get((kind, key))
+        if entry is None:
+            return None
+        return entry.fetched_at, self.ttls[kind][0] - (time.time() - entry.fetched_at)
+
+    async def get_or_fetch(self, kind: str, key: str, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        ttl, max_stale = self.ttls[kind]
+        full = (kind, key)
+        entry = self._entries.get(full)
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, kind, key)
+            if entry is not None:
+                self.stats["disk_hits"] += 1
+                self._store(full, entry)
+
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < ttl:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(full)
+                return entry.value
+            if age < ttl + max_stale:
+                self.stats["stale_hits"] += 1
+                self._entries.move_to_end(full)
+                if full not in self._inflight:
+                    self.stats["refreshes"] += 1
+                    self._start_fetch(full, fetch)
+                return entry.value
+
+        self.stats["misses"] += 1
+        task = self._inflight.get(full)
+        if task is None:
+            task = self._start_fetch(full, fetch)
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def refresh(self, kind: str, key: str, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Fetch and store ``key`` now whatever its age (the prefetcher's path);
+        joins a fetch already in flight for it"""
+        full = (kind, key)
+        self.stats["prefetches"] += 1
+        task = self._inflight.get(full)
+        if task is None:
+            task = self._start_fetch(full, fetch)
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, full: Tuple[str, str], fetch: Callable[[], Awaitable[Dict]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fill(full, fetch))
+        self._inflight[full] = task
+        task.add_done_callback(lambda t: self._done(full, t))
+        return task
+
+    def _done(self, full: Tuple[str, str], task: asyncio.Task) -> None:
+        if self._inflight.get(full) is task:
+            del self._inflight[full]
+        if not task.cancelled() and task.exception() is not None and full in self._entries:
+            # a failed background refresh leaves the stale entry in place
+            self.stats["refresh_errors"] += 1
+
+    async def _fill(self, full: Tuple[str, str], fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        value = await fetch()
+        entry = _Entry(time.time(), value)
+        self._store(full, entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, full[0], full[1], entry)
+        return value
+
+    def _store(self, full: Tuple[str, str], entry: _Entry) -> None:
+        self._entries[full] = entry
+        self._entries.move_to_end(full)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
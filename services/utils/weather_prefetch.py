@@ -0,0 +1,307 @@
+import os
+import json
+import math
+import time
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from .weather_api import AsyncWeatherClient
+
+logger = logging.getLogger(__name__)
+
+# OpenWeather's free plan allows 60 calls/minute; paid plans raise it
+QUOTA_PER_MIN = float(os.getenv("WEATHER_QUOTA_PER_MIN", "60"))
+PREFETCH_TOP = int(os.getenv("WEATHER_PREFETCH_TOP", "300"))
+PREFETCH_INTERVAL = float(os.getenv("WEATHER_PREFETCH_INTERVAL", "60"))
+# local hours [start, end) in which hot pincodes are kept warm, e.g. "5-9";
+# empty = around the clock. "Local" is the farmers' time zone, not the
+# server's (UTC on most hosts).
+PREFETCH_HOURS = os.getenv("WEATHER_PREFETCH_HOURS", "5-9")
+PREFETCH_TZ = os.getenv("WEATHER_PREFETCH_TZ", "Asia/Kolkata")
+# a pincode's popularity halves over this many hours without requests, so
+# yesterday's morning traffic still ranks today's prefetch
+POPULARITY_HALF_LIFE_H = float(os.getenv("WEATHER_POPULARITY_HALF_LIFE_H", "24"))
+MAX_TRACKED = 20000
+
+PREFETCHES = REGISTRY.counter(
+    "weather_prefetches_total", "Background weather refreshes by kind and outcome", ("kind", "outcome"))
+
+
+class TokenBucket:
+    """Rate limiter for upstream calls: ``rate`` tokens/second, up to ``burst``.
+
+    Background work waits in :meth:`acquire` for a whole token. Calls made
+    for a user go through :meth:`consume`, which never waits and may leave
+    the bucket in debt, so while demand alone uses the quota the prefetcher
+    is paused rather than pushing the total over it.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._at = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, calls: float, burst: Optional[float] = None) -> "TokenBucket":
+        return cls(calls / 60, burst if burst is not None else max(1.0, calls / 6))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._at) * self.rate)
+        self._at = now
+
+    def consume(self, n: float = 1.0) -> None:
+        self._refill()
+        self.tokens -= n
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Popularity:
+    """Exponentially decayed request counts per pincode.
+
+    Scores are stored as of the time they were last touched and decayed on
+    read, so recording a hit is O(1). Beyond ``max_tracked`` pincodes the
+    coldest half is dropped.
+    """
+
+    def __init__(self, half_life_s: float = POPULARITY_HALF_LIFE_H * 3600, max_tracked: int = MAX_TRACKED):
+        self.half_life_s = half_life_s
+        self.max_tracked = max_tracked
+        self._scores: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, score: float, at: float, now: float) -> float:
+        return score * math.pow(0.5, (now - at) / self.half_life_s)
+
+    def hit(self, pincode: str, weight: float = 1.0, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        prev = self._scores.get(pincode)
+        score = weight + (self._decayed(*prev, now) if prev else 0.0)
+        self._scores[pincode] = (score, now)
+        if len(self._scores) > self.max_tracked:
+            for p, _ in self.top(len(self._scores), now)[self.max_tracked // 2:]:
+                del self._scores[p]
+
+    def top(self, n: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        now = time.time() if now is None else now
+        return heapq.nlargest(
+            n, ((p, self._decayed(s, at, now)) for p, (s, at) in self._scores.items()), key=lambda x: x[1])
+
+    def state(self) -> Dict:
+        """A copy of the scores, safe to serialise off the event loop while
+        :meth:`hit` keeps updating the live dict"""
+        return {"half_life_s": self.half_life_s, "scores": dict(self._scores)}
+
+    @staticmethod
+    def write(path: str, state: Dict) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    def save(self, path: str) -> None:
+        self.write(path, self.state())
+
+    def load(self, path: str) -> None:
+        with open(path) as f:
+            self._scores.update({p: tuple(v) for p, v in json.load(f)["scores"].items()})
+
+
+def parse_hours(spec: str) -> Optional[Tuple[int, int]]:
+    """"5-9" -> (5, 9); "" -> None (always active). Wraps past midnight ("22-2")."""
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    start, _, end = spec.partition("-")
+    return int(start) % 24, int(end or start) % 24
+
+
+def load_tz(name: str) -> tzinfo:
+    """IANA zone by name; IST as a fixed offset where no tz database exists"""
+    try:
+        from zoneinfo import ZoneInfo
+
+        return ZoneInfo(name)
+    except Exception:
+        logger.warning("Time zone %s unavailable; using UTC+05:30", name)
+        return timezone(timedelta(hours=5, minutes=30), "IST")
+
+
+def _in_hours(hours: Optional[Tuple[int, int]], hour: int) -> bool:
+    if hours is None:
+        return True
+    start, end = hours
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+class WeatherPrefetcher:
+    """Keeps the weather cache warm for the most requested pincodes.
+
+    Every ``interval`` seconds inside the active ``hours`` (wall clock in
+    ``tz``, IST by default), the ``top_n`` most popular pincodes (plus any
+    ``pinned`` ones) are checked; each cached kind that is missing or goes
+    stale within ``lead`` seconds is refreshed, most popular and most stale
+    first. Upstream calls are paced by the client's :class:`TokenBucket`, so
+    a cycle that cannot finish within the quota simply leaves the least
+    important pincodes for the next one.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncWeatherClient",
+        top_n: int = PREFETCH_TOP,
+        interval: float = PREFETCH_INTERVAL,
+        lead: Optional[float] = None,
+        hours: Optional[Tuple[int, int]] = parse_hours(PREFETCH_HOURS),
+        tz: Optional[tzinfo] = None,
+        kinds: Iterable[str] = ("current", "forecast"),
+        pinned: Iterable[str] = (),
+        popularity: Optional[Popularity] = None,
+        state_path: Optional[str] = None,
+        concurrency: int = 8,
+    ):
+        if client.cache is None or client.quota is None:
+            raise ValueError("prefetching needs a client with a WeatherCache and a quota TokenBucket")
+        self.client = client
+        self.top_n = top_n
+        self.interval = interval
+        # refresh before expiry with a whole cycle to spare
+        self.lead = lead if lead is not None else 2 * interval
+        self.hours = hours
+        self.tz = tz or load_tz(PREFETCH_TZ)
+        self.kinds = tuple(kinds)
+        self.pinned = [p for p in pinned if p]
+        self.popularity = popularity or Popularity()
+        self.state_path = state_path
+        self.concurrency = concurrency
+        self.stats = {"cycles": 0, "refreshed": 0, "errors": 0, "skipped_cycles": 0, "last_cycle_s": 0.0}
+        self._task: Optional[asyncio.Task] = None
+        if state_path and os.path.exists(state_path):
+            try:
+                self.popularity.load(state_path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Ignoring unreadable prefetch state %s: %s", state_path, e)
+
+    @classmethod
+    def from_env(cls, client: "AsyncWeatherClient") -> "WeatherPrefetcher":
+        return cls(
+            client,
+            pinned=os.getenv("WEATHER_PREFETCH_PINCODES", "").replace(" ", "").split(","),
+            state_path=os.getenv("WEATHER_PREFETCH_STATE") or None,
+        )
+
+    def record(self, pincode: str) -> None:
+        self.popularity.hit(pincode)
+
+    def plan(self, now: Optional[float] = None) -> List[Tuple[float, str, str]]:
+        """(priority, kind, pincode) refreshes due this cycle, highest first.
+
+        Priority is popularity times urgency: 2 for a missing or already
+        stale entry, falling to 1 for one that only just entered the lead
+        window. Pincodes sharing a cache key are refreshed once.
+        """
+        ranked = self.popularity.top(self.top_n, now)
+        floor = max([s for _, s in ranked], default=1.0)
+        candidates = [(p, floor) for p in self.pinned] + ranked
+        seen = set()
+        due = []
+        for pincode, score in candidates:
+            key = self.client.cache_key(pincode)
+            if key in seen:
+                continue
+            seen.add(key)
+            for kind in self.kinds:
+                fresh = self.client.cache.freshness(kind, key)
+                remaining = fresh[1] if fresh is not None else -1.0
+                if remaining >= self.lead:
+                    continue
+                urgency = 1 + min(1.0, max(0.0, (self.lead - remaining) / self.lead))
+                due.append((score * urgency, kind, pincode))
+        due.sort(key=lambda d: -d[0])
+        return due
+
+    async def _refresh(self, kind: str, pincode: str, limit: asyncio.Semaphore) -> None:
+        try:
+            await self.client.prefetch(kind, pincode)
+        except Exception as e:
+            self.stats["errors"] += 1
+            PREFETCHES.labels(kind, "error").inc()
+            logger.debug("Prefetch of %s for %s failed: %s", kind, pincode, e)
+        else:
+            self.stats["refreshed"] += 1
+            PREFETCHES.labels(kind, "ok").inc()
+        finally:
+            limit.release()
+
+    async def run_once(self) -> int:
+        """One prefetch cycle; returns the number of refreshes started"""
+        t0 = time.perf_counter()
+        limit = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        deadline = time.monotonic() + self.interval
+        for _, kind, pincode in self.plan():
+            if time.monotonic() >= deadline:
+                break  # out of quota for this cycle; the next plan starts from the top
+            await limit.acquire()
+            await self.client.quota.acquire()
+            tasks.append(asyncio.ensure_future(self._refresh(kind, pincode, limit)))
+        if tasks:
+            await asyncio.gather(*tasks)
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_s"] = round(time.perf_counter() - t0, 3)
+        return len(tasks)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if _in_hours(self.hours, datetime.now(self.tz).hour):
+                    await self.run_once()
+                else:
+                    self.stats["skipped_cycles"] += 1
+                if self.state_path:
+                    # copied here, on the loop; record() may run while the thread writes
+                    state = self.popularity.state()
+                    try:
+                        await asyncio.to_thread(Popularity.write, self.state_path, state)
+                    except OSError as e:
+                        logger.warning("Could not save prefetch state: %s", e)
+            except Exception:
+                logger.exception("Weather prefetch cycle failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.state_path:
+            self.popularity.save(self.state_path)
+
+    def snapshot(self) -> Dict:
+        return {**self.stats, "tracked": len(self.popularity), "tokens": round(self.client.quota.tokens, 2),
+                "hours": self.hours}
@@ -1,5 +1,8 @@
-import requests
+import httpx
+import io
 import json
+import zipfile
+from PIL import Image
 
 # Test the Smart Crop Advisory API
 API_BASE = "http://localhost:8000"
@@ -10,7 +13,7 @@ print("=" * 40)
 # Test 1: Health check
 print("\n1. Testing Health Endpoint...")
 try:
-    response = requests.get(f"{API_BASE}/health")
+    response = httpx.get(f"{API_BASE}/health")
     if response.status_code == 200:
         print("✅ Health check passed")
         print(f"   Response: {response.json()}")
@@ -29,7 +32,7 @@ try:
         "ph": 6.5,
         "rainfall": 120
     }
-    response = requests.post(f"{API_BASE}/recommend_crop", json=crop_data)
+    response = httpx.post(f"{API_BASE}/recommend_crop", json=crop_data)
     if response.status_code == 200:
         print("✅ Crop recommendation passed")
         print(f"   Response: {response.json()}")
@@ -48,7 +51,7 @@ try:
         "K": 43,
         "ph": 6.5
     }
-    response = requests.post(f"{API_BASE}/recommend_fertilizer", json=fert_data)
+    response = httpx.post(f"{API_BASE}/recommend_fertilizer", json=fert_data)
     if response.status_code == 200:
         print("✅ Fertilizer recommendation passed")
         print(f"   Response: {response.json()}")
@@ -60,7 +63,7 @@ except Exception as e:
 # Test 4: Market prices
 print("\n4. Testing Market Prices...")
 try:
-    response = requests.get(f"{API_BASE}/market")
+    response = httpx.get(f"{API_BASE}/market")
     if response.status_code == 200:
         print("✅ Market prices passed")
         data = response.json()
@@ -75,7 +78,7 @@ except Exception as e:
 # Test 5: Languages
 print("\n5. Testing Languages Endpoint...")
 try:
-    response = requests.get(f"{API_BASE}/languages")
+    response = httpx.get(f"{API_BASE}/languages")
     if response.status_code == 200:
         print("✅ Languages endpoint passed")
         data = response.json()
@@ -85,6 +88,146 @@ try:
 except Exception as e:
     print(f"❌ Languages endpoint error: {e}")
 
+# Test 6: Batch crop recommendation (JSON)
+print("\n6. Testing Batch Crop Recommendation...")
+try:
+    rows = [crop_data, {"N": 20, "P": 60, "K": 80, "ph": 7.2, "rainfall": 40}]
+    response = httpx.post(f"{API_BASE}/recommend_crop/batch", json=rows)
+    empty = httpx.post(f"{API_BASE}/recommend_crop/batch", json=[])
+    if (response.status_code == 200 and response.json()["count"] == 2
+            and empty.status_code == 200 and empty.json() == {"count": 0, "results": []}):
+        print("✅ Batch crop recommendation passed")
+        print(f"   Crops: {[r['crop'] for r in response.json()['results']]}")
+    else:
+        print(f"❌ Batch crop recommendation failed: {response.status_code} / {empty.status_code} {empty.text}")
+except Exception as e:
+    print(f"❌ Batch crop recommendation error: {e}")
+
+# Test 7: Batch crop recommendation (CSV)
+print("\n7. Testing Batch Crop Recommendation (CSV)...")
+try:
+    csv_text = "N,P,K,ph,rainfall\n90,42,43,6.5,120\n20,60,80,7.2,40\n"
+    response = httpx.post(f"{API_BASE}/recommend_crop/batch/csv",
+                          files={"file": ("soil.csv", csv_text, "text/csv")})
+    header_only = httpx.post(f"{API_BASE}/recommend_crop/batch/csv",
+                             files={"file": ("soil.csv", "N,P,K,ph,rainfall\n", "text/csv")})
+    if response.status_code == 200 and response.json()["count"] == 2 and header_only.status_code == 400:
+        print("✅ Batch crop CSV passed")
+        print(f"   Header-only CSV: {header_only.json()['detail']}")
+    else:
+        print(f"❌ Batch crop CSV failed: {response.status_code} / {header_only.status_code}")
+except Exception as e:
+    print(f"❌ Batch crop CSV error: {e}")
+
+# Test 8: Batch disease detection with a zip of photos
+print("\n8. Testing Batch Disease Detection (zip)...")
+try:
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for i, color in enumerate([(60, 140, 40), (150, 120, 40)]):
+            photo = io.BytesIO()
+            Image.new("RGB", (64, 64), color).save(photo, "JPEG")
+            zf.writestr(f"leaf{i}.jpg", photo.getvalue())
+    response = httpx.post(f"{API_BASE}/detect_disease/batch",
+                          files=[("files", ("plot.zip", archive.getvalue(), "application/zip"))])
+    if response.status_code == 200 and len(response.json()["results"]) == 2:
+        print("✅ Batch disease detection passed")
+        print(f"   Plot: {response.json()['plot']}")
+    else:
+        print(f"❌ Batch disease detection failed: {response.status_code}")
+except Exception as e:
+    print(f"❌ Batch disease detection error: {e}")
+
+# Test 9: Batch fertilizer recommendation (JSON and CSV)
+print("\n9. Testing Batch Fertilizer Recommendation...")
+try:
+    response = httpx.post(f"{API_BASE}/recommend_fertilizer/batch", json=[fert_data, {**fert_data, "crop": "rice"}])
+    single = httpx.post(f"{API_BASE}/recommend_fertilizer", json=fert_data)
+    empty = httpx.post(f"{API_BASE}/recommend_fertilizer/batch", json=[])
+    csv_text = "crop,N,P,K,ph\nwheat,90,42,43,6.5\nrice,90,42,43,6.5\n"
+    from_csv = httpx.post(f"{API_BASE}/recommend_fertilizer/batch/csv",
+                          files={"file": ("soil.csv", csv_text, "text/csv")})
+    if (response.status_code == 200 and response.json()["results"][0] == single.json()
+            and empty.status_code == 200 and empty.json()["count"] == 0
+            and from_csv.status_code == 200 and from_csv.json() == response.json()):
+        print("✅ Batch fertilizer recommendation passed")
+    else:
+        print(f"❌ Batch fertilizer recommendation failed: {response.status_code} / {empty.status_code} / {from_csv.status_code}")
+except Exception as e:
+    print(f"❌ Batch fertilizer recommendation error: {e}")
+
+# Test 10: Market analytics
+print("\n10. Testing Market Analytics...")
+try:
+    response = httpx.get(f"{API_BASE}/market", params={"crop": "wheat", "mode": "analytics"})
+    no_crop = httpx.get(f"{API_BASE}/market", params={"mode": "analytics"})
+    if response.status_code == 200 and no_crop.status_code == 400:
+        print("✅ Market analytics passed")
+        print(f"   Found {len(response.json()['results'])} mandis with analytics")
+    else:
+        print(f"❌ Market analytics failed: {response.status_code} / {no_crop.status_code}")
+except Exception as e:
+    print(f"❌ Market analytics error: {e}")
+
+# Test 11: Conditional requests (ETag / 304)
+print("\n11. Testing Conditional Requests...")
+try:
+    failed = []
+    for path in ("/", "/languages", "/market"):
+        response = httpx.get(f"{API_BASE}{path}")
+        etag = response.headers.get("etag")
+        again = httpx.get(f"{API_BASE}{path}", headers={"If-None-Match": etag or ""})
+        if not etag or again.status_code != 304 or again.content:
+            failed.append(f"{path} ({again.status_code})")
+    if not failed:
+        print("✅ Conditional requests passed")
+    else:
+        print(f"❌ Conditional requests failed: {', '.join(failed)}")
+except Exception as e:
+    print(f"❌ Conditional requests error: {e}")
+
+# Test 12: Metrics
+print("\n12. Testing Metrics Endpoint...")
+try:
+    response = httpx.get(f"{API_BASE}/metrics")
+    if response.status_code == 200 and "http_requests_total" in response.text:
+        print("✅ Metrics endpoint passed")
+        print(f"   {len(response.text.splitlines())} lines of Prometheus text")
+    else:
+        print(f"❌ Metrics endpoint failed: {response.status_code}")
+except Exception as e:
+    print(f"❌ Metrics endpoint error: {e}")
+
+# Test 13: Pincode lookup and nearby mandis
+print("\n13. Testing Locate Endpoint...")
+try:
+    response = httpx.get(f"{API_BASE}/locate", params={"q": "110001", "k": 3})
+    bad = httpx.get(f"{API_BASE}/locate", params={"q": "not-a-place"})
+    unknown = httpx.get(f"{API_BASE}/locate", params={"q": "999999"})
+    near = httpx.get(f"{API_BASE}/market", params={"crop": "wheat", "near": "110001"})
+    if response.status_code == 200 and bad.status_code == 400 and unknown.status_code == 404 and near.status_code == 200:
+        data = response.json()
+        print("✅ Locate endpoint passed")
+        print(f"   110001: {data['district']}, {data['state']}")
+        print(f"   Mandis near 110001: {len(near.json()['results'])} in {near.json()['location']['state']}")
+    elif response.status_code == 503:
+        print("⚠️  Pincode gazetteer not built; skipped")
+    else:
+        print(f"❌ Locate endpoint failed: {response.status_code} / {bad.status_code} / {unknown.status_code} / {near.status_code}")
+except Exception as e:
+    print(f"❌ Locate endpoint error: {e}")
+
+# Test 14: Readiness
+print("\n14. Testing Ready Endpoint...")
+try:
+    response = httpx.get(f"{API_BASE}/ready")
+    if response.status_code == 200 and response.json()["ready"]:
+        print("✅ Ready check passed")
+    else:
+        print(f"❌ Ready check failed: {response.status_code}")
+except Exception as e:
+    print(f"❌ Ready check error: {e}")
+
 print("\n🎉 API Testing Complete!")
 print("\n📱 Frontend: http://localhost:3000")
 print("🔧 Backend API: http://localhost:8000")
@@ -0,0 +1,106 @@
+"""
+Unit checks for the pincode gazetteer: grid nearest-neighbour search
+against brute force, radius queries, pincode resolution and the saved,
+memory-mapped form. No server needed:
+
+    python test_gazetteer.py          (or python -m pytest test_gazetteer.py)
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "services"))
+
+from utils.gazetteer import Gazetteer, haversine_km, parse_location
+
+
+def make_gazetteer(n: int = 2000, seed: int = 0) -> Gazetteer:
+    rng = np.random.default_rng(seed)
+    pins = rng.choice(np.arange(110001, 860000), n, replace=False)
+    records = [
+        {"pincode": str(p), "latitude": rng.uniform(8, 35), "longitude": rng.uniform(68, 97),
+         "district": f"District {p // 1000}", "state": f"State {p // 100000}"}
+        for p in pins.tolist()
+    ]
+    # the directory lists several offices per pincode; their mean is the location
+    records.append({"pincode": str(pins[0]), "latitude": "NA", "longitude": "NA"})
+    return Gazetteer.build(records, grid_deg=0.5)
+
+
+def brute_force(g: Gazetteer, lat: float, lon: float, k: int):
+    dist = haversine_km(lat, lon, g.lat, g.lon)
+    order = np.argsort(dist, kind="stable")[:k]
+    return [str(int(g.pincode[i])) for i in order]
+
+
+def test_nearest_matches_brute_force():
+    g = make_gazetteer()
+    rng = np.random.default_rng(1)
+    # inside the grid, at its edges and well outside it
+    queries = [(rng.uniform(6, 37), rng.uniform(66, 99)) for _ in range(200)] + [(0.0, 60.0), (40.0, 100.0)]
+    for lat, lon in queries:
+        for k in (1, 5):
+            got = [r["pincode"] for r in g.nearest(lat, lon, k)]
+            assert got == brute_force(g, lat, lon, k), (lat, lon, k)
+
+
+def test_within_respects_the_radius():
+    g = make_gazetteer()
+    near = g.within(20.0, 78.0, radius_km=150, limit=1000)
+    dist = haversine_km(20.0, 78.0, g.lat, g.lon)
+    assert len(near) == int((dist <= 150).sum())
+    assert all(r["distance_km"] <= 150 for r in near)
+
+
+def test_pincodes_resolve_exactly_or_within_their_district():
+    g = Gazetteer.build([
+        {"pincode": "110001", "latitude": "28.63", "longitude": "77.22", "district": "new delhi", "state": "delhi"},
+        {"pincode": "110001", "latitude": "28.65", "longitude": "77.24", "district": "new delhi", "state": "delhi"},
+        {"pincode": "110005", "latitude": "28.65", "longitude": "77.19", "district": "central delhi", "state": "delhi"},
+    ])
+    exact = g.lookup("110001")
+    assert exact["district"] == "New Delhi" and abs(exact["lat"] - 28.64) < 1e-3
+    approx = g.resolve("110004")
+    assert approx["approximate"] and approx["matched_pincode"] in ("110001", "110005")
+    assert g.resolve("400001") is None
+
+
+def test_locate_parses_pincodes_and_coordinates():
+    g = make_gazetteer()
+    assert parse_location(" 560034 ") == ("pincode", 560034)
+    assert parse_location("12.93, 77.62") == ("coords", (12.93, 77.62))
+    for bad in ("", "abc", "056003", "91,200"):
+        try:
+            parse_location(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} parsed")
+    place = g.locate("20.0,78.0", k=3)
+    assert place["pincode"] == brute_force(g, 20.0, 78.0, 1)[0] and len(place["nearby"]) == 2
+    try:
+        g.locate("999999")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown pincode resolved")
+
+
+def test_saved_gazetteer_answers_the_same():
+    g = make_gazetteer(500)
+    with tempfile.TemporaryDirectory() as tmp:
+        g.save(tmp)
+        loaded = Gazetteer.load(tmp)
+        for lat, lon in ((12.9, 77.6), (28.6, 77.2), (22.5, 88.3)):
+            assert loaded.nearest(lat, lon, 5) == g.nearest(lat, lon, 5)
+        pin = str(int(g.pincode[42]))
+        assert loaded.lookup(pin) == g.lookup(pin)
+        del loaded  # release the memory maps before the directory goes
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"✅ {name}")
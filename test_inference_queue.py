@@ -0,0 +1,88 @@
+"""
+Unit checks for the micro-batcher behind /recommend_crop: batching of
+concurrent rows, the row cap, error fan-out and reuse after aclose().
+No server needed:
+
+    python test_inference_queue.py    (or python -m pytest test_inference_queue.py)
+"""
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "services"))
+
+from utils.inference_queue import MicroBatcher
+
+
+def recording_predict():
+    shapes = []
+
+    def predict(X):
+        shapes.append(X.shape)
+        return [float(row.sum()) for row in X]
+
+    return predict, shapes
+
+
+def test_concurrent_rows_share_one_call_in_order():
+    async def run():
+        predict, shapes = recording_predict()
+        batcher = MicroBatcher(predict, max_rows=64, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(np.array([i, 1.0])) for i in range(10)))
+        await batcher.aclose()
+        assert results == [i + 1.0 for i in range(10)]
+        assert shapes == [(10, 2)]
+        assert batcher.stats == {"rows": 10, "batches": 1, "max_batch": 10}
+
+    asyncio.run(run())
+
+
+def test_batches_are_capped_at_max_rows():
+    async def run():
+        predict, shapes = recording_predict()
+        batcher = MicroBatcher(predict, max_rows=4, max_wait_ms=20)
+        await asyncio.gather(*(batcher.submit(np.array([i])) for i in range(10)))
+        await batcher.aclose()
+        sizes = [n for n, _ in shapes]
+        assert max(sizes) == 4 and sum(sizes) == 10
+
+    asyncio.run(run())
+
+
+def test_errors_reach_every_caller_and_the_batcher_recovers():
+    async def run():
+        def predict(X):
+            if (X < 0).any():
+                raise ValueError("bad row")
+            return list(X[:, 0])
+
+        batcher = MicroBatcher(predict, max_wait_ms=20)
+        results = await asyncio.gather(batcher.submit(np.array([1.0])), batcher.submit(np.array([-1.0])),
+                                       return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert await batcher.submit(np.array([2.0])) == 2.0
+        await batcher.aclose()
+
+    asyncio.run(run())
+
+
+def test_batcher_is_usable_again_after_aclose():
+    # the app's lifespan closes it on shutdown; a second lifespan reuses it
+    predict, _ = recording_predict()
+    batcher = MicroBatcher(predict, max_wait_ms=1)
+    for value in (1.0, 2.0):
+        async def run():
+            assert await batcher.submit(np.array([value])) == value
+            await batcher.aclose()
+
+        asyncio.run(run())
+    assert batcher.stats["rows"] == 2
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"✅ {name}")
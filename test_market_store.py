@@ -0,0 +1,94 @@
+"""
+Unit checks for the indexed market price store: filters on the key prefix
+and posting lists, date ranges, paging and the saved, memory-mapped form.
+No server needed:
+
+    python test_market_store.py       (or python -m pytest test_market_store.py)
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "services"))
+
+from utils.market_store import MarketStore
+
+ROWS = [
+    {"crop": crop, "state": state, "market": market, "date": f"2024-03-{day:02d}",
+     "min_price": price - 50, "max_price": price + 50, "modal_price": price + day}
+    for crop, state, market, price in [
+        ("wheat", "Punjab", "Khanna", 2200),
+        ("wheat", "Punjab", "Ludhiana", 2250),
+        ("wheat", "Gujarat", "Ahmedabad", 2300),
+        ("cotton", "Gujarat", "Rajkot", 6500),
+    ]
+    for day in range(1, 11)
+]
+
+
+def make_store() -> MarketStore:
+    store = MarketStore()
+    store.add_records(ROWS)
+    return store
+
+
+def expected(**filters):
+    def keep(r):
+        return all(r[c].lower() == v.lower() for c, v in filters.items())
+
+    return sum(keep(r) for r in ROWS)
+
+
+def test_filters_match_a_full_scan():
+    store = make_store()
+    for filters in ({"crop": "wheat"}, {"crop": "Wheat", "state": "punjab"}, {"state": "Gujarat"},
+                    {"market": "Rajkot"}, {"crop": "wheat", "market": "Ahmedabad"}, {}):
+        result = store.query(limit=1000, **filters)
+        assert result["total"] == len(result["results"]) == expected(**filters), filters
+        for row in result["results"]:
+            assert all(row[c].lower() == v.lower() for c, v in filters.items())
+
+
+def test_unknown_values_return_nothing():
+    store = make_store()
+    assert store.query(crop="saffron")["total"] == 0
+    assert store.query(crop="wheat", state="Kerala")["total"] == 0
+
+
+def test_date_range_is_inclusive():
+    store = make_store()
+    result = store.query(crop="wheat", market="Khanna", date_from="2024-03-03", date_to="2024-03-05")
+    assert [r["date"] for r in result["results"]] == ["2024-03-03", "2024-03-04", "2024-03-05"]
+    assert store.query(state="Gujarat", date_from="2024-03-10", limit=100)["total"] == 2
+
+
+def test_pages_cover_every_row_once():
+    store = make_store()
+    total = store.query(crop="wheat")["total"]
+    seen = []
+    for offset in range(0, total, 7):
+        seen += [(r["market"], r["date"]) for r in store.query(crop="wheat", limit=7, offset=offset)["results"]]
+    assert len(seen) == len(set(seen)) == total
+
+
+def test_whole_rupee_prices_are_ints():
+    row = make_store().query(crop="cotton", date_to="2024-03-01")["results"][0]
+    assert row["modal_price"] == 6501 and isinstance(row["modal_price"], int)
+    assert (row["min_price"], row["max_price"]) == (6450, 6550)
+
+
+def test_saved_store_answers_the_same():
+    store = make_store()
+    with tempfile.TemporaryDirectory() as tmp:
+        store.save(tmp)
+        loaded = MarketStore.load(tmp)
+        for filters in ({"crop": "wheat"}, {"state": "Gujarat"}, {"market": "Khanna", "date_from": "2024-03-08"}):
+            assert loaded.query(limit=1000, **filters) == store.query(limit=1000, **filters)
+        del loaded  # release the memory maps before the directory goes
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"✅ {name}")
@@ -0,0 +1,78 @@
+"""
+Unit checks for the disease result cache: content hashing, the byte-bounded
+LRU, detector-version isolation and the size cap of the SQLite tier. No
+server needed:
+
+    python test_result_cache.py       (or python -m pytest test_result_cache.py)
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "services"))
+
+from utils.result_cache import ResultCache, file_digest
+from utils.weather_cache import PRUNE_EVERY, SQLiteTier
+
+RESULT = {"label": "leaf_blight", "confidence": 0.81, "advice": "Remove affected leaves."}
+
+
+def test_digest_depends_on_content_and_rewinds():
+    fp = io.BytesIO(b"leaf photo bytes")
+    fp.read(4)
+    digest = file_digest(fp)
+    assert fp.tell() == 0  # ready for the decoder
+    assert digest == file_digest(io.BytesIO(b"leaf photo bytes"))
+    assert digest != file_digest(io.BytesIO(b"another photo"))
+
+
+def test_hits_and_misses_are_counted():
+    cache = ResultCache("v1")
+    assert cache.get("a" * 32) is None
+    cache.put("a" * 32, RESULT)
+    assert cache.get("a" * 32) == RESULT
+    assert cache.snapshot()["hit_rate"] == 0.5
+
+
+def test_memory_tier_stays_within_its_byte_budget():
+    cache = ResultCache("v1", max_bytes=1000)
+    for i in range(50):
+        cache.put(f"{i:032x}", RESULT)
+    snap = cache.snapshot()
+    assert snap["bytes"] <= 1000 and snap["evictions"] > 0
+    assert cache.get(f"{49:032x}") == RESULT
+    assert cache.get(f"{0:032x}") is None
+
+
+def test_other_detector_versions_are_dropped_from_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "disease.db")
+        old = ResultCache("v1", disk=SQLiteTier(path, table="disease_cache"))
+        old.put("a" * 32, RESULT)
+        old.close()
+        new = ResultCache("v2", disk=SQLiteTier(path, table="disease_cache"))
+        assert new.get("a" * 32) is None
+        assert new.disk.count() == 0
+        new.close()
+
+
+def test_disk_tier_stays_near_its_byte_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = SQLiteTier(os.path.join(tmp, "disease.db"), table="disease_cache")
+        cache = ResultCache("v1", max_bytes=1000, disk=disk, max_disk_bytes=10_000)
+        for i in range(500):
+            cache.put(f"{i:032x}", RESULT)
+        row_bytes = 32 + len(json.dumps(RESULT, separators=(",", ":")))
+        assert disk.count() * row_bytes <= 10_000 + PRUNE_EVERY * row_bytes
+        # a fresh process still finds the newest results on disk
+        assert ResultCache("v1", disk=disk).get(f"{499:032x}") == RESULT
+        cache.close()
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"✅ {name}")
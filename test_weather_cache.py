@@ -0,0 +1,131 @@
+"""
+Unit checks for the weather cache: TTL hits, stale-while-revalidate,
+coalesced misses, LRU eviction and the SQLite tier. No server needed:
+
+    python test_weather_cache.py      (or python -m pytest test_weather_cache.py)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "services"))
+
+from utils.weather_cache import PRUNE_EVERY, SQLiteTier, WeatherCache, _Entry
+
+
+def counting_fetch():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": len(calls)}
+
+    return fetch, calls
+
+
+def test_fresh_entries_are_served_without_fetching():
+    async def run():
+        cache = WeatherCache(ttls={"current": (60, 60)})
+        fetch, calls = counting_fetch()
+        first = await cache.get_or_fetch("current", "110001", fetch)
+        second = await cache.get_or_fetch("current", "110001", fetch)
+        assert first == second == {"n": 1}
+        assert len(calls) == 1 and cache.stats["hits"] == 1
+
+    asyncio.run(run())
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def run():
+        cache = WeatherCache(ttls={"current": (0.05, 60)})
+        fetch, calls = counting_fetch()
+        await cache.get_or_fetch("current", "110001", fetch)
+        await asyncio.sleep(0.06)
+        stale = await asyncio.gather(*(cache.get_or_fetch("current", "110001", fetch) for _ in range(5)))
+        assert stale == [{"n": 1}] * 5  # nobody waited for upstream
+        await asyncio.sleep(0.05)
+        assert len(calls) == 2 and cache.stats["refreshes"] == 1
+        assert await cache.get_or_fetch("current", "110001", fetch) == {"n": 2}
+
+    asyncio.run(run())
+
+
+def test_expired_entry_is_refetched():
+    async def run():
+        cache = WeatherCache(ttls={"current": (0.02, 0.02)})
+        fetch, calls = counting_fetch()
+        await cache.get_or_fetch("current", "110001", fetch)
+        await asyncio.sleep(0.05)
+        assert await cache.get_or_fetch("current", "110001", fetch) == {"n": 2}
+        assert cache.stats["misses"] == 2
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def run():
+        cache = WeatherCache()
+        fetch, calls = counting_fetch()
+        results = await asyncio.gather(*(cache.get_or_fetch("forecast", "110001", fetch) for _ in range(10)))
+        assert results == [{"n": 1}] * 10
+        assert len(calls) == 1 and cache.stats["coalesced"] == 9
+
+    asyncio.run(run())
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def run():
+        cache = WeatherCache(max_entries=2)
+        fetch, _ = counting_fetch()
+        for key in ("a", "b"):
+            await cache.get_or_fetch("current", key, fetch)
+        await cache.get_or_fetch("current", "a", fetch)  # "b" is now the oldest
+        await cache.get_or_fetch("current", "c", fetch)
+        assert cache.peek("current", "b") is None
+        assert cache.peek("current", "a") is not None and cache.peek("current", "c") is not None
+        assert cache.stats["evictions"] == 1
+
+    asyncio.run(run())
+
+
+def test_sqlite_tier_warms_a_new_cache():
+    async def run(path):
+        fetch, calls = counting_fetch()
+        cache = WeatherCache(disk=SQLiteTier(path))
+        await cache.get_or_fetch("current", "110001", fetch)
+        cache.close()
+        restarted = WeatherCache(disk=SQLiteTier(path))
+        assert await restarted.get_or_fetch("current", "110001", fetch) == {"n": 1}
+        assert len(calls) == 1 and restarted.stats["disk_hits"] == 1
+        restarted.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(os.path.join(tmp, "weather.db")))
+
+
+def test_sqlite_tier_drops_expired_and_surplus_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "weather.db")
+        disk = SQLiteTier(path)
+        for i in range(10):
+            disk.put("current", f"old{i}", _Entry(time.time() - 86400, {"i": i}))
+        disk.close()
+
+        disk = SQLiteTier(path)
+        WeatherCache(max_entries=20, ttls={"current": (60, 60)}, disk=disk)
+        for i in range(100):
+            disk.put("current", f"new{i}", _Entry(time.time() + i, {"i": i}))
+        assert disk.get("current", "old0") is None
+        assert disk.count() <= 20 + PRUNE_EVERY
+        assert disk.get("current", "new99") is not None
+        disk.close()
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"✅ {name}")